@@ -16,11 +16,18 @@ e gerar uma Árvore Sintática (Parse Tree) como saída.
 class TreeNode:
     """
     Representa um nó na Árvore Sintática. Cada nó contém um valor (um símbolo
-    terminal ou não-terminal) e uma lista de nós filhos.
+    terminal ou não-terminal) e uma lista de nós filhos. As folhas dos tokens
+    guardam também a linha e a coluna do token no fonte.
     """
-    def __init__(self, value):
+    linha = None
+    coluna = None
+
+    def __init__(self, value, linha=None, coluna=None):
         self.value = value
         self.children = []
+        if linha is not None:
+            self.linha = linha
+            self.coluna = coluna
 
     def add_child(self, node):
         """Adiciona um nó à lista de filhos."""
@@ -120,23 +127,35 @@ tabela_preditiva = {
 
 # --- FUNÇÕES DO ANALISADOR ---
 
-def erro(token_esperado, token_recebido):
+class ErroSintatico(Exception):
     """
-    Função chamada quando um erro sintático é encontrado.
-    Imprime uma mensagem de erro formatada e encerra a execução.
+    Erro sintático lançado no modo silencioso, no lugar de imprimir e encerrar
+    o programa (para quem usa o analisador dentro de outro processo, como um servidor).
     """
+
+def mensagem_erro(token_esperado, token_recebido):
     if token_recebido and token_recebido.get('linha'):
-        print(f"Erro Sintático: Esperado um dos seguintes tokens {token_esperado}, mas foi encontrado '{token_recebido.get('tipo')}' (valor: '{token_recebido.get('valor')}') na linha {token_recebido.get('linha')}.")
-    else:
-        print(f"Erro Sintático: Esperado um dos seguintes tokens {token_esperado}, mas o final da entrada foi alcançado.")
+        return f"Erro Sintático: Esperado um dos seguintes tokens {token_esperado}, mas foi encontrado '{token_recebido.get('tipo')}' (valor: '{token_recebido.get('valor')}') na linha {token_recebido.get('linha')}."
+    return f"Erro Sintático: Esperado um dos seguintes tokens {token_esperado}, mas o final da entrada foi alcançado."
+
+def erro(token_esperado, token_recebido, silencioso=False):
+    """
+    Função chamada quando um erro sintático é encontrado.
+    Imprime uma mensagem de erro formatada e encerra a execução
+    (no modo silencioso, lança ErroSintatico com a mesma mensagem).
+    """
+    if silencioso:
+        raise ErroSintatico(mensagem_erro(token_esperado, token_recebido))
+    print(mensagem_erro(token_esperado, token_recebido))
     # Em um compilador real, aqui entraria o modo pânico para recuperação de erro
     sys.exit(1)
 
-def analisar_sintaticamente(tokens):
+def analisar_sintaticamente(tokens, silencioso=False):
     """
     Função principal que realiza a análise sintática.
     Entrada: uma lista de tokens (dicionários) vinda do analisador léxico.
     Saída: a raiz da Árvore Sintática gerada, ou None em caso de erro.
+    Com silencioso=True nada é impresso e os erros viram ErroSintatico.
     """
     # Adiciona o marcador de fim de fita ($) à lista de tokens
     tokens.append({'tipo': '$', 'valor': '$', 'linha': -1, 'coluna': -1})
@@ -156,7 +175,8 @@ def analisar_sintaticamente(tokens):
 
         # Condição de SUCESSO: se a pilha e a fita chegaram ao fim ($)
         if simbolo_pilha == '$' and token_atual['tipo'] == '$':
-            print("Análise sintática concluída com sucesso!")
+            if not silencioso:
+                print("Análise sintática concluída com sucesso!")
             return no_raiz
 
         # CASO 1: Topo da pilha é um TERMINAL
@@ -164,7 +184,8 @@ def analisar_sintaticamente(tokens):
             # Deu match! Consome o símbolo da pilha e o token da fita
             pilha.pop()
             if no_atual: # Adiciona o valor do token (ex: 'a', '10') como filho do nó
-                 no_atual.add_child(TreeNode(f"'{token_atual['valor']}'"))
+                 no_atual.add_child(TreeNode(f"'{token_atual['valor']}'", token_atual['linha'],
+                                             token_atual['coluna']))
             ponteiro += 1
         
         # CASO 2: Topo da pilha é um NÃO-TERMINAL
@@ -188,12 +209,14 @@ def analisar_sintaticamente(tokens):
                         no_atual.add_child(TreeNode('epsilon'))
             else:
                 # Erro: não há regra na tabela para essa combinação de não-terminal e token
-                erro(list(tabela_preditiva[simbolo_pilha].keys()), token_atual)
+                erro(list(tabela_preditiva[simbolo_pilha].keys()), token_atual, silencioso)
         
         # CASO 3: ERRO - Topo da pilha é um terminal mas não corresponde à entrada
         else:
-            erro(simbolo_pilha, token_atual)
+            erro(simbolo_pilha, token_atual, silencioso)
     
     # Se sair do loop por outra razão (situação inesperada)
+    if silencioso:
+        raise ErroSintatico("Erro inesperado: A pilha terminou antes de processar toda a entrada.")
     print("Erro inesperado: A pilha terminou antes de processar toda a entrada.")
     return None
\ No newline at end of file
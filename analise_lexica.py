@@ -16,12 +16,14 @@ TOKEN_MAP = {
     '➕': 'OP_SOMA',          # +
     '➖': 'OP_SUB',           # -
     '✖️': 'OP_MULT',          # *
+    '✖': 'OP_MULT',           # * (sem o seletor de variação U+FE0F)
     '➗': 'OP_DIV',           # /
     '🐓': 'OP_MAIOR',         # >
     '🐣': 'OP_MENOR',         # <
     '🥚': 'OP_IGUAL_COMP',    # == (aritmetico)
     '🤏': 'OP_AND',           # &&
     '✌️': 'OP_OR',            # ||
+    '✌': 'OP_OR',             # || (sem o seletor de variação U+FE0F)
     '🤝': 'OP_IGUAL_LOGICO',  # == (logico)
     '👂': 'COMANDO_ENTRADA',  # scanf
     '👄': 'COMANDO_SAIDA',    # printf
@@ -39,140 +41,153 @@ TOKEN_MAP = {
 }
 
 
-def analisar(codigo_fonte):
+def analisar(codigo_fonte, erros=None):
     """
     Função que faz a análise léxica do código
-    Entrada: string contendo um código em e-moji
+    Entrada: string contendo um código em e-moji, ou um iterável de blocos de
+    texto (ex.: fonte_mapeada.FonteMapeada) em que todo bloco, menos o último,
+    termina em quebra de linha
     Saída: tupla contendo (lista_de_tokens, status_sucesso).
+    Se uma lista 'erros' for passada, as mensagens de erro vão para ela em vez do stderr.
     """
+    def reportar(mensagem):
+        if erros is None:
+            print(mensagem, file=sys.stderr)
+        else:
+            erros.append(mensagem)
+
+    # Um texto inteiro é um único bloco
+    blocos = (codigo_fonte,) if isinstance(codigo_fonte, str) else codigo_fonte
+
     tokens = []             # Lista pra guardar os tokens
     linha = 1               # Contador de linha para encontrar a posição do erro
     coluna = 1              # Contador de coluna, mesma coisa
-    i = 0                   # Index que caminha pela string do codigo_fonte
     sucesso = True          # Flag, False indica erro
-    
-    # Loop principal, lê o código caractere por caractere
-    while i < len(codigo_fonte):
-        char = codigo_fonte[i]
-
-        # Pula espaços brancos, quebra de linhas, tab, pois estes não são tokens
-        if char.isspace():
-            if char == '\n':    # Se for quebra de linha, incrementa a linha e reinicia a coluna
-                linha += 1      
-                coluna = 1      
-            else:               # Se for espaço ou tab, so incrementa a coluna 
-                coluna += 1     
-            i += 1              #próximo caractere
-            continue            #Volta pro começo do while
-
-        # PULA COMENTÁRIOS
-        # Tudo que estiver entre 🤫 e 👀 vai ser ignorado
-        if char == '🤫':
-            inicio_comentario_col = coluna
-            i += 1              # Pula o emoji de início de comentário
-            coluna += 1
-            pos_inicial_comentario = i
-            # dai lê até achar o emoji de fim de comentário
-            while i < len(codigo_fonte) and codigo_fonte[i] != '👀':
-                i += 1
-            
-            # Chama um erro caso não exista o emoji de fim de comentário
-            if i == len(codigo_fonte):
-                print(f"Erro Léxico: Comentário iniciado na linha {linha} coluna {inicio_comentario_col} não foi fechado.", file=sys.stderr)
-                sucesso = False
-                break 
-            
-            # Se achou o emoji, atualiza os contadores de linha/coluna
-            # (para saber onde o código continua depois do comentário)
-            comentario_conteudo = codigo_fonte[pos_inicial_comentario:i]
-            novas_linhas = comentario_conteudo.count('\n')
-            if novas_linhas > 0:
-                linha += novas_linhas
-                coluna = len(comentario_conteudo.split('\n')[-1]) + 1
-            else:
-                coluna += len(comentario_conteudo)
-            
-            i += 1 # Pula o '👀'
-            coluna += 1
-            continue # Volta pro começo do while
-
-        # Tokens com so um simbolo (operadores, pontuação)
-        # Verifica se o caractere atual pertence ao mapa de tokens
-        if char in TOKEN_MAP:
-            # Se sim, coloca o token na lista
-            tokens.append((TOKEN_MAP[char], char, linha, coluna))
-            i += 1          # vai pro próximo caractere
-            coluna += 1
-            continue        # volta pro começo do while
-        
-        # Identificadpres (variáveis)
-        # ID começa com uma letra
-        if char.isalpha():
-            lexema = char   # Armazena o primeiro caractere
-            coluna_inicio = coluna
-            i += 1
-            coluna += 1
-            while i < len(codigo_fonte) and (codigo_fonte[i].isalnum() or codigo_fonte[i] == '_'):  # De acprdo com a especificaçao do documento
-                lexema += codigo_fonte[i]
-                i += 1
+    comentario_aberto = None    # (linha, coluna) do 🤫 de um comentário ainda não fechado
+
+    # Os blocos terminam em quebra de linha, então só um comentário pode
+    # continuar de um bloco para o outro (ids, números e strings não passam de linha)
+    for codigo_fonte in blocos:
+        i = 0                       # Index que caminha pelo bloco
+        tamanho = len(codigo_fonte)
+
+        # Loop principal, lê o código caractere por caractere
+        while i < tamanho:
+
+            # PULA COMENTÁRIOS
+            # Tudo que estiver entre 🤫 e 👀 vai ser ignorado
+            if comentario_aberto is not None:
+                fim = codigo_fonte.find('👀', i)
+                if fim == -1:
+                    fim = tamanho   # O comentário continua no próximo bloco
+                # Atualiza os contadores de linha/coluna sem copiar o comentário
+                # (para saber onde o código continua depois dele)
+                novas_linhas = codigo_fonte.count('\n', i, fim)
+                if novas_linhas > 0:
+                    linha += novas_linhas
+                    coluna = fim - codigo_fonte.rfind('\n', i, fim)
+                else:
+                    coluna += fim - i
+                i = fim
+                if i == tamanho:
+                    break
+                comentario_aberto = None
+                i += 1 # Pula o '👀'
                 coluna += 1
-            # Quando o loop acabar, temos o nome completo do id
-            tokens.append(('ID', lexema, linha, coluna_inicio))
-            continue
-
-        # Numeros Inteiros
-        # Numero começa com um digit
-        if char.isdigit():
-            lexema = char   # Guarda o primeiro dígito
-            coluna_inicio = coluna
-            i += 1
-            coluna += 1
-            # Continua lendo enquanto for dígito
-            while i < len(codigo_fonte) and codigo_fonte[i].isdigit():
-                lexema += codigo_fonte[i]
-                i += 1
+                continue
+
+            char = codigo_fonte[i]
+
+            # Pula espaços brancos, quebra de linhas, tab, pois estes não são tokens
+            if char.isspace():
+                if char == '\n':    # Se for quebra de linha, incrementa a linha e reinicia a coluna
+                    linha += 1
+                    coluna = 1
+                else:               # Se for espaço ou tab, so incrementa a coluna
+                    coluna += 1
+                i += 1              #próximo caractere
+                continue            #Volta pro começo do while
+
+            if char == '🤫':
+                comentario_aberto = (linha, coluna)
+                i += 1              # Pula o emoji de início de comentário
                 coluna += 1
-            # Converte o resultado para int
-            tokens.append(('NUMERO_INT', int(lexema), linha, coluna_inicio))
-            continue
-            
-        # Strings
-        # String começa com aspas duplas "
-        if char == '"':
-            lexema = ''
-            coluna_inicio = coluna
-            i += 1      # Pula a aspa inicial
-            coluna += 1
-            # Lê os caracteres, até a ultima aspa dupla
-            while i < len(codigo_fonte) and codigo_fonte[i] != '"':
-                # String nao deve ter quebra de linha (peguei o regex disso dos slides)
-                if codigo_fonte[i] == '\n':
-                    print(f"Erro Léxico: String não pode conter quebra de linha (erro na linha {linha}).", file=sys.stderr)
-                    lexema = None
-                    sucesso = False
-                    break
-                lexema += codigo_fonte[i]
-                i += 1
+                continue
+
+            # Tokens com so um simbolo (operadores, pontuação)
+            # Verifica se o caractere atual pertence ao mapa de tokens
+            if char in TOKEN_MAP:
+                lexema = char
+                # Emojis como ✖️ e ✌️ são dois code points: o símbolo + o seletor
+                # de variação U+FE0F, que faz parte do mesmo token
+                if i + 1 < tamanho and codigo_fonte[i + 1] == '\ufe0f':
+                    lexema += '\ufe0f'
+                    i += 1
+                # Se sim, coloca o token na lista
+                tokens.append((TOKEN_MAP[char], lexema, linha, coluna))
+                i += 1          # vai pro próximo caractere
                 coluna += 1
+                continue        # volta pro começo do while
 
-            if not sucesso: break
-            
-            # Erro chamado no caso de não encontrar a " que fecha a string
-            if i == len(codigo_fonte):
-                print(f"Erro Léxico: String iniciada na linha {linha} coluna {coluna_inicio} não foi fechada.", file=sys.stderr)
-                sucesso = False
-                break
-
-            i += 1      # Pula a aspa final
+            # Identificadores (variáveis)
+            # ID começa com uma letra; o lexema é recortado do bloco só no final
+            if char.isalpha():
+                inicio = i
+                i += 1
+                while i < tamanho and (codigo_fonte[i].isalnum() or codigo_fonte[i] == '_'):  # De acordo com a especificaçao do documento
+                    i += 1
+                # Quando o loop acabar, temos o nome completo do id
+                tokens.append(('ID', codigo_fonte[inicio:i], linha, coluna))
+                coluna += i - inicio
+                continue
+
+            # Numeros Inteiros
+            # Numero começa com um digit
+            if char.isdigit():
+                inicio = i
+                i += 1
+                # Continua lendo enquanto for dígito
+                while i < tamanho and codigo_fonte[i].isdigit():
+                    i += 1
+                # Converte o resultado para int
+                tokens.append(('NUMERO_INT', int(codigo_fonte[inicio:i]), linha, coluna))
+                coluna += i - inicio
+                continue
+
+            # Strings
+            # String começa com aspas duplas " e vai até a próxima aspa dupla
+            if char == '"':
+                fim = codigo_fonte.find('"', i + 1)
+                # String nao deve ter quebra de linha (peguei o regex disso dos slides)
+                if codigo_fonte.find('\n', i + 1, tamanho if fim == -1 else fim) != -1:
+                    reportar(f"Erro Léxico: String não pode conter quebra de linha (erro na linha {linha}).")
+                    return tokens, False
+
+                # Depois de um erro anterior, a análise para na primeira string
+                if not sucesso:
+                    return tokens, sucesso
+
+                # Erro chamado no caso de não encontrar a " que fecha a string
+                if fim == -1:
+                    reportar(f"Erro Léxico: String iniciada na linha {linha} coluna {coluna} não foi fechada.")
+                    return tokens, False
+
+                tokens.append(('STRING_LITERAL', codigo_fonte[i + 1:fim], linha, coluna))
+                coluna += fim + 1 - i
+                i = fim + 1     # Pula a aspa final
+                continue
+
+            # O caractere não se encaixa em nenhuma das regras acima. Erro
+            reportar(f"Erro Léxico: Caractere inesperado '{char}' na linha {linha}, coluna {coluna}.")
+            sucesso = False
+            i += 1
             coluna += 1
-            tokens.append(('STRING_LITERAL', lexema, linha, coluna_inicio))
-            continue
 
-        # O caractere não se encaixa em nenhuma das regras acima. Erro
-        print(f"Erro Léxico: Caractere inesperado '{char}' na linha {linha}, coluna {coluna}.", file=sys.stderr)
+    # Chama um erro caso não exista o emoji de fim de comentário
+    if comentario_aberto is not None:
+        reportar(f"Erro Léxico: Comentário iniciado na linha {comentario_aberto[0]} "
+                 f"coluna {comentario_aberto[1]} não foi fechado.")
         sucesso = False
-        i += 1
-        coluna += 1
 
     return tokens, sucesso
 
@@ -0,0 +1,498 @@
+import sys
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+from tac import (ROTULO, DESVIO, DESVIO_FALSO, COPIA, BINARIA, IMPRIME, LE,
+                 ler_instrucao, ler_codigo, formatar_instrucao, eh_constante, eh_temporario,
+                 valor_constante)
+from maquina_virtual import MaquinaVirtual, ErroExecucao, entrada_padrao, saida_padrao
+
+"""
+Backend que traduz o TAC para um arquivo C autocontido e o compila com o
+compilador C do sistema (cc, ou o indicado na variável CC) para execução
+nativa:
+    - cada variável vira uma variável local de main(), com o tipo C vindo do
+      tipo declarado na Tabela de Símbolos (INT e BOOL -> long long,
+      STRING -> const char *); os temporários recebem o tipo do valor que
+      guardam (um temporário reaproveitado para tipos diferentes vira uma
+      variável C por tipo);
+    - rótulos e desvios do TAC viram rótulos e 'goto' do C;
+    - PRINT, SCAN, concatenação e divisão chamam um runtime pequeno, embutido
+      no arquivo, com as mesmas regras da máquina virtual.
+O executável roda sozinho (lendo stdin e escrevendo stdout). Quando é
+executado pelo ProgramaC, a variável EMOJI_PROTOCOLO faz o runtime marcar
+cada PRINT e cada pedido de SCAN, então as funções de entrada/saída
+plugáveis funcionam como na máquina virtual.
+Os inteiros são de 64 bits (com -fwrapv); o resultado só difere da máquina
+virtual, que usa inteiros de Python, se algum valor passar desse limite.
+"""
+
+# Opções passadas ao compilador C
+OPCOES_CC = ["-O2", "-fwrapv"]
+
+TIPOS_C = {'INT': "long long", 'STRING': "const char *"}
+INICIAIS_C = {'INT': "0", 'STRING': '""'}
+
+OPS_ARITMETICOS = ('+', '-', '*')
+OPS_COMPARACAO = ('<', '>', '<=', '>=', '==', '!=')
+
+
+class ErroBackendC(ErroExecucao):
+    """O TAC não pôde ser traduzido para C ou o compilador C falhou."""
+    pass
+
+
+# ------ RUNTIME ------
+# Funções C incluídas em todo programa gerado. As mensagens de erro são as
+# mesmas da máquina virtual.
+
+RUNTIME = r'''#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+static int emoji_protocolo;     /* 1: executado pelo ProgramaC (saída marcada) */
+static struct timespec emoji_inicio;
+
+static void emoji_erro(const char *mensagem) {
+    if (emoji_protocolo) {
+        printf("E%zu\n%s\n", strlen(mensagem), mensagem);
+        fflush(stdout);
+    } else {
+        fflush(stdout);
+        fprintf(stderr, "Erro: %s\n", mensagem);
+    }
+    exit(1);
+}
+
+static void emoji_print_str(const char *s) {
+    if (emoji_protocolo)
+        printf("P%zu\n", strlen(s));
+    fputs(s, stdout);
+    putchar('\n');
+}
+
+static void emoji_print_int(long long v) {
+    char texto[32];
+    snprintf(texto, sizeof texto, "%lld", v);
+    emoji_print_str(texto);
+}
+
+static char *emoji_le_linha(void) {
+    size_t tamanho = 0, capacidade = 64;
+    char *linha = malloc(capacidade);
+    int c;
+    if (emoji_protocolo) {
+        fputs("S\n", stdout);
+        fflush(stdout);
+    }
+    if (linha == NULL)
+        emoji_erro("Memória insuficiente.");
+    while ((c = getchar()) != EOF && c != '\n') {
+        if (tamanho + 1 == capacidade) {
+            capacidade *= 2;
+            linha = realloc(linha, capacidade);
+            if (linha == NULL)
+                emoji_erro("Memória insuficiente.");
+        }
+        linha[tamanho++] = (char) c;
+    }
+    if (c == EOF && tamanho == 0)
+        emoji_erro("SCAN sem dados na entrada padrão.");
+    linha[tamanho] = '\0';
+    return linha;
+}
+
+static int emoji_espaco(char c) {
+    return c == ' ' || c == '\t' || c == '\r' || c == '\n' || c == '\v' || c == '\f';
+}
+
+static const char *emoji_scan_str(void) {
+    return emoji_le_linha();
+}
+
+static long long emoji_scan_bool(void) {
+    char *linha = emoji_le_linha(), *fim = linha + strlen(linha), *p = linha;
+    long long valor;
+    while (emoji_espaco(*p)) p++;
+    while (fim > p && emoji_espaco(fim[-1])) fim--;
+    *fim = '\0';
+    valor = strcmp(p, "1") == 0 || strcmp(p, "\xf0\x9f\x91\x8d") == 0;     /* 👍 */
+    free(linha);
+    return valor;
+}
+
+static long long emoji_scan_int(const char *nome) {
+    /* Mesmas regras do int() do Python: espaços nas pontas, sinal e '_' entre dígitos */
+    char *linha = emoji_le_linha(), *p = linha;
+    unsigned long long valor = 0, limite;
+    int negativo = 0, digitos = 0;
+    while (emoji_espaco(*p)) p++;
+    if (*p == '+' || *p == '-')
+        negativo = *p++ == '-';
+    limite = negativo ? 9223372036854775808ULL : 9223372036854775807ULL;
+    while ((*p >= '0' && *p <= '9') || (*p == '_' && digitos && p[1] >= '0' && p[1] <= '9')) {
+        if (*p != '_') {
+            if (valor > (limite - (unsigned) (*p - '0')) / 10)
+                break;
+            valor = valor * 10 + (unsigned) (*p - '0');
+            digitos++;
+        }
+        p++;
+    }
+    while (emoji_espaco(*p)) p++;
+    if (!digitos || *p != '\0') {
+        size_t tamanho = strlen(nome) + strlen(linha) + 64;
+        char *mensagem = malloc(tamanho);
+        if (mensagem == NULL)
+            emoji_erro("Memória insuficiente.");
+        snprintf(mensagem, tamanho, "SCAN de '%s': '%s' não é um inteiro.", nome, linha);
+        emoji_erro(mensagem);
+    }
+    free(linha);
+    return negativo ? (long long) (0ULL - valor) : (long long) valor;
+}
+
+static const char *emoji_concatena(const char *a, const char *b) {
+    size_t ta = strlen(a), tb = strlen(b);
+    char *s = malloc(ta + tb + 1);
+    if (s == NULL)
+        emoji_erro("Memória insuficiente.");
+    memcpy(s, a, ta);
+    memcpy(s + ta, b, tb + 1);
+    return s;
+}
+
+static long long emoji_divide(long long a, long long b, const char *instrucao) {
+    /* Divisão inteira truncando em direção ao zero, como tac.dividir */
+    if (b == 0) {
+        char mensagem[512];
+        snprintf(mensagem, sizeof mensagem,
+                 "Erro de execução em '%s': integer division or modulo by zero", instrucao);
+        emoji_erro(mensagem);
+    }
+    if (b == -1)
+        return (long long) (0ULL - (unsigned long long) a);
+    return a / b;
+}
+
+static void emoji_iniciar(void) {
+    emoji_protocolo = getenv("EMOJI_PROTOCOLO") != NULL;
+    clock_gettime(CLOCK_MONOTONIC, &emoji_inicio);
+}
+
+static void emoji_terminar(void) {
+    if (emoji_protocolo) {
+        struct timespec fim;
+        clock_gettime(CLOCK_MONOTONIC, &fim);
+        printf("F%lld\n", (long long) (fim.tv_sec - emoji_inicio.tv_sec) * 1000000000LL
+                          + (fim.tv_nsec - emoji_inicio.tv_nsec));
+    }
+    fflush(stdout);
+}
+'''
+
+
+# ------ GERAÇÃO DA FONTE C ------
+
+def literal_c(texto):
+    """Literal de string C com os bytes UTF-8 do texto (não ASCII e controles em octal)."""
+    partes = []
+    for byte in texto.encode('utf-8'):
+        caractere = chr(byte)
+        if caractere in '"\\?':
+            partes.append('\\' + caractere)
+        elif 32 <= byte < 127:
+            partes.append(caractere)
+        else:
+            partes.append(f"\\{byte:03o}")
+    return '"' + "".join(partes) + '"'
+
+
+def identificador_c(nome):
+    """Nome C para um nome do TAC: letras e dígitos ASCII ficam, o resto vira _<hex>_."""
+    return "".join(c if c.isascii() and c.isalnum() else f"_{ord(c):x}_" for c in nome)
+
+
+class GeradorC:
+    def __init__(self, instrucoes, tipos=None, constantes=None):
+        self.instrucoes = [ler_instrucao(i, constantes) if isinstance(i, str) else i for i in instrucoes]
+        self.tipos = tipos or {}
+        self.variaveis = {}         # (nome, tipo) -> nome C
+        self.tipo_atual = {}        # Tipo do último valor atribuído a cada nome (em ordem no TAC)
+        self.linhas = []
+
+    def gerar(self):
+        """Devolve a fonte C completa (runtime + main) equivalente ao TAC."""
+        corpo = []
+        for instr in self.instrucoes:
+            corpo.append(self._traduzir(instr))
+        declaracoes = [f"    {TIPOS_C[tipo]} {nome_c} = {INICIAIS_C[tipo]};"
+                       for (_, tipo), nome_c in sorted(self.variaveis.items(), key=lambda item: item[1])]
+        self.linhas = (["/* Gerado pelo compilador E-moji (backend C) a partir do TAC. */", RUNTIME,
+                        "int main(void) {"] + declaracoes + ["    emoji_iniciar();"] + corpo
+                       + ["    emoji_terminar();", "    return 0;", "}", ""])
+        return "\n".join(self.linhas)
+
+    # ------ TIPOS E OPERANDOS ------
+
+    def _tipo_declarado(self, nome):
+        tipo = self.tipos.get(nome)
+        if tipo is None:
+            return None
+        return 'STRING' if tipo == 'STRING' else 'INT'
+
+    def _tipo(self, operando):
+        if eh_constante(operando):
+            return 'STRING' if operando[0] == "'" else 'INT'
+        return (self._tipo_declarado(operando) or self.tipo_atual.get(operando) or 'INT')
+
+    def _variavel(self, nome, tipo):
+        chave = (nome, tipo)
+        if chave not in self.variaveis:
+            sufixo = "" if self._tipo_declarado(nome) else ("_s" if tipo == 'STRING' else "_i")
+            prefixo = "t_" if eh_temporario(nome) else "v_"
+            self.variaveis[chave] = prefixo + identificador_c(nome) + sufixo
+        return self.variaveis[chave]
+
+    def _operando(self, operando):
+        if not eh_constante(operando):
+            return self._variavel(operando, self._tipo(operando))
+        valor = valor_constante(operando)
+        if isinstance(valor, str):
+            return literal_c(valor)
+        if not -2 ** 63 <= valor < 2 ** 63:
+            raise ErroBackendC(f"Inteiro {valor} não cabe em 64 bits")
+        return f"({valor + 1}LL - 1)" if valor == -2 ** 63 else f"{valor}LL"
+
+    def _destino(self, nome, tipo):
+        declarado = self._tipo_declarado(nome)
+        if declarado is not None and declarado != tipo:
+            raise ErroBackendC(f"'{nome}' é {self.tipos[nome]}, mas recebe um valor {tipo}")
+        self.tipo_atual[nome] = tipo
+        return self._variavel(nome, tipo)
+
+    def _verdade(self, operando):
+        """Expressão C verdadeira quando o operando é verdadeiro para a máquina virtual."""
+        if self._tipo(operando) == 'STRING':
+            return f"({self._operando(operando)})[0]"
+        return self._operando(operando)
+
+    # ------ INSTRUÇÕES ------
+
+    def _traduzir(self, instr):
+        tipo = instr.tipo
+        if tipo == ROTULO:
+            return f"{identificador_c(instr.dest)}: ;"
+        if tipo == DESVIO:
+            return f"    goto {identificador_c(instr.dest)};"
+        if tipo == DESVIO_FALSO:
+            return f"    if (!{self._verdade(instr.arg1)}) goto {identificador_c(instr.dest)};"
+        if tipo == IMPRIME:
+            if self._tipo(instr.arg1) == 'STRING':
+                return f"    emoji_print_str({self._operando(instr.arg1)});"
+            return f"    emoji_print_int({self._operando(instr.arg1)});"
+        if tipo == LE:
+            declarado = self.tipos.get(instr.dest)
+            if declarado == 'STRING':
+                return f"    {self._destino(instr.dest, 'STRING')} = emoji_scan_str();"
+            if declarado == 'BOOL':
+                return f"    {self._destino(instr.dest, 'INT')} = emoji_scan_bool();"
+            return f"    {self._destino(instr.dest, 'INT')} = emoji_scan_int({literal_c(instr.dest)});"
+        if tipo == COPIA:
+            valor = self._operando(instr.arg1)
+            return f"    {self._destino(instr.dest, self._tipo(instr.arg1))} = {valor};"
+        if tipo == BINARIA:
+            valor, tipo_resultado = self._expressao(instr)
+            return f"    {self._destino(instr.dest, tipo_resultado)} = {valor};"
+        raise ErroBackendC(f"Instrução desconhecida '{formatar_instrucao(instr)}'")
+
+    def _expressao(self, instr):
+        """(expressão C, tipo do resultado) de uma instrução BINARIA."""
+        op = instr.op
+        ta, tb = self._tipo(instr.arg1), self._tipo(instr.arg2)
+        a, b = self._operando(instr.arg1), self._operando(instr.arg2)
+        if op in ('&&', '||'):
+            return f"({self._verdade(instr.arg1)} {op} {self._verdade(instr.arg2)})", 'INT'
+        if op in OPS_COMPARACAO:
+            if ta != tb:
+                if op in ('==', '!='):      # Tipos diferentes nunca são iguais
+                    return ("0LL" if op == '==' else "1LL"), 'INT'
+            elif ta == 'STRING':
+                return f"(strcmp({a}, {b}) {op} 0)", 'INT'
+            else:
+                return f"({a} {op} {b})", 'INT'
+        elif op == '+' and ta == tb == 'STRING':
+            return f"emoji_concatena({a}, {b})", 'STRING'
+        elif op in OPS_ARITMETICOS and ta == tb == 'INT':
+            return f"{a} {op} {b}", 'INT'
+        elif op == '/' and ta == tb == 'INT':
+            return f"emoji_divide({a}, {b}, {literal_c(formatar_instrucao(instr))})", 'INT'
+        raise ErroBackendC(f"Operação não suportada em C: '{formatar_instrucao(instr)}'")
+
+
+# ------ COMPILAÇÃO COM CACHE ------
+
+_cache_executaveis = {}                 # sha256 da fonte C e das opções -> caminho do executável
+estatisticas_cache = {'acertos': 0, 'faltas': 0}
+
+
+def compilador_c():
+    """Caminho do compilador C (variável CC ou 'cc')."""
+    caminho = shutil.which(os.environ.get("CC", "cc"))
+    if caminho is None:
+        raise ErroBackendC("Compilador C não encontrado (instale o cc ou defina a variável CC).")
+    return caminho
+
+
+def compilar_executavel(fonte, diretorio_cache=None):
+    """
+    Compila a fonte C gerada e devolve o caminho do executável. Executáveis já
+    compilados são reaproveitados pelo hash da fonte e das opções, em memória e
+    no diretório de cache (por padrão, uma pasta no diretório temporário).
+    """
+    cc = compilador_c()
+    chave = hashlib.sha256("\0".join([cc] + OPCOES_CC + [fonte]).encode('utf-8')).hexdigest()
+    caminho = _cache_executaveis.get(chave)
+    if caminho is not None and os.path.exists(caminho):
+        estatisticas_cache['acertos'] += 1
+        return caminho
+
+    diretorio = diretorio_cache or os.path.join(tempfile.gettempdir(), "emoji-c")
+    caminho = os.path.join(diretorio, chave[:32] + (".exe" if os.name == "nt" else ""))
+    if os.path.exists(caminho):
+        estatisticas_cache['acertos'] += 1
+    else:
+        estatisticas_cache['faltas'] += 1
+        os.makedirs(diretorio, exist_ok=True)
+        arquivo_c = os.path.join(diretorio, chave[:32] + ".c")
+        with open(arquivo_c, 'w', encoding='utf-8') as f:
+            f.write(fonte)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        processo = subprocess.run([cc] + OPCOES_CC + ["-o", temporario, arquivo_c],
+                                  capture_output=True, text=True)
+        if processo.returncode != 0:
+            raise ErroBackendC(f"O compilador C falhou:\n{processo.stderr.strip()}")
+        os.replace(temporario, caminho)
+    _cache_executaveis[chave] = caminho
+    return caminho
+
+
+class ProgramaC:
+    def __init__(self, instrucoes, entrada=None, saida=None, tipos=None, diretorio_cache=None, constantes=None):
+        """Mesma interface da MaquinaVirtual (entrada/saída plugáveis e tipos das variáveis)."""
+        self.fonte = GeradorC(instrucoes, tipos, constantes).gerar()
+        self.entrada = entrada or entrada_padrao
+        self.saida = saida or saida_padrao
+
+        inicio = time.perf_counter()
+        self.executavel = compilar_executavel(self.fonte, diretorio_cache)
+        self.tempo_compilacao = time.perf_counter() - inicio
+
+        self.tempo_execucao = 0.0       # Medido pelo próprio executável (sem criar o processo)
+        self.tempo_processo = 0.0
+
+    def executar(self):
+        inicio = time.perf_counter()
+        processo = subprocess.Popen([self.executavel], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    env=dict(os.environ, EMOJI_PROTOCOLO="1"))
+        erro = None
+        try:
+            for linha in processo.stdout:
+                marca, resto = linha[:1], linha[1:-1]
+                if marca == b"P":
+                    self.saida(processo.stdout.read(int(resto) + 1)[:-1].decode('utf-8', 'replace'))
+                elif marca == b"S":
+                    processo.stdin.write(self.entrada().encode('utf-8') + b"\n")
+                    processo.stdin.flush()
+                elif marca == b"E":
+                    erro = processo.stdout.read(int(resto) + 1)[:-1].decode('utf-8', 'replace')
+                elif marca == b"F":
+                    self.tempo_execucao = int(resto) / 1e9
+        except BaseException:
+            processo.kill()
+            raise
+        finally:
+            processo.stdin.close()
+            processo.wait()
+            self.tempo_processo = time.perf_counter() - inicio
+        if erro is not None:
+            raise ErroExecucao(erro)
+        if processo.returncode != 0:
+            raise ErroExecucao(f"O executável terminou com o código {processo.returncode}.")
+
+    def relatorio(self):
+        return (f"Backend C: executado em {self.tempo_execucao * 1000:.2f} ms "
+                f"({self.tempo_processo * 1000:.2f} ms com o processo); "
+                f"compilação {self.tempo_compilacao * 1000:.2f} ms "
+                f"(cache: {estatisticas_cache['acertos']} acertos, {estatisticas_cache['faltas']} faltas)")
+
+
+# ------ COMPARAÇÃO COM OS INTERPRETADORES ------
+
+def comparar_backends(instrucoes, entradas=(), tipos=None, repeticoes=3):
+    """
+    Executa o mesmo TAC na máquina virtual, no backend Python e no backend C,
+    confere se as saídas são iguais e devolve ({backend: melhor tempo}, saida).
+    """
+    from backend_python import ProgramaPython
+    resultados = {}
+    for nome, classe in (('vm', MaquinaVirtual), ('python', ProgramaPython), ('c', ProgramaC)):
+        melhor = None
+        for _ in range(repeticoes):
+            linhas = iter(entradas)
+            saida = []
+            programa = classe(instrucoes, entrada=lambda: next(linhas), saida=saida.append, tipos=tipos)
+            programa.executar()
+            if melhor is None or programa.tempo_execucao < melhor:
+                melhor = programa.tempo_execucao
+        resultados[nome] = (melhor, saida)
+
+    for nome in ('python', 'c'):
+        if resultados[nome][1] != resultados['vm'][1]:
+            raise ErroExecucao(f"As saídas da máquina virtual e do backend {nome} são diferentes.")
+    return {nome: tempo for nome, (tempo, _) in resultados.items()}, resultados['vm'][1]
+
+
+# --- Execução direta de um arquivo .tac ---
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(argumentos) < 1:
+        print("Uso correto: python backend_c.py <arquivo.tac> [entradas do SCAN...] "
+              "[--fonte] [--executavel] [--benchmark]")
+        sys.exit(1)
+
+    with open(argumentos[0], 'r', encoding='utf-8') as f:
+        programa_tac = ler_codigo(f.read())
+    entradas = argumentos[1:]
+    base = os.path.splitext(argumentos[0])[0]
+
+    try:
+        if "--fonte" in sys.argv or "--executavel" in sys.argv:
+            fonte = GeradorC(programa_tac).gerar()
+            with open(base + ".c", 'w', encoding='utf-8') as f:
+                f.write(fonte)
+            print(f"Arquivo gerado: {base}.c", file=sys.stderr)
+            if "--executavel" in sys.argv:
+                shutil.copy(compilar_executavel(fonte), base)
+                print(f"Executável gerado: {base}", file=sys.stderr)
+        elif "--benchmark" in sys.argv:
+            tempos, saida = comparar_backends(programa_tac, entradas)
+            print(f"Saídas idênticas ({len(saida)} linhas).")
+            for nome, titulo in (('vm', "Máquina virtual"), ('python', "Backend Python"), ('c', "Backend C")):
+                print(f"{titulo + ':':17}{tempos[nome] * 1000:.2f} ms")
+            if tempos['c'] > 0:
+                print(f"Aceleração do C: {tempos['vm'] / tempos['c']:.1f}x sobre a máquina virtual, "
+                      f"{tempos['python'] / tempos['c']:.1f}x sobre o backend Python")
+        else:
+            linhas = iter(entradas) if entradas else None
+            programa = ProgramaC(programa_tac, entrada=(lambda: next(linhas)) if linhas else None)
+            programa.executar()
+            print(programa.relatorio(), file=sys.stderr)
+    except ErroExecucao as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,465 @@
+import sys
+import os
+import time
+import hashlib
+import marshal
+import importlib.util
+
+from tac import (ROTULO, DESVIO, DESVIO_FALSO, COPIA, BINARIA, IMPRIME, LE,
+                 ler_instrucao, ler_codigo, formatar_instrucao, eh_constante, eh_temporario,
+                 valor_constante, dividir)
+from fluxo import GrafoFluxo
+from maquina_virtual import (MaquinaVirtual, ErroExecucao, VALORES_INICIAIS, entrada_padrao, saida_padrao,
+                             converter_entrada)
+
+"""
+Backend que traduz o TAC para código-fonte Python e o compila com compile().
+Os desvios gerados por visitar_if / visitar_while / visitar_for seguem
+padrões fixos, então a estrutura original é reconstruída a partir deles:
+    Lini: ... if_false c goto Lfim ... goto Lini  Lfim:   ->  while c: ...
+    if_false c goto Lelse ... goto Lfim  Lelse: ... Lfim:  ->  if c: ... else: ...
+Os desvios viram 'while', 'if', 'break' e 'continue' de verdade, e as
+variáveis viram variáveis locais de uma função (o acesso mais rápido do
+CPython). Se o TAC tiver desvios que não formam essas estruturas, o código
+é gerado como uma máquina de estados (emulação de goto), que é mais lenta.
+Os objetos de código compilados ficam em cache pelo hash da fonte Python.
+"""
+
+# Prefixo dos nomes no código gerado (evita conflito com palavras reservadas do Python)
+PREFIXO = "v_"
+
+OPS_ARITMETICOS = ('+', '-', '*')
+OPS_COMPARACAO = ('<', '>', '<=', '>=', '==', '!=')
+
+
+class NaoEstruturado(Exception):
+    """O TAC tem desvios que não correspondem a if/else ou laços aninhados."""
+    pass
+
+
+# ------ GERAÇÃO DA FONTE PYTHON ------
+
+class GeradorPython:
+    def __init__(self, instrucoes, tipos=None, constantes=None):
+        self.instrucoes = [ler_instrucao(i, constantes) if isinstance(i, str) else i for i in instrucoes]
+        self.tipos = tipos or {}
+        self.modo = None                # 'estruturado' ou 'máquina de estados'
+        self.linhas = []
+
+    def gerar(self):
+        """Devolve a fonte Python da função _programa equivalente ao TAC."""
+        try:
+            corpo = self._gerar_estruturado()
+            self.modo = 'estruturado'
+        except (NaoEstruturado, RecursionError):
+            corpo = self._gerar_maquina_estados()
+            self.modo = 'máquina de estados'
+        fonte = self._cabecalho() + corpo + self._rodape()
+        try:
+            compile(fonte, "<emoji>", "exec")
+        except (SyntaxError, RecursionError):
+            # Aninhamento além do limite do compilador do Python ("too many statically nested blocks")
+            if self.modo == 'máquina de estados':
+                raise
+            self.modo = 'máquina de estados'
+            fonte = self._cabecalho() + self._gerar_maquina_estados() + self._rodape()
+        return fonte
+
+    def _variaveis(self):
+        nomes = []
+        vistos = set()
+        for instr in self.instrucoes:
+            for nome in instr.usos() + [instr.definicao()]:
+                if nome is not None and not eh_constante(nome) and nome not in vistos:
+                    vistos.add(nome)
+                    nomes.append(nome)
+        return nomes
+
+    def _cabecalho(self):
+        linhas = ["def _programa(_ler, _escrever, _converter, _dividir):"]
+        # Todas as variáveis começam com o valor padrão do tipo (como na máquina virtual)
+        for nome in self._variaveis():
+            inicial = VALORES_INICIAIS.get(self.tipos.get(nome), 0)
+            linhas.append(f"    {PREFIXO}{nome} = {inicial!r}")
+        return "\n".join(linhas) + "\n"
+
+    def _rodape(self):
+        # Devolve o valor final das variáveis do programa (os temporários ficam de fora)
+        pares = ", ".join(f"{nome!r}: {PREFIXO}{nome}" for nome in self._variaveis()
+                          if not eh_temporario(nome))
+        return f"    return {{{pares}}}\n"
+
+    # ------ OPERANDOS E EXPRESSÕES ------
+
+    def _operando(self, operando):
+        if eh_constante(operando):
+            return repr(valor_constante(operando))
+        return PREFIXO + operando
+
+    def _valor(self, instr):
+        """Expressão Python com o valor de uma instrução BINARIA (booleanos como 0/1)."""
+        a, b, op = self._operando(instr.arg1), self._operando(instr.arg2), instr.op
+        if op in OPS_ARITMETICOS:
+            return f"{a} {op} {b}"
+        if op == '/':
+            return f"_dividir({a}, {b})"
+        if op in OPS_COMPARACAO:
+            return f"1 if {a} {op} {b} else 0"
+        if op == '&&':
+            return f"1 if {a} and {b} else 0"
+        if op == '||':
+            return f"1 if {a} or {b} else 0"
+        raise NaoEstruturado(f"Operador desconhecido '{op}'")
+
+    def _condicao(self, instr):
+        """Mesma expressão, mas para uso direto em if/while (sem converter para 0/1)."""
+        a, b, op = self._operando(instr.arg1), self._operando(instr.arg2), instr.op
+        if op in OPS_COMPARACAO or op in OPS_ARITMETICOS:
+            return f"{a} {op} {b}"
+        if op == '&&':
+            return f"{a} and {b}"
+        if op == '||':
+            return f"{a} or {b}"
+        return self._valor(instr)
+
+    def _comando(self, instr):
+        tipo = instr.tipo
+        if tipo == COPIA:
+            return f"{PREFIXO}{instr.dest} = {self._operando(instr.arg1)}"
+        if tipo == BINARIA:
+            return f"{PREFIXO}{instr.dest} = {self._valor(instr)}"
+        if tipo == IMPRIME:
+            return f"_escrever(str({self._operando(instr.arg1)}))"
+        if tipo == LE:
+            return f"{PREFIXO}{instr.dest} = _converter(_ler(), {instr.dest!r})"
+        raise NaoEstruturado(f"Instrução inesperada '{formatar_instrucao(instr)}'")
+
+    # ------ RECONSTRUÇÃO DA ESTRUTURA ------
+
+    def _gerar_estruturado(self):
+        instrucoes = self.instrucoes
+        self.posicao = {}
+        self.desvios_para = {}          # Rótulo -> posições dos 'goto' que apontam para ele
+        for i, instr in enumerate(instrucoes):
+            if instr.tipo == ROTULO:
+                self.posicao[instr.dest] = i
+            elif instr.tipo == DESVIO:
+                self.desvios_para.setdefault(instr.dest, []).append(i)
+
+        # Condições 'tX = a < b; if_false tX' em que tX morre no desvio podem ir direto no if/while
+        self.condicao_direta = set()
+        grafo = GrafoFluxo(instrucoes)
+        grafo.analisar_vivacidade()
+        for bloco in grafo.blocos:
+            if len(bloco.instrucoes) < 2:
+                continue
+            penultima, ultima = bloco.instrucoes[-2], bloco.instrucoes[-1]
+            if (ultima.tipo == DESVIO_FALSO and penultima.tipo == BINARIA
+                    and penultima.dest == ultima.arg1 and ultima.arg1 not in bloco.vivas_saida):
+                self.condicao_direta.add(id(penultima))
+
+        self.linhas = []
+        self._estruturar(0, len(instrucoes), 1, None)
+        if not self.linhas:
+            self.linhas.append("    pass")
+        return "\n".join(self.linhas) + "\n"
+
+    def _emitir(self, nivel, texto):
+        self.linhas.append("    " * nivel + texto)
+
+    def _estruturar(self, ini, fim, nivel, laco):
+        """
+        Traduz as instruções [ini, fim) no nível de indentação dado.
+        laco: (rótulo do início, rótulos de saída) do laço mais interno, ou None.
+        """
+        inicio_bloco = len(self.linhas)
+        instrucoes = self.instrucoes
+        i = ini
+        while i < fim:
+            instr = instrucoes[i]
+            tipo = instr.tipo
+
+            if tipo == ROTULO:
+                volta = [j for j in self.desvios_para.get(instr.dest, []) if i < j < fim]
+                if volta:
+                    i = self._gerar_laco(i, max(volta), nivel)
+                else:
+                    i += 1      # Ponto de junção de um if/else já tratado
+                continue
+
+            if tipo == BINARIA and id(instr) in self.condicao_direta:
+                i += 1          # A condição será escrita no próprio if_false seguinte
+                continue
+
+            if tipo == DESVIO_FALSO:
+                i = self._gerar_if(i, fim, nivel, laco)
+                continue
+
+            if tipo == DESVIO:
+                self._emitir_salto(i, fim, nivel, laco)
+                i += 1
+                continue
+
+            self._emitir(nivel, self._comando(instr))
+            i += 1
+
+        if len(self.linhas) == inicio_bloco:
+            self._emitir(nivel, "pass")
+
+    def _texto_condicao(self, i):
+        # Condição do if_false da posição i (usando a expressão da instrução anterior se possível)
+        salto = self.instrucoes[i]
+        anterior = self.instrucoes[i - 1] if i > 0 else None
+        if anterior is not None and id(anterior) in self.condicao_direta:
+            return self._condicao(anterior)
+        return self._operando(salto.arg1)
+
+    def _rotulos_a_partir(self, i):
+        rotulos = set()
+        while i < len(self.instrucoes) and self.instrucoes[i].tipo == ROTULO:
+            rotulos.add(self.instrucoes[i].dest)
+            i += 1
+        return rotulos
+
+    def _gerar_laco(self, i, j, nivel):
+        """Laço com início no rótulo da posição i e 'goto' de volta na posição j."""
+        laco = (self.instrucoes[i].dest, self._rotulos_a_partir(j + 1))
+        corpo = i + 1
+        primeira = self.instrucoes[corpo] if corpo < j else None
+        segunda = self.instrucoes[corpo + 1] if corpo + 1 < j else None
+
+        # Forma 'while c:' quando o laço começa testando a condição de saída
+        if (primeira is not None and primeira.tipo == DESVIO_FALSO and primeira.dest in laco[1]):
+            self._emitir(nivel, f"while {self._operando(primeira.arg1)}:")
+            corpo += 1
+        elif (segunda is not None and segunda.tipo == DESVIO_FALSO and segunda.dest in laco[1]
+                and id(primeira) in self.condicao_direta):
+            self._emitir(nivel, f"while {self._condicao(primeira)}:")
+            corpo += 2
+        else:
+            self._emitir(nivel, "while True:")
+
+        self._estruturar(corpo, j, nivel + 1, laco)
+        return j + 1
+
+    def _gerar_if(self, i, fim, nivel, laco):
+        salto = self.instrucoes[i]
+        condicao = self._texto_condicao(i)
+
+        # if_false para a saída/início do laço: 'break'/'continue' condicional
+        if laco is not None and (salto.dest in laco[1] or salto.dest == laco[0]):
+            self._emitir(nivel, f"if not ({condicao}):")
+            self._emitir(nivel + 1, "break" if salto.dest in laco[1] else "continue")
+            return i + 1
+
+        k = self.posicao.get(salto.dest)
+        if k is None or not (i < k <= fim):
+            raise NaoEstruturado(f"Desvio não estruturado '{formatar_instrucao(salto)}'")
+
+        # if/else: o bloco verdadeiro termina com 'goto Lfim' para depois do else
+        ultima = self.instrucoes[k - 1]
+        if ultima.tipo == DESVIO and not self._eh_controle_laco(ultima.dest, laco):
+            m = self.posicao.get(ultima.dest)
+            if m is not None and k < m <= fim:
+                self._emitir(nivel, f"if {condicao}:")
+                self._estruturar(i + 1, k - 1, nivel + 1, laco)
+                inicio_else = len(self.linhas)
+                self._emitir(nivel, "else:")
+                self._estruturar(k + 1, m, nivel + 1, laco)
+                if self.linhas[inicio_else + 1:] == ["    " * (nivel + 1) + "pass"]:
+                    del self.linhas[inicio_else:]       # else vazio
+                return m
+
+        self._emitir(nivel, f"if {condicao}:")
+        self._estruturar(i + 1, k, nivel + 1, laco)
+        return k
+
+    def _eh_controle_laco(self, rotulo, laco):
+        return laco is not None and (rotulo in laco[1] or rotulo == laco[0])
+
+    def _emitir_salto(self, i, fim, nivel, laco):
+        destino = self.instrucoes[i].dest
+        if laco is not None and destino in laco[1]:
+            self._emitir(nivel, "break")
+            return
+        if laco is not None and destino == laco[0]:
+            self._emitir(nivel, "continue")
+            return
+        # 'goto' para o fim da própria região (só rótulos no caminho) não faz nada
+        k = self.posicao.get(destino)
+        if k is not None and i < k <= fim and all(
+                self.instrucoes[x].tipo == ROTULO for x in range(i + 1, min(k, fim))):
+            return
+        raise NaoEstruturado(f"Desvio não estruturado '{formatar_instrucao(self.instrucoes[i])}'")
+
+    # ------ ALTERNATIVA: MÁQUINA DE ESTADOS ------
+
+    def _gerar_maquina_estados(self):
+        """Cada bloco básico vira um estado; '_pc' guarda o bloco atual."""
+        grafo = GrafoFluxo(self.instrucoes)
+        blocos = grafo.blocos
+        indice = {b.rotulo: b.indice for b in blocos if b.rotulo is not None}
+        linhas = ["    _pc = 0", "    while True:"]
+        for bloco in blocos:
+            linhas.append(f"        {'if' if bloco.indice == 0 else 'elif'} _pc == {bloco.indice}:")
+            seguinte = bloco.indice + 1
+            salto = None
+            for instr in bloco.instrucoes:
+                if instr.tipo == ROTULO:
+                    continue
+                if instr.tipo in (DESVIO, DESVIO_FALSO):
+                    salto = instr
+                    continue
+                linhas.append(f"            {self._comando(instr)}")
+            if salto is None:
+                linhas.append(f"            _pc = {seguinte}")
+            elif salto.tipo == DESVIO:
+                linhas.append(f"            _pc = {indice[salto.dest]}")
+            else:
+                linhas.append(f"            _pc = {seguinte} if {self._operando(salto.arg1)} "
+                              f"else {indice[salto.dest]}")
+        linhas.append("        else:")
+        linhas.append("            break")
+        return "\n".join(linhas) + "\n"
+
+
+# ------ COMPILAÇÃO COM CACHE ------
+
+_cache_codigo = {}                      # sha256 da fonte Python -> objeto de código
+estatisticas_cache = {'acertos': 0, 'faltas': 0}
+
+
+def compilar_fonte(fonte, diretorio_cache=None):
+    """
+    Compila a fonte Python gerada, reaproveitando objetos de código já
+    compilados (em memória e, se diretorio_cache for dado, em disco via marshal).
+    """
+    chave = hashlib.sha256(fonte.encode('utf-8')).hexdigest()
+    codigo = _cache_codigo.get(chave)
+    if codigo is not None:
+        estatisticas_cache['acertos'] += 1
+        return codigo
+
+    caminho = None
+    if diretorio_cache:
+        caminho = os.path.join(diretorio_cache, chave + ".emojipyc")
+        try:
+            with open(caminho, 'rb') as f:
+                dados = f.read()
+            # O formato do marshal muda entre versões do Python: confere o número mágico
+            if dados[:len(importlib.util.MAGIC_NUMBER)] == importlib.util.MAGIC_NUMBER:
+                codigo = marshal.loads(dados[len(importlib.util.MAGIC_NUMBER):])
+        except (OSError, ValueError, EOFError):
+            codigo = None
+
+    if codigo is None:
+        estatisticas_cache['faltas'] += 1
+        codigo = compile(fonte, f"<emoji {chave[:12]}>", "exec")
+        if caminho is not None:
+            os.makedirs(diretorio_cache, exist_ok=True)
+            temporario = f"{caminho}.{os.getpid()}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(importlib.util.MAGIC_NUMBER + marshal.dumps(codigo))
+            os.replace(temporario, caminho)
+    else:
+        estatisticas_cache['acertos'] += 1
+
+    _cache_codigo[chave] = codigo
+    return codigo
+
+
+class ProgramaPython:
+    def __init__(self, instrucoes, entrada=None, saida=None, tipos=None, diretorio_cache=None, constantes=None):
+        """Mesma interface da MaquinaVirtual (entrada/saída plugáveis e tipos das variáveis)."""
+        gerador = GeradorPython(instrucoes, tipos, constantes)
+        self.fonte = gerador.gerar()
+        self.modo = gerador.modo
+        self.entrada = entrada or entrada_padrao
+        self.saida = saida or saida_padrao
+        self.tipos = tipos or {}
+
+        inicio = time.perf_counter()
+        codigo = compilar_fonte(self.fonte, diretorio_cache)
+        escopo = {}
+        exec(codigo, escopo)
+        self._funcao = escopo['_programa']
+        self.tempo_compilacao = time.perf_counter() - inicio
+
+        self.variaveis = {}
+        self.tempo_execucao = 0.0
+
+    def executar(self):
+        inicio = time.perf_counter()
+        try:
+            # O SCAN usa as mesmas regras de conversão da máquina virtual
+            tipos = self.tipos
+            self.variaveis = self._funcao(self.entrada, self.saida,
+                                          lambda linha, nome: converter_entrada(linha, nome, tipos), dividir)
+        except (TypeError, ZeroDivisionError) as e:
+            raise ErroExecucao(f"Erro de execução: {e}") from None
+        finally:
+            self.tempo_execucao = time.perf_counter() - inicio
+
+    def valor(self, nome):
+        return self.variaveis.get(nome)
+
+    def relatorio(self):
+        return (f"Backend Python ({self.modo}): executado em {self.tempo_execucao * 1000:.2f} ms; "
+                f"compilação {self.tempo_compilacao * 1000:.2f} ms "
+                f"(cache: {estatisticas_cache['acertos']} acertos, {estatisticas_cache['faltas']} faltas)")
+
+
+# ------ COMPARAÇÃO COM A MÁQUINA VIRTUAL ------
+
+def comparar_com_maquina_virtual(instrucoes, entradas=(), tipos=None, repeticoes=3):
+    """
+    Executa o mesmo TAC na máquina virtual e no backend Python, confere se as
+    saídas são iguais e devolve (melhor_tempo_vm, melhor_tempo_python, saida).
+    """
+    resultados = {}
+    for nome, classe in (('vm', MaquinaVirtual), ('python', ProgramaPython)):
+        melhor = None
+        for _ in range(repeticoes):
+            linhas = iter(entradas)
+            saida = []
+            programa = classe(instrucoes, entrada=lambda: next(linhas), saida=saida.append, tipos=tipos)
+            programa.executar()
+            if melhor is None or programa.tempo_execucao < melhor:
+                melhor = programa.tempo_execucao
+        resultados[nome] = (melhor, saida)
+
+    if resultados['vm'][1] != resultados['python'][1]:
+        raise ErroExecucao("As saídas da máquina virtual e do backend Python são diferentes.")
+    return resultados['vm'][0], resultados['python'][0], resultados['vm'][1]
+
+
+# --- Execução direta de um arquivo .tac ---
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(argumentos) < 1:
+        print("Uso correto: python backend_python.py <arquivo.tac> [entradas do SCAN...] "
+              "[--mostrar-fonte] [--benchmark]")
+        sys.exit(1)
+
+    with open(argumentos[0], 'r', encoding='utf-8') as f:
+        programa_tac = ler_codigo(f.read())
+    entradas = argumentos[1:]
+
+    try:
+        if "--benchmark" in sys.argv:
+            tempo_vm, tempo_py, saida = comparar_com_maquina_virtual(programa_tac, entradas)
+            print(f"Saídas idênticas ({len(saida)} linhas).")
+            print(f"Máquina virtual: {tempo_vm * 1000:.2f} ms")
+            print(f"Backend Python:  {tempo_py * 1000:.2f} ms")
+            if tempo_py > 0:
+                print(f"Aceleração: {tempo_vm / tempo_py:.1f}x")
+        else:
+            linhas = iter(entradas) if entradas else None
+            programa = ProgramaPython(programa_tac, entrada=(lambda: next(linhas)) if linhas else None)
+            if "--mostrar-fonte" in sys.argv:
+                print(programa.fonte, file=sys.stderr)
+            programa.executar()
+            print(programa.relatorio(), file=sys.stderr)
+    except ErroExecucao as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,373 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from compilacao import compilar_programa, OpcoesCompilacao
+from instrumentacao import Perfil
+from cache_compilacao import versao_compilador
+
+"""
+Benchmark do compilador: gera programas E-moji sintéticos a partir da
+gramática (tamanho, profundidade de aninhamento, tamanho das expressões e
+quantidade de identificadores configuráveis), mede cada etapa em vários
+tamanhos e estima o expoente de crescimento de cada uma (tempo ~ tokens^k).
+Etapas com k acima do limite são apontadas como super-lineares.
+
+Os resultados podem ser salvos em JSON e comparados com uma execução
+anterior (--base): etapas que ficaram mais lentas por token do que a
+tolerância são apontadas como regressões (código de saída 1).
+
+    python benchmark.py --tamanhos 1e3,1e4,1e5 --salvar base.json
+    python benchmark.py --tamanhos 1e3,1e4,1e5 --base base.json
+
+Com --inicializacao, mede o custo de partida da linha de comando
+('compilador.py --version' e a compilação de um programa trivial) contra
+um orçamento, com as importações mais caras segundo o -X importtime:
+
+    python benchmark.py --inicializacao
+"""
+
+TAMANHOS_PADRAO = "1e3,1e4,1e5"
+LIMITE_EXPOENTE = 1.2       # Acima disso a etapa cresce de forma super-linear
+TOLERANCIA = 0.20           # Regressão: mais de 20% mais lento por token que a base
+TEMPO_MINIMO = 0.002        # Medições abaixo disso (s) são ruído demais para comparar
+
+COMPILADOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "compilador.py")
+# Orçamentos de partida, em ms além do interpretador vazio (python -c pass)
+ORCAMENTO_VERSAO = 35           # python compilador.py --version
+ORCAMENTO_TRIVIAL = 50          # python compilador.py <PROGRAMA_TRIVIAL>
+PROGRAMA_TRIVIAL = "🔢 a;\na 🎁 1;\n👄(a);\n"
+
+OPS_ADITIVOS = ('➕', '➖')
+OPS_RELACIONAIS = ('🐣', '🐓', '🥚')
+
+
+# ------ GERADOR DE PROGRAMAS ------
+
+class GeradorProgramas:
+    """
+    Gera programas válidos (léxica, sintática e semanticamente) seguindo as
+    produções da gramática: declarações de variáveis inteiras seguidas de
+    comandos (atribuição, saída, if/else, while e for) aninhados até a
+    profundidade pedida.
+    """
+    def __init__(self, profundidade=3, tamanho_expressao=4, identificadores=20, semente=0):
+        self.profundidade = profundidade
+        self.tamanho_expressao = max(1, tamanho_expressao)
+        self.nomes = [f"v{i}" for i in range(max(1, identificadores))]
+        self.aleatorio = random.Random(semente)
+        self.partes = []
+        self.tokens = 0
+
+    def gerar(self, tokens_alvo):
+        """Texto de um programa com aproximadamente 'tokens_alvo' tokens."""
+        self.partes, self.tokens = [], 0
+        for nome in self.nomes:
+            self._emitir("🔢", nome, ";\n")
+        while self.tokens < tokens_alvo:
+            self._comando(0, "")
+        return "".join(self.partes)
+
+    def _emitir(self, *lexemas):
+        # Cada lexema conta como um token, menos espaços e quebras de linha soltos
+        for lexema in lexemas:
+            self.partes.append(lexema)
+            if lexema.strip():
+                self.partes.append(" ")
+                self.tokens += 1
+
+    def _comando(self, nivel, recuo):
+        sorteio = self.aleatorio.random()
+        self.partes.append(recuo)
+        if nivel >= self.profundidade or sorteio < 0.55:
+            self._emitir(self.aleatorio.choice(self.nomes), "🎁")
+            self._expressao(0)
+            self._emitir(";", "\n")
+        elif sorteio < 0.65:
+            self._emitir("👄", "(", self.aleatorio.choice(self.nomes), ")", ";", "\n")
+        elif sorteio < 0.80:
+            self._emitir("🤨", "(")
+            self._condicao()
+            self._emitir(")", "🤜", "\n")
+            self._bloco(nivel + 1, recuo)
+            if self.aleatorio.random() < 0.5:
+                self._emitir("🖖", "🤜", "\n")
+                self._bloco(nivel + 1, recuo)
+        elif sorteio < 0.90:
+            self._emitir("😑", "(")
+            self._condicao()
+            self._emitir(")", "🤜", "\n")
+            self._bloco(nivel + 1, recuo)
+        else:
+            contador = self.aleatorio.choice(self.nomes)
+            limite = self.aleatorio.randint(1, 100)
+            self._emitir("😮", "(", contador, "🎁", "0", ";", contador, "🐣", str(limite), ";",
+                         contador, "🎁", contador, "➕", "1", ")", "🤜", "\n")
+            self._bloco(nivel + 1, recuo)
+
+    def _bloco(self, nivel, recuo):
+        for _ in range(self.aleatorio.randint(1, 4)):
+            self._comando(nivel, recuo + "    ")
+        self.partes.append(recuo)
+        self._emitir("🤛", "\n")
+
+    def _condicao(self):
+        # INT (op_relacional) TERMO: o último operador define o tipo BOOL
+        self._expressao(0)
+        self._emitir(self.aleatorio.choice(OPS_RELACIONAIS))
+        self._termo(0)
+
+    def _expressao(self, aninhamento):
+        self._termo(aninhamento)
+        for _ in range(self.aleatorio.randint(0, self.tamanho_expressao - 1)):
+            self._emitir(self.aleatorio.choice(OPS_ADITIVOS))
+            self._termo(aninhamento)
+
+    def _termo(self, aninhamento):
+        self._fator(aninhamento)
+        if self.aleatorio.random() < 0.3:
+            if self.aleatorio.random() < 0.5:
+                self._emitir("✖️")
+                self._fator(aninhamento)
+            else:
+                self._emitir("➗", str(self.aleatorio.randint(1, 9)))   # Divisor literal e não nulo
+
+    def _fator(self, aninhamento):
+        sorteio = self.aleatorio.random()
+        if aninhamento < 2 and sorteio < 0.1:
+            self._emitir("(")
+            self._expressao(aninhamento + 1)
+            self._emitir(")")
+        elif sorteio < 0.6:
+            self._emitir(self.aleatorio.choice(self.nomes))
+        else:
+            self._emitir(str(self.aleatorio.randint(0, 999)))
+
+
+# ------ MEDIÇÃO ------
+
+def medir_programa(texto, otimizar=False, repeticoes=3):
+    """Menor tempo de cada etapa (s) em 'repeticoes' compilações, e a quantidade de tokens."""
+    melhores = {}
+    tokens = 0
+    for _ in range(repeticoes):
+        perfil = Perfil(memoria=False)
+        resultado = compilar_programa(texto, OpcoesCompilacao(otimizar=otimizar, guardar_arvore=False,
+                                                              perfil=perfil))
+        if not resultado.sucesso:
+            raise RuntimeError(f"Programa gerado não compilou: {resultado.erros[:3]}")
+        tokens = len(resultado.tokens)
+        total = 0.0
+        for medicao in perfil.medicoes:
+            etapa, tempo = medicao['etapa'], medicao['tempo']
+            total += tempo
+            melhores[etapa] = min(tempo, melhores.get(etapa, tempo))
+        melhores['total'] = min(total, melhores.get('total', total))
+        del resultado
+    return tokens, melhores
+
+
+def expoente_crescimento(pontos):
+    """Inclinação da reta (mínimos quadrados) de log(tempo) x log(tokens)."""
+    pontos = [(math.log(n), math.log(t)) for n, t in pontos if n > 0 and t >= TEMPO_MINIMO]
+    if len(pontos) < 2:
+        return None
+    media_x = sum(x for x, _ in pontos) / len(pontos)
+    media_y = sum(y for _, y in pontos) / len(pontos)
+    variancia = sum((x - media_x) ** 2 for x, _ in pontos)
+    if variancia == 0:
+        return None
+    return sum((x - media_x) * (y - media_y) for x, y in pontos) / variancia
+
+
+def executar_benchmark(tamanhos, gerador_params, otimizar=False, repeticoes=3, mostrar=print):
+    medicoes = []
+    for alvo in tamanhos:
+        texto = GeradorProgramas(**gerador_params).gerar(alvo)
+        tokens, tempos = medir_programa(texto, otimizar, repeticoes)
+        medicoes.append({'tamanho_alvo': alvo, 'tokens': tokens, 'etapas': tempos})
+        resumo = ", ".join(f"{etapa} {tempo * 1000:.1f} ms" for etapa, tempo in tempos.items())
+        mostrar(f"{tokens:>10} tokens: {resumo}")
+
+    etapas = medicoes[0]['etapas'].keys() if medicoes else []
+    expoentes = {etapa: expoente_crescimento([(m['tokens'], m['etapas'][etapa]) for m in medicoes])
+                 for etapa in etapas}
+    return {
+        'versao_compilador': versao_compilador(),
+        'python': platform.python_version(),
+        'parametros': dict(gerador_params, otimizar=otimizar, repeticoes=repeticoes),
+        'medicoes': medicoes,
+        'expoentes': expoentes,
+    }
+
+
+def super_lineares(resultados, limite=LIMITE_EXPOENTE):
+    return {etapa: k for etapa, k in resultados['expoentes'].items() if k is not None and k > limite}
+
+
+def comparar_com_base(resultados, base, tolerancia=TOLERANCIA):
+    """
+    Lista de regressões (tamanho_alvo, etapa, ns/token da base, ns/token atual),
+    comparando as medições de mesmo tamanho alvo.
+    """
+    por_tamanho = {m['tamanho_alvo']: m for m in base.get('medicoes', [])}
+    regressoes = []
+    for atual in resultados['medicoes']:
+        anterior = por_tamanho.get(atual['tamanho_alvo'])
+        if anterior is None:
+            continue
+        for etapa, tempo in atual['etapas'].items():
+            tempo_base = anterior['etapas'].get(etapa)
+            if tempo_base is None or max(tempo, tempo_base) < TEMPO_MINIMO:
+                continue
+            ns_atual = tempo * 1e9 / atual['tokens']
+            ns_base = tempo_base * 1e9 / anterior['tokens']
+            if ns_atual > ns_base * (1 + tolerancia):
+                regressoes.append((atual['tamanho_alvo'], etapa, ns_base, ns_atual))
+    return regressoes
+
+
+# ------ INICIALIZAÇÃO (--inicializacao) ------
+
+def _ambiente_bytecode():
+    # Mede com o bytecode (.pyc) em cache, como numa instalação normal, mesmo
+    # que o ambiente atual desligue a escrita dos .pyc
+    ambiente = dict(os.environ)
+    ambiente.pop("PYTHONDONTWRITEBYTECODE", None)
+    return ambiente
+
+
+def tempo_processo(comando, pasta, repeticoes):
+    """Menor tempo de parede (s) do comando em 'repeticoes' execuções (a primeira só aquece)."""
+    ambiente = _ambiente_bytecode()
+    tempos = []
+    for _ in range(repeticoes + 1):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=pasta, env=ambiente, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos[1:])
+
+
+def importacoes_caras(comando, pasta, quantidade=8):
+    """Módulos importados diretamente pelo programa, do mais caro ao mais barato (-X importtime, em ms)."""
+    processo = subprocess.run([comando[0], "-X", "importtime"] + comando[1:], cwd=pasta,
+                              env=_ambiente_bytecode(), capture_output=True, text=True, check=False)
+    modulos = []
+    for linha in processo.stderr.splitlines():
+        partes = linha.split("|")
+        if not linha.startswith("import time:") or len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nome = partes[2].rstrip()
+        if nome.startswith(" ") and not nome.startswith("  "):      # Só o primeiro nível
+            modulos.append((nome.strip(), int(partes[1]) / 1000))
+    return sorted(modulos, key=lambda m: -m[1])[:quantidade]
+
+
+def benchmark_inicializacao(repeticoes, orcamentos, mostrar=print):
+    """Mede a partida da linha de comando. Retorna os resultados e a lista de orçamentos estourados."""
+    with tempfile.TemporaryDirectory() as pasta:
+        with open(os.path.join(pasta, "trivial.emoji"), 'w', encoding='utf-8') as f:
+            f.write(PROGRAMA_TRIVIAL)
+        casos = {'versao': [sys.executable, COMPILADOR, "--version"],
+                 'trivial': [sys.executable, COMPILADOR, "trivial.emoji"]}
+        interpretador = tempo_processo([sys.executable, "-c", "pass"], pasta, repeticoes)
+        resultados = {'interpretador_ms': interpretador * 1000, 'casos': {}}
+        estourados = []
+        mostrar(f"Interpretador vazio (python -c pass): {interpretador * 1000:.1f} ms\n")
+        for nome, comando in casos.items():
+            tempo = tempo_processo(comando, pasta, repeticoes) * 1000
+            extra = tempo - interpretador * 1000
+            importacoes = importacoes_caras(comando, pasta)
+            resultados['casos'][nome] = {'ms': tempo, 'extra_ms': extra, 'orcamento_ms': orcamentos[nome],
+                                         'importacoes': dict(importacoes)}
+            marca = "✅" if extra <= orcamentos[nome] else "❌"
+            if extra > orcamentos[nome]:
+                estourados.append(nome)
+            mostrar(f"{marca} compilador.py {' '.join(comando[2:])}: {tempo:.1f} ms, {extra:.1f} ms além do "
+                    f"interpretador (orçamento {orcamentos[nome]:.0f} ms)")
+            mostrar("   " + ", ".join(f"{modulo} {ms:.1f}" for modulo, ms in importacoes) + " (ms, -X importtime)")
+    return resultados, estourados
+
+
+# --- Execução direta ---
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidade do compilador E-moji.")
+    parser.add_argument("--tamanhos", default=TAMANHOS_PADRAO,
+                        help=f"tamanhos alvo em tokens, separados por vírgula (padrão: {TAMANHOS_PADRAO}; "
+                             "aceita até 1e7, limitado pela memória da árvore sintática)")
+    parser.add_argument("--profundidade", type=int, default=3, help="aninhamento máximo de blocos")
+    parser.add_argument("--expressao", type=int, default=4, help="termos por expressão (máximo)")
+    parser.add_argument("--identificadores", type=int, default=20, help="variáveis declaradas")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=None,
+                        help="execuções por medição, vale a menor (padrão: 3; 10 no --inicializacao)")
+    parser.add_argument("-O", dest="otimizar", action="store_true", help="inclui a etapa de otimização")
+    parser.add_argument("--salvar", metavar="ARQ", help="grava os resultados em JSON")
+    parser.add_argument("--base", metavar="ARQ", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--limite-expoente", type=float, default=LIMITE_EXPOENTE)
+    parser.add_argument("--inicializacao", action="store_true",
+                        help="mede a partida da linha de comando (--version e compilação trivial) contra o "
+                             "orçamento, em ms além do interpretador vazio")
+    parser.add_argument("--orcamento-versao", type=float, default=ORCAMENTO_VERSAO, metavar="MS")
+    parser.add_argument("--orcamento-trivial", type=float, default=ORCAMENTO_TRIVIAL, metavar="MS")
+    parser.add_argument("--gerar", metavar="ARQ",
+                        help="só grava um programa gerado com o primeiro tamanho em ARQ e sai")
+    args = parser.parse_args()
+
+    tamanhos = [int(float(t)) for t in args.tamanhos.split(",") if t.strip()]
+    params = {'profundidade': args.profundidade, 'tamanho_expressao': args.expressao,
+              'identificadores': args.identificadores, 'semente': args.semente}
+
+    if args.inicializacao:
+        resultados, estourados = benchmark_inicializacao(
+            args.repeticoes or 10, {'versao': args.orcamento_versao, 'trivial': args.orcamento_trivial})
+        if args.salvar:
+            with open(args.salvar, 'w', encoding='utf-8') as f:
+                json.dump(resultados, f, indent=2, ensure_ascii=False)
+        return 1 if estourados else 0
+
+    if args.gerar:
+        with open(args.gerar, 'w', encoding='utf-8') as f:
+            f.write(GeradorProgramas(**params).gerar(tamanhos[0]))
+        print(f"Programa gerado: {args.gerar}")
+        return 0
+
+    resultados = executar_benchmark(tamanhos, params, args.otimizar, args.repeticoes or 3)
+
+    print("\nExpoente de crescimento (tempo ~ tokens^k):")
+    for etapa, k in resultados['expoentes'].items():
+        marca = "  ⚠️  super-linear" if k is not None and k > args.limite_expoente else ""
+        print(f"   {etapa:<18} k = {'-' if k is None else f'{k:.2f}'}{marca}")
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.salvar}")
+
+    codigo = 0
+    if args.base:
+        with open(args.base, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        regressoes = comparar_com_base(resultados, base, args.tolerancia)
+        if regressoes:
+            codigo = 1
+            print(f"\n❌ {len(regressoes)} regressão(ões) em relação a {args.base}:")
+            for alvo, etapa, ns_base, ns_atual in regressoes:
+                print(f"   - {alvo} tokens, {etapa}: {ns_base:.0f} -> {ns_atual:.0f} ns/token "
+                      f"(+{100 * (ns_atual / ns_base - 1):.0f}%)")
+        else:
+            print(f"\n✅ Sem regressões em relação a {args.base} (tolerância {100 * args.tolerancia:.0f}%)")
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
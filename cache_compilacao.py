@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+
+"""
+Cache persistente da compilação, endereçado pelo conteúdo. A chave é o hash
+do código fonte + versão do compilador + opções; a entrada guarda o resultado
+completo (tokens do .emojilex, TAC, instruções, tipos e diagnósticos), então
+um acerto dispensa as análises léxica, sintática e semântica.
+
+    - Escritas atômicas (arquivo temporário + os.replace): vários processos
+      podem compilar ao mesmo tempo sem ler uma entrada pela metade.
+    - Tamanho limitado com descarte LRU: o horário de modificação de cada
+      entrada é renovado a cada acerto e as mais antigas saem primeiro.
+"""
+
+DIRETORIO_PADRAO = os.path.join(os.path.expanduser("~"), ".cache", "emoji-compilador")
+LIMITE_PADRAO = 64 * 1024 * 1024        # Bytes
+# (hashlib e tempfile são importados só quando o cache é usado: o compilador.py
+# importa este módulo em toda execução, por causa dos padrões da linha de comando)
+EXTENSAO = ".emojicache"
+ARQUIVO_ESTATISTICAS = "estatisticas.json"
+
+# Módulos cujo código define o resultado da compilação: alterar qualquer um
+# deles muda a versão do compilador e invalida as entradas antigas
+MODULOS_COMPILADOR = ("analise_lexica.py", "AnalisadorSintatico.py", "semantico.py", "traducao_direta.py",
+                      "tac.py", "fluxo.py", "otimizador.py", "compilacao.py", "compilacao_separada.py",
+                      "compilador.py")
+
+_versao = None
+
+
+def versao_compilador():
+    """Impressão digital (hash) do código dos módulos do compilador."""
+    global _versao
+    if _versao is None:
+        import hashlib
+        h = hashlib.sha256()
+        pasta = os.path.dirname(os.path.abspath(__file__))
+        for nome in MODULOS_COMPILADOR:
+            h.update(nome.encode('utf-8'))
+            with open(os.path.join(pasta, nome), 'rb') as f:
+                h.update(f.read())
+        _versao = h.hexdigest()[:16]
+    return _versao
+
+
+def escrever_atomico(caminho, dados):
+    """Grava os bytes em um temporário no mesmo diretório e o renomeia por cima do destino."""
+    import tempfile
+    fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dados)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+class CacheCompilacao:
+    def __init__(self, diretorio=None, limite=LIMITE_PADRAO):
+        self.diretorio = diretorio or DIRETORIO_PADRAO
+        self.limite = limite
+
+    def chave(self, fonte, opcoes):
+        import hashlib
+        h = hashlib.sha256()
+        h.update(versao_compilador().encode('utf-8'))
+        h.update(json.dumps(opcoes, sort_keys=True).encode('utf-8'))
+        h.update(b"\0")
+        h.update(fonte.encode('utf-8'))
+        return h.hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    def obter(self, chave):
+        """Entrada guardada para a chave, ou None (falta)."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+            os.utime(caminho)       # Marca o uso para o descarte LRU
+        except FileNotFoundError:
+            self._contar('faltas')
+            return None
+        except (OSError, ValueError):
+            # Entrada corrompida ou removida no meio da leitura: vale como falta
+            self._contar('faltas')
+            return None
+        self._contar('acertos')
+        return entrada
+
+    def guardar(self, chave, entrada):
+        os.makedirs(self.diretorio, exist_ok=True)
+        dados = json.dumps(entrada, ensure_ascii=False).encode('utf-8')
+        escrever_atomico(self._caminho(chave), dados)
+        self.descartar_excedente()
+
+    # ------ DESCARTE LRU ------
+
+    def _entradas(self):
+        """Lista (horário_de_uso, tamanho, caminho) de cada entrada do cache."""
+        entradas = []
+        try:
+            nomes = os.listdir(self.diretorio)
+        except FileNotFoundError:
+            return entradas
+        for nome in nomes:
+            if not nome.endswith(EXTENSAO):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                info = os.stat(caminho)
+            except FileNotFoundError:
+                continue        # Descartada por outro processo
+            entradas.append((info.st_mtime, info.st_size, caminho))
+        return entradas
+
+    def descartar_excedente(self):
+        """Remove as entradas usadas há mais tempo até o cache caber no limite."""
+        entradas = self._entradas()
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        removidas = 0
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite:
+                break
+            try:
+                os.remove(caminho)
+                removidas += 1
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+        if removidas:
+            self._contar('descartadas', removidas)
+        return removidas
+
+    # ------ ESTATÍSTICAS ------
+
+    def _ler_contadores(self):
+        try:
+            with open(os.path.join(self.diretorio, ARQUIVO_ESTATISTICAS), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _contar(self, campo, n=1):
+        # Com vários processos ao mesmo tempo, alguns incrementos podem se perder:
+        # os contadores são informativos, nunca afetam o resultado da compilação
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            contadores = self._ler_contadores()
+            contadores[campo] = contadores.get(campo, 0) + n
+            escrever_atomico(os.path.join(self.diretorio, ARQUIVO_ESTATISTICAS),
+                             json.dumps(contadores).encode('utf-8'))
+        except OSError:
+            pass
+
+    def estatisticas(self):
+        entradas = self._entradas()
+        contadores = self._ler_contadores()
+        return {
+            'diretorio': self.diretorio,
+            'entradas': len(entradas),
+            'bytes': sum(tamanho for _, tamanho, _ in entradas),
+            'limite': self.limite,
+            'acertos': contadores.get('acertos', 0),
+            'faltas': contadores.get('faltas', 0),
+            'descartadas': contadores.get('descartadas', 0),
+            'versao': versao_compilador(),
+        }
+
+    def relatorio(self):
+        e = self.estatisticas()
+        consultas = e['acertos'] + e['faltas']
+        taxa = 100.0 * e['acertos'] / consultas if consultas else 0.0
+        return "\n".join([
+            f"Cache de compilação: {e['diretorio']}",
+            f"   Entradas: {e['entradas']} ({e['bytes'] / 1024:.1f} KiB de {e['limite'] / 1024:.0f} KiB)",
+            f"   Acertos: {e['acertos']} | Faltas: {e['faltas']} | Taxa de acerto: {taxa:.1f}%",
+            f"   Entradas descartadas (LRU): {e['descartadas']}",
+            f"   Versão do compilador: {e['versao']}",
+        ])
+
+
+# --- Execução direta: mostra as estatísticas do cache ---
+if __name__ == "__main__":
+    print(CacheCompilacao(sys.argv[1] if len(sys.argv) > 1 else None).relatorio())
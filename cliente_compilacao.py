@@ -0,0 +1,100 @@
+import io
+import os
+import sys
+import json
+import socket
+import struct
+
+"""
+Cliente do servidor de compilação (ver servidor_compilacao.py). Substitui
+'python compilador.py ...' com os mesmos argumentos: o pedido vai pelo
+socket Unix para o servidor, que já está com o compilador carregado, e a
+saída volta para este terminal. Se o servidor não estiver rodando, o
+compilador é executado aqui mesmo, do jeito normal; o mesmo vale para
+--executar com a entrada vindo do terminal, que precisa ser lida aos poucos.
+
+Este módulo só importa a biblioteca padrão: carregar o compilador é
+justamente o custo que o servidor evita.
+
+Protocolo: cada mensagem é um quadro com 4 bytes de tamanho (big-endian)
+seguidos de um objeto JSON em UTF-8.
+    pedido:   {"acao": "compilar", "argv": [...], "cwd": "...", "entrada": "..."}
+              {"acao": "parar"}
+    resposta: {"saida": "...", "erros": "...", "codigo": 0}
+"""
+
+TAMANHO_MAXIMO = 256 * 1024 * 1024      # Maior quadro aceito (bytes)
+_CABECALHO = struct.Struct("!I")
+
+
+def caminho_socket_padrao():
+    return os.environ.get("EMOJI_SOCKET") or f"/tmp/emoji-compilador-{os.getuid()}.sock"
+
+
+def enviar_quadro(conexao, mensagem):
+    dados = json.dumps(mensagem, ensure_ascii=False).encode('utf-8')
+    conexao.sendall(_CABECALHO.pack(len(dados)) + dados)
+
+
+def _receber_exato(conexao, n):
+    partes = []
+    while n:
+        parte = conexao.recv(min(n, 1 << 20))
+        if not parte:
+            raise ConnectionError("Conexão encerrada no meio de um quadro.")
+        partes.append(parte)
+        n -= len(parte)
+    return b"".join(partes)
+
+
+def receber_quadro(conexao):
+    tamanho, = _CABECALHO.unpack(_receber_exato(conexao, _CABECALHO.size))
+    if tamanho > TAMANHO_MAXIMO:
+        raise ConnectionError(f"Quadro de {tamanho} bytes excede o limite do protocolo.")
+    return json.loads(_receber_exato(conexao, tamanho).decode('utf-8'))
+
+
+def pedir(mensagem, caminho=None):
+    """Envia um pedido ao servidor e devolve a resposta (OSError se ele não estiver no ar)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexao:
+        conexao.connect(caminho or caminho_socket_padrao())
+        enviar_quadro(conexao, mensagem)
+        return receber_quadro(conexao)
+
+
+def main(argv):
+    # A entrada do programa só é repassada com --executar e quando vem de um arquivo ou pipe
+    entrada = ""
+    interativo = False
+    if "--executar" in argv and sys.stdin is not None:
+        if sys.stdin.isatty():
+            interativo = True
+        else:
+            entrada = sys.stdin.read()
+
+    resposta = None
+    # Com o terminal na entrada, o programa pede cada 👂 a quem digita: isso só
+    # funciona rodando aqui (o servidor recebe a entrada inteira de uma vez)
+    if not interativo:
+        pedido = {"acao": "compilar", "argv": argv, "cwd": os.getcwd(), "entrada": entrada}
+        try:
+            resposta = pedir(pedido)
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+
+    if resposta is None:
+        # Sem servidor (ou entrada interativa): compila neste processo, com a mesma interface
+        if entrada:
+            sys.stdin = io.StringIO(entrada)
+        import compilador
+        sys.argv = ["compilador.py"] + argv
+        compilador.main()
+        return 0
+
+    sys.stdout.write(resposta["saida"])
+    sys.stderr.write(resposta["erros"])
+    return resposta["codigo"]
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
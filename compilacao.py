@@ -0,0 +1,210 @@
+from analise_lexica import analisar as analisar_lexicamente
+from AnalisadorSintatico import analisar_sintaticamente, ErroSintatico
+from semantico import AnalisadorSemantico, GeradorTAC, formatar_codigo
+from instrumentacao import medir, contar_nos
+
+"""
+API de biblioteca do compilador: roda o pipeline inteiro (léxico, sintático,
+semântico, TAC e otimização opcional) e devolve tudo como dados, sem
+escrever em stdout/stderr e sem chamar sys.exit.
+
+    resultado = compilar_programa(texto, OpcoesCompilacao(otimizar=True))
+    if resultado.sucesso:
+        print(resultado.codigo_tac())
+    else:
+        for diagnostico in resultado.diagnosticos:
+            print(diagnostico)
+
+O compilador.py é só uma camada de apresentação sobre esta função.
+"""
+
+# Etapas em que a compilação pode falhar
+LEXICO = 'lexico'
+SINTATICO = 'sintatico'
+SEMANTICO = 'semantico'
+
+
+class OpcoesCompilacao:
+    def __init__(self, otimizar=False, guardar_arvore=True, saida_tac=None, perfil=None, uma_passada=False,
+                 importadas=None, mapa_fonte=False):
+        self.otimizar = otimizar
+        self.guardar_arvore = guardar_arvore    # False descarta a árvore assim que o TAC fica pronto
+        self.uma_passada = uma_passada          # TAC gerado durante a análise sintática, sem árvore
+        self.saida_tac = saida_tac              # Arquivo aberto: TAC escrito em streaming (ver GeradorTAC)
+        self.perfil = perfil                    # instrumentacao.Perfil para medir as etapas
+        self.importadas = importadas            # {nome: tipo} declarados em outras unidades (compilacao_separada)
+        self.mapa_fonte = mapa_fonte            # Guarda a posição no fonte de cada instrução (perfil_execucao)
+
+    def chave(self):
+        """Opções que alteram o resultado (usadas na chave do cache)."""
+        return {'otimizar': self.otimizar}
+
+
+class Diagnostico:
+    """Mensagem de erro de uma etapa."""
+    __slots__ = ('etapa', 'mensagem')
+
+    def __init__(self, etapa, mensagem):
+        self.etapa = etapa
+        self.mensagem = mensagem
+
+    def __str__(self):
+        # As mensagens do léxico e do sintático já trazem o nome do erro
+        if self.etapa == SEMANTICO:
+            return f"ERRO SEMÂNTICO: {self.mensagem}"
+        return self.mensagem
+
+    def __repr__(self):
+        return f"Diagnostico({self.etapa!r}, {self.mensagem!r})"
+
+
+class ResultadoCompilacao:
+    def __init__(self):
+        self.sucesso = False
+        self.etapa_falha = None         # LEXICO, SINTATICO, SEMANTICO ou None
+        self.diagnosticos = []
+        self.tokens = []                # Tuplas (tipo, valor, linha, coluna)
+        self.arvore = None              # Raiz da árvore sintática (se guardar_arvore)
+        self.instrucoes = []            # TAC (strings); vazio no modo streaming
+        self.constantes = []            # Pool dos literais de string referenciados no TAC (#0, #1...)
+        self.mapa = None                # tac.MapaFonte das instruções (opções.mapa_fonte, sem -O)
+        self.tipos = {}                 # Tipo declarado de cada variável
+        self.total_instrucoes = 0       # Instruções geradas (antes da otimização)
+        self.temporarios = 0
+        self.rotulos = 0
+        self.otimizador = None          # OtimizadorTAC usado no -O (estatísticas)
+        self.importacoes = {}           # Nomes procurados nas declarações importadas -> tipo (ou None)
+
+    @property
+    def erros(self):
+        return [str(d) for d in self.diagnosticos]
+
+    def _falhar(self, etapa, mensagens):
+        self.etapa_falha = etapa
+        self.diagnosticos.extend(Diagnostico(etapa, m) for m in mensagens)
+        return self
+
+    def texto_tokens(self):
+        """Conteúdo do arquivo .emojilex."""
+        return "\n".join([str(t) for t in self.tokens])
+
+    def codigo_tac(self):
+        """Conteúdo do arquivo .tac."""
+        return formatar_codigo(self.instrucoes, self.constantes)
+
+    def para_dicionario(self):
+        """Resumo serializável (JSON/pickle), usado pelo cache e pelos modos em lote."""
+        return {'sucesso': self.sucesso, 'tokens': len(self.tokens),
+                'emojilex': self.texto_tokens() if self.etapa_falha != LEXICO else None,
+                'tac': self.codigo_tac() if self.sucesso else None,
+                'instrucoes': self.instrucoes, 'constantes': self.constantes, 'tipos': self.tipos,
+                'erros': self.erros}
+
+
+def compilar_programa(texto, opcoes=None):
+    """
+    Compila o código fonte E-moji. Retorna um ResultadoCompilacao.
+    'texto' pode ser uma string ou blocos de texto (ex.: uma FonteMapeada).
+    """
+    opcoes = opcoes or OpcoesCompilacao()
+    perfil = opcoes.perfil
+    resultado = ResultadoCompilacao()
+
+    # Léxico
+    erros_lexicos = []
+    with medir(perfil, "lexico") as m:
+        tokens, sucesso_lexico = analisar_lexicamente(texto, erros_lexicos)
+        m['tokens'] = len(tokens)
+    resultado.tokens = tokens
+    if not sucesso_lexico:
+        return resultado._falhar(LEXICO, erros_lexicos)
+    return compilar_tokens(tokens, opcoes, resultado)
+
+
+def compilar_tokens(tokens, opcoes=None, resultado=None):
+    """
+    O pipeline a partir das tuplas do léxico (sintático, semântico, TAC e -O).
+    Usado por compilar_programa e pelos fragmentos de compilacao_paralela.
+    """
+    opcoes = opcoes or OpcoesCompilacao()
+    perfil = opcoes.perfil
+    if resultado is None:
+        resultado = ResultadoCompilacao()
+
+    if opcoes.uma_passada:
+        return _traduzir_em_uma_passada(tokens, opcoes, resultado)
+
+    # Sintático
+    with medir(perfil, "conversao_tokens"):
+        tokens_fmt = [{'tipo': t[0], 'valor': t[1], 'linha': t[2], 'coluna': t[3]} for t in tokens]
+    try:
+        with medir(perfil, "sintatico", lambda: {'nos': contar_nos(arvore)}):
+            arvore = analisar_sintaticamente(tokens_fmt, silencioso=True)
+    except ErroSintatico as e:
+        return resultado._falhar(SINTATICO, [str(e)])
+    del tokens_fmt
+
+    # Semântico e geração de código
+    gerador = GeradorTAC(saida=opcoes.saida_tac, mapear=opcoes.mapa_fonte)
+    analisador = AnalisadorSemantico(gerador, silencioso=True, importadas=opcoes.importadas)
+    with medir(perfil, "semantico") as m:
+        sucesso_semantico = analisador.visitar(arvore)
+        gerador.finalizar()
+        m['instrucoes'] = gerador.total_instrucoes
+        m['temporarios'] = gerador.temp_count
+        m['rotulos'] = gerador.label_count
+        m['erros'] = len(analisador.erros)
+    if opcoes.guardar_arvore:
+        resultado.arvore = arvore
+    return _concluir(gerador, analisador, sucesso_semantico, opcoes, resultado)
+
+
+def _traduzir_em_uma_passada(tokens, opcoes, resultado):
+    """Sintático, semântico e TAC juntos (traducao_direta), sem árvore sintática."""
+    from traducao_direta import TradutorDireto
+    gerador = GeradorTAC(saida=opcoes.saida_tac, mapear=opcoes.mapa_fonte)
+    tradutor = TradutorDireto(gerador, silencioso=True, importadas=opcoes.importadas)
+    try:
+        with medir(opcoes.perfil, "traducao") as m:
+            sucesso_semantico = tradutor.traduzir(tokens)
+            gerador.finalizar()
+            m['instrucoes'] = gerador.total_instrucoes
+            m['temporarios'] = gerador.temp_count
+            m['rotulos'] = gerador.label_count
+            m['erros'] = len(tradutor.erros)
+    except ErroSintatico as e:
+        # Como nas duas passadas, um erro sintático esconde os semânticos já encontrados
+        return resultado._falhar(SINTATICO, [str(e)])
+    return _concluir(gerador, tradutor, sucesso_semantico, opcoes, resultado)
+
+
+def _concluir(gerador, analisador, sucesso_semantico, opcoes, resultado):
+    """Guarda o TAC gerado no resultado e aplica a otimização (-O)."""
+    resultado.tipos = gerador.tipos
+    resultado.importacoes = analisador.tabela.usadas
+    resultado.total_instrucoes = gerador.total_instrucoes
+    resultado.temporarios = gerador.temp_count
+    resultado.rotulos = gerador.label_count
+    if not sucesso_semantico:
+        return resultado._falhar(SEMANTICO, analisador.erros)
+    return finalizar(resultado, gerador.instrucoes, gerador.constantes.literais, gerador.mapa, opcoes)
+
+
+def finalizar(resultado, instrucoes, constantes, mapa, opcoes):
+    """Guarda o TAC pronto (e o pool de constantes) no resultado, aplicando a otimização (-O)."""
+    # Otimização (opcional; no streaming o TAC já foi para o arquivo)
+    if opcoes.otimizar and opcoes.saida_tac is None:
+        from otimizador import OtimizadorTAC      # Só o -O carrega o otimizador
+        with medir(opcoes.perfil, "otimizacao") as m:
+            resultado.otimizador = OtimizadorTAC()
+            resultado.instrucoes = resultado.otimizador.otimizar(instrucoes, constantes, resultado.tipos)
+            resultado.constantes = resultado.otimizador.constantes.literais
+            m['instrucoes'] = len(resultado.instrucoes)
+            m['temporarios'] = resultado.otimizador.temporarios_depois
+    else:
+        # O -O reordena e remove instruções, então o mapa de fonte só vale sem ele
+        resultado.instrucoes = instrucoes
+        resultado.constantes = constantes
+        resultado.mapa = mapa
+    resultado.sucesso = True
+    return resultado
@@ -0,0 +1,225 @@
+import os
+from bisect import bisect_left
+
+from analise_lexica import analisar as analisar_lexicamente
+from compilacao import (compilar_tokens, finalizar, OpcoesCompilacao, ResultadoCompilacao,
+                        LEXICO)
+from instrumentacao import medir
+from tac import renumerar, eh_temporario, MapaFonte, TabelaConstantes
+
+"""
+Compilação de um arquivo grande em fragmentos analisados em paralelo. Um
+programa E-moji é LISTA_DECLARACOES seguida de BLOCO_COMANDOS, e os comandos
+do nível mais externo só se comunicam pelas variáveis globais. Então:
+
+    1. o léxico roda uma vez, no arquivo inteiro;
+    2. a lista de declarações é analisada uma vez, e a tabela de símbolos
+       resultante ({nome: tipo}) vai congelada para os processos;
+    3. as fronteiras dos comandos do nível mais externo saem da profundidade
+       dos parênteses e dos blocos (🤜/🤛) ao longo dos tokens, e os comandos
+       são agrupados em fragmentos de tamanho parecido;
+    4. cada fragmento (uma sequência de comandos, que sozinha já é um
+       PROGRAMA válido) passa pelo sintático, semântico e TAC num processo;
+    5. o TAC dos fragmentos é costurado na ordem, renumerando temporários (t)
+       e rótulos (L) e juntando os pools de constantes (#k).
+
+Como cada fragmento numera t, L e #k a partir de zero e na mesma ordem da
+compilação de uma vez, somar os totais dos fragmentos anteriores reproduz
+exatamente o TAC sequencial. O -O roda no programa costurado.
+
+    resultado = compilar_em_fragmentos(texto, OpcoesCompilacao(guardar_arvore=False), processos=4)
+
+O resultado é um ResultadoCompilacao comum, mas sem árvore sintática. Se
+algum fragmento (ou as declarações) tiver erro, o arquivo é recompilado do
+jeito sequencial, para os diagnósticos serem os mesmos. Arquivos pequenos
+demais para compensar os processos e programas com variáveis que parecem
+temporários (t3) também vão direto para o sequencial.
+"""
+
+TIPOS_DECLARACAO = ('INT', 'STRING_TYPE', 'BOOL')
+ABERTURAS = ('ABRIR_PARENTESES', 'ABRIR_BLOCO')
+FECHAMENTOS = ('FECHAR_PARENTESES', 'FECHAR_BLOCO')
+
+FRAGMENTOS_POR_PROCESSO = 4         # Mais fragmentos que processos equilibra comandos de custo desigual
+MINIMO_TOKENS_FRAGMENTO = 20000     # Abaixo disso o custo dos processos não se paga
+
+
+# ------ FRONTEIRAS ------
+
+def fim_declaracoes(tokens):
+    """Índice do primeiro token depois da lista de declarações (cada uma é 'tipo ID ;')."""
+    i = 0
+    while i < len(tokens) and tokens[i][0] in TIPOS_DECLARACAO:
+        i += 3
+    return min(i, len(tokens))
+
+
+def fronteiras_comandos(tokens, inicio=0):
+    """
+    Índices onde começam os comandos do nível mais externo a partir de 'inicio',
+    mais o fim dos tokens. Um comando termina num ';' fora de parênteses e
+    blocos (o ';' do cabeçalho do 😮 fica dentro dos parênteses) ou no 🤛 que
+    volta ao nível externo, se não vier um 🖖 depois. None se os delimitadores
+    não fecham (o erro sai da compilação sequencial).
+    """
+    fronteiras = [inicio]
+    profundidade = 0
+    total = len(tokens)
+    for i in range(inicio, total):
+        tipo = tokens[i][0]
+        if tipo in ABERTURAS:
+            profundidade += 1
+        elif tipo in FECHAMENTOS:
+            profundidade -= 1
+            if profundidade < 0:
+                return None
+            if profundidade == 0 and tipo == 'FECHAR_BLOCO' and (i + 1 == total or tokens[i + 1][0] != 'ELSE'):
+                fronteiras.append(i + 1)
+        elif tipo == 'PONTO_VIRGULA' and profundidade == 0:
+            fronteiras.append(i + 1)
+    if profundidade:
+        return None
+    if fronteiras[-1] != total:
+        fronteiras.append(total)
+    return fronteiras
+
+
+def dividir(fronteiras, partes):
+    """Agrupa os comandos em até 'partes' intervalos (inicio, fim) de tokens com tamanhos parecidos."""
+    inicio, fim = fronteiras[0], fronteiras[-1]
+    cortes = [inicio]
+    for j in range(1, partes):
+        alvo = inicio + (fim - inicio) * j // partes
+        corte = fronteiras[min(bisect_left(fronteiras, alvo), len(fronteiras) - 1)]
+        if cortes[-1] < corte < fim:
+            cortes.append(corte)
+    cortes.append(fim)
+    return list(zip(cortes, cortes[1:]))
+
+
+# ------ FRAGMENTOS ------
+
+def compilar_fragmento(tokens, globais, uma_passada=True, mapa_fonte=False):
+    """
+    Compila uma sequência de comandos contra as declarações globais ({nome: tipo}).
+    Devolve um dicionário serializável (volta do processo para a costura).
+    """
+    r = compilar_tokens(tokens, OpcoesCompilacao(guardar_arvore=False, uma_passada=uma_passada,
+                                                 importadas=globais, mapa_fonte=mapa_fonte))
+    return {'sucesso': r.sucesso, 'instrucoes': r.instrucoes, 'constantes': r.constantes,
+            'temporarios': r.temporarios, 'rotulos': r.rotulos, 'total_instrucoes': r.total_instrucoes,
+            'mapa': r.mapa}
+
+
+def _compilar_fragmentos(fatias, globais, opcoes, processos):
+    """Compila as fatias de tokens (em paralelo se houver mais de uma), na ordem."""
+    argumentos = ([globais] * len(fatias), [opcoes.uma_passada] * len(fatias), [opcoes.mapa_fonte] * len(fatias))
+    if len(fatias) > 1 and processos != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            return list(executor.map(compilar_fragmento, fatias, *argumentos))
+    return list(map(compilar_fragmento, fatias, *argumentos))
+
+
+def costurar(entradas, globais, mapa_fonte=False):
+    """
+    Junta o TAC dos fragmentos (na ordem), renumerando temporários e rótulos
+    e juntando os pools de constantes. Retorna (instrucoes, TabelaConstantes, MapaFonte ou None).
+    """
+    instrucoes = []
+    constantes = TabelaConstantes()
+    mapa = MapaFonte() if mapa_fonte else None
+    temporarios = rotulos = 0
+    for entrada in entradas:
+        instrucoes.extend(renumerar(entrada['instrucoes'], temporarios, rotulos, globais,
+                                    entrada['constantes'], constantes))
+        temporarios += entrada['temporarios']
+        rotulos += entrada['rotulos']
+        if mapa is not None:
+            mapa.estender(entrada['mapa'])
+    return instrucoes, constantes, mapa
+
+
+def _quantidade_fragmentos(tokens_comandos, comandos, processos, fragmentos):
+    if fragmentos is None:
+        fragmentos = (processos or os.cpu_count() or 1) * FRAGMENTOS_POR_PROCESSO
+        fragmentos = min(fragmentos, tokens_comandos // MINIMO_TOKENS_FRAGMENTO)
+    return min(fragmentos, comandos)
+
+
+# ------ COMPILAÇÃO ------
+
+def compilar_em_fragmentos(texto, opcoes=None, processos=None, fragmentos=None):
+    """
+    Compila o código fonte E-moji em fragmentos de comandos. Retorna um ResultadoCompilacao.
+    processos: tamanho do pool (None: um por CPU; 1: fragmentos compilados neste processo).
+    fragmentos: quantidade de fragmentos (None: FRAGMENTOS_POR_PROCESSO por processo, com
+                pelo menos MINIMO_TOKENS_FRAGMENTO tokens cada).
+    """
+    opcoes = opcoes or OpcoesCompilacao()
+    perfil = opcoes.perfil
+    resultado = ResultadoCompilacao()
+
+    erros_lexicos = []
+    with medir(perfil, "lexico") as m:
+        tokens, sucesso_lexico = analisar_lexicamente(texto, erros_lexicos)
+        m['tokens'] = len(tokens)
+    resultado.tokens = tokens
+    if not sucesso_lexico:
+        return resultado._falhar(LEXICO, erros_lexicos)
+
+    # Streaming e unidades (importadas) escrevem/consultam estado do programa inteiro
+    if opcoes.saida_tac is not None or opcoes.importadas is not None:
+        return compilar_tokens(tokens, opcoes, resultado)
+
+    inicio_comandos = fim_declaracoes(tokens)
+    fronteiras = fronteiras_comandos(tokens, inicio_comandos)
+    if fronteiras is None:
+        return compilar_tokens(tokens, opcoes, resultado)
+    partes = _quantidade_fragmentos(len(tokens) - inicio_comandos, len(fronteiras) - 1, processos, fragmentos)
+    if partes < 2:
+        return compilar_tokens(tokens, opcoes, resultado)
+
+    with medir(perfil, "declaracoes") as m:
+        declaracoes = compilar_tokens(tokens[:inicio_comandos],
+                                      OpcoesCompilacao(guardar_arvore=False, uma_passada=opcoes.uma_passada))
+        m['declaracoes'] = len(declaracoes.tipos)
+    globais = declaracoes.tipos
+    # Uma variável chamada t3 seria confundida, na costura, com o temporário t3 de um fragmento
+    if not declaracoes.sucesso or any(eh_temporario(nome) for nome in globais):
+        return compilar_tokens(tokens, opcoes, resultado)
+
+    with medir(perfil, "fragmentos") as m:
+        intervalos = dividir(fronteiras, partes)
+        entradas = _compilar_fragmentos([tokens[a:b] for a, b in intervalos], globais, opcoes, processos)
+        m['fragmentos'] = len(entradas)
+    if not all(entrada['sucesso'] for entrada in entradas):
+        return compilar_tokens(tokens, opcoes, resultado)
+
+    with medir(perfil, "costura") as m:
+        instrucoes, constantes, mapa = costurar(entradas, globais, opcoes.mapa_fonte)
+        m['instrucoes'] = len(instrucoes)
+    resultado.tipos = globais
+    resultado.total_instrucoes = sum(entrada['total_instrucoes'] for entrada in entradas)
+    resultado.temporarios = sum(entrada['temporarios'] for entrada in entradas)
+    resultado.rotulos = sum(entrada['rotulos'] for entrada in entradas)
+    return finalizar(resultado, instrucoes, constantes.literais, mapa, opcoes)
+
+
+# --- Execução direta ---
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) not in (2, 3):
+        print("Uso correto: python compilacao_paralela.py <arquivo_fonte.emoji> [processos]")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        texto = f.read()
+    resultado = compilar_em_fragmentos(texto, OpcoesCompilacao(guardar_arvore=False, uma_passada=True),
+                                       processos=int(sys.argv[2]) if len(sys.argv) == 3 else None)
+    if not resultado.sucesso:
+        for erro in resultado.erros:
+            print(erro, file=sys.stderr)
+        sys.exit(1)
+    print(resultado.codigo_tac())
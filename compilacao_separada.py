@@ -0,0 +1,201 @@
+import time
+
+from compilacao import compilar_programa, OpcoesCompilacao
+from semantico import formatar_codigo
+from tac import renumerar, TabelaConstantes
+
+"""
+Compilação separada de programas com várias unidades (arquivos .emoji).
+Cada unidade é um programa E-moji comum; as variáveis que ela declara formam
+a sua interface e são globais ao programa inteiro, então uma unidade pode usar
+as variáveis declaradas por qualquer outra. As unidades executam na ordem em
+que são passadas, como se o programa fosse:
+
+    declarações de todas as unidades + comandos de todas as unidades (em ordem)
+
+    programa = compilar_unidades(["base.emoji", "calculo.emoji", "saida.emoji"])
+    if programa.sucesso:
+        print(programa.codigo_tac())
+
+Cada unidade compilada fica no cache de compilação (pelo hash do fonte) junto
+com a sua interface e com os nomes que ela procurou nas interfaces das outras
+(e o tipo que encontrou). Uma unidade só é recompilada se o fonte mudou ou se
+algum desses nomes mudou de tipo, surgiu ou sumiu. As unidades alteradas são
+compiladas em paralelo, usando as interfaces em cache das que não mudaram; as
+que dependiam de uma interface que acabou mudando são recompiladas numa
+segunda rodada (a interface de uma unidade só depende do seu próprio fonte,
+então duas rodadas bastam). A ligação junta o TAC das unidades renumerando
+os temporários (t) e rótulos (L) de cada uma e unindo os pools de constantes
+(#k), e o -O otimiza o programa ligado inteiro.
+"""
+
+# Opções que separam as entradas das unidades das de arquivos inteiros no cache
+OPCOES_UNIDADE = {'unidade': True}
+
+COMPILADA = 'compilada'         # Fonte novo ou alterado
+RECOMPILADA = 'recompilada'     # Fonte igual, mas alguma interface usada mudou
+CACHE = 'cache'                 # Reaproveitada do cache
+
+
+def compilar_unidade(fonte, importadas):
+    """
+    Compila uma unidade contra as declarações das outras ({nome: tipo}).
+    Devolve um dicionário serializável (vai para o cache e entre processos).
+    """
+    r = compilar_programa(fonte, OpcoesCompilacao(guardar_arvore=False, uma_passada=True,
+                                                  importadas=importadas))
+    return {'sucesso': r.sucesso, 'erros': r.erros, 'interface': r.tipos, 'importacoes': r.importacoes,
+            'instrucoes': r.instrucoes, 'constantes': r.constantes, 'temporarios': r.temporarios,
+            'rotulos': r.rotulos}
+
+
+def atualizada(entrada, ambiente):
+    """A unidade viu, para cada nome importado, o mesmo tipo que ele tem agora?"""
+    return all(ambiente.get(nome) == tipo for nome, tipo in entrada['importacoes'].items())
+
+
+class Unidade:
+    def __init__(self, caminho, fonte, chave):
+        self.caminho = caminho
+        self.fonte = fonte
+        self.chave = chave              # Chave da unidade no cache
+        self.entrada = None             # Resultado de compilar_unidade
+        self.situacao = CACHE
+
+
+class ProgramaLigado:
+    def __init__(self, unidades):
+        self.unidades = unidades
+        self.sucesso = False
+        self.erros = []
+        self.instrucoes = []            # TAC ligado (strings)
+        self.constantes = TabelaConstantes()    # Pool único, com os literais de todas as unidades
+        self.tipos = {}
+        self.temporarios = 0
+        self.rotulos = 0
+        self.otimizador = None          # OtimizadorTAC usado no -O
+        self.tempo = 0.0
+
+    def codigo_tac(self):
+        """Conteúdo do arquivo .tac do programa ligado."""
+        return formatar_codigo(self.instrucoes, self.constantes.literais)
+
+    def relatorio(self):
+        linhas = [f"Compilação separada: {len(self.unidades)} unidade(s) em {self.tempo * 1000:.1f} ms"]
+        for u in self.unidades:
+            marca = "✅" if u.entrada['sucesso'] else "❌"
+            linhas.append(f"   {marca} {u.caminho}: {u.situacao}, {len(u.entrada['interface'])} declarações "
+                          f"exportadas, {len(u.entrada['instrucoes'])} instruções")
+        contagem = {s: sum(u.situacao == s for u in self.unidades) for s in (COMPILADA, RECOMPILADA, CACHE)}
+        linhas.append(f"   Compiladas: {contagem[COMPILADA]} | Recompiladas: {contagem[RECOMPILADA]} | "
+                      f"Do cache: {contagem[CACHE]}")
+        return "\n".join(linhas)
+
+
+def _compilar_rodada(pendentes, ambiente, processos):
+    """Compila as unidades pendentes contra o ambiente (em paralelo se houver mais de uma)."""
+    if len(pendentes) > 1 and processos != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            entradas = list(executor.map(compilar_unidade, [u.fonte for u in pendentes],
+                                         [ambiente] * len(pendentes)))
+    else:
+        entradas = [compilar_unidade(u.fonte, ambiente) for u in pendentes]
+    for unidade, entrada in zip(pendentes, entradas):
+        unidade.entrada = entrada
+
+
+def _guardar(cache, unidade):
+    if cache is None:
+        return
+    try:
+        cache.guardar(unidade.chave, unidade.entrada)
+    except OSError:
+        pass        # Sem espaço/permissão no cache: a compilação continua valendo
+
+
+def ambiente_de(unidades):
+    """Declarações exportadas pelas unidades ({nome: tipo}; na duplicata vale a primeira)."""
+    ambiente = {}
+    for u in unidades:
+        for nome, tipo in u.entrada['interface'].items():
+            ambiente.setdefault(nome, tipo)
+    return ambiente
+
+
+def compilar_unidades(caminhos, otimizar=False, processos=None, cache=None):
+    """
+    Compila (ou reaproveita do cache) cada unidade e liga o programa.
+    'cache' é um cache_compilacao.CacheCompilacao (None: compila tudo, sem guardar).
+    Retorna um ProgramaLigado.
+    """
+    inicio = time.perf_counter()
+    unidades = []
+    for caminho in caminhos:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            fonte = f.read()
+        chave = cache.chave(fonte, OPCOES_UNIDADE) if cache is not None else None
+        unidade = Unidade(caminho, fonte, chave)
+        if cache is not None:
+            unidade.entrada = cache.obter(chave)
+        unidades.append(unidade)
+
+    # 1ª rodada: unidades alteradas, contra as interfaces em cache das demais
+    alteradas = [u for u in unidades if u.entrada is None]
+    _compilar_rodada(alteradas, ambiente_de([u for u in unidades if u.entrada is not None]), processos)
+    for u in alteradas:
+        u.situacao = COMPILADA
+
+    # 2ª rodada: unidades que usaram alguma interface que não vale mais
+    ambiente = ambiente_de(unidades)
+    desatualizadas = [u for u in unidades if not atualizada(u.entrada, ambiente)]
+    _compilar_rodada(desatualizadas, ambiente, processos)
+    for u in desatualizadas:
+        if u.situacao == CACHE:
+            u.situacao = RECOMPILADA
+    for u in unidades:
+        if u.situacao != CACHE:
+            _guardar(cache, u)
+
+    programa = ligar(unidades)
+    if programa.sucesso and otimizar:
+        from otimizador import OtimizadorTAC
+        programa.otimizador = OtimizadorTAC()
+        programa.instrucoes = programa.otimizador.otimizar(programa.instrucoes, programa.constantes.literais,
+                                                                  programa.tipos)
+        programa.constantes = programa.otimizador.constantes
+    programa.tempo = time.perf_counter() - inicio
+    return programa
+
+
+def ligar(unidades):
+    """
+    Junta o TAC das unidades (na ordem), renumerando temporários e rótulos de
+    cada uma e juntando os pools de constantes em um só.
+    """
+    programa = ProgramaLigado(unidades)
+    for u in unidades:
+        programa.erros.extend(f"{u.caminho}: {erro}" for erro in u.entrada['erros'])
+
+    # Uma variável só pode ser declarada por uma unidade
+    donos = {}
+    for u in unidades:
+        for nome in u.entrada['interface']:
+            donos.setdefault(nome, []).append(u.caminho)
+    for nome, caminhos in donos.items():
+        if len(caminhos) > 1:
+            programa.erros.append(f"Erro de ligação: variável '{nome}' declarada em mais de uma unidade "
+                                  f"({', '.join(caminhos)}).")
+    if programa.erros:
+        return programa
+
+    for u in unidades:
+        programa.tipos.update(u.entrada['interface'])
+    for u in unidades:
+        entrada = u.entrada
+        programa.instrucoes.extend(renumerar(entrada['instrucoes'], programa.temporarios, programa.rotulos,
+                                             programa.tipos, entrada['constantes'], programa.constantes))
+        programa.temporarios += entrada['temporarios']
+        programa.rotulos += entrada['rotulos']
+    programa.sucesso = True
+    return programa
@@ -1,11 +1,32 @@
 import sys
 import os
+import io
+import time
+import argparse
+import contextlib
 
-# Importa os módulos
-from analise_lexica import analisar as analisar_lexicamente
-from AnalisadorSintatico import analisar_sintaticamente, print_tree
-# Importa o novo módulo semântico
-from semantico import AnalisadorSemantico
+# Os módulos das etapas são importados só quando usados: --version e --help
+# não pagam a importação do compilador inteiro, e uma compilação simples não
+# carrega o pool de processos, o cache nem os backends de execução
+from cache_compilacao import DIRETORIO_PADRAO, LIMITE_PADRAO
+
+# Buffer de escrita do modo --stream (o TAC vai para o disco em blocos desse tamanho)
+TAMANHO_BUFFER = 1 << 16
+
+def __getattr__(nome):
+    # analisar_lexicamente continua exportado daqui para os scripts que já o importam
+    if nome == "analisar_lexicamente":
+        from analise_lexica import analisar
+        return analisar
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+def carregar_modulos():
+    """Importa de uma vez tudo o que o compilador pode usar (para processos que ficam aquecidos)."""
+    import compilacao, traducao_direta, otimizador, fonte_mapeada                         # noqa: F401
+    import maquina_virtual, backend_python, backend_c                                   # noqa: F401
+    import concurrent.futures.process                                                   # noqa: F401
+    from cache_compilacao import versao_compilador
+    versao_compilador()
 
 def salvar_arquivo(conteudo, nome_original, extensao):
     base = os.path.splitext(nome_original)[0]
@@ -17,66 +38,448 @@ def salvar_arquivo(conteudo, nome_original, extensao):
     except Exception as e:
         print(f"Erro ao salvar {extensao}: {e}")
 
+def gerar_tac_em_arquivo(codigo_fonte, nome_original, opcoes):
+    """
+    Compila escrevendo o TAC direto em '<base>.tac' (modo --stream), sem
+    manter as instruções em memória. O arquivo é montado em um temporário
+    e só substitui o .tac anterior se a compilação terminar sem erros.
+    """
+    from compilacao import compilar_programa
+    nome_saida = os.path.splitext(nome_original)[0] + ".tac"
+    temporario = nome_saida + ".tmp"
+    try:
+        with open(temporario, 'w', encoding='utf-8', buffering=TAMANHO_BUFFER) as f:
+            opcoes.saida_tac = f
+            resultado = compilar_programa(codigo_fonte, opcoes)
+    except BaseException:
+        os.remove(temporario)
+        raise
+    finally:
+        opcoes.saida_tac = None
+
+    if resultado.sucesso:
+        os.replace(temporario, nome_saida)
+    else:
+        os.remove(temporario)
+    return resultado
+
+# ------ MODO EM LOTE (--batch) ------
+
+def listar_fontes(caminhos):
+    """Expande diretórios em seus arquivos .emoji (em ordem alfabética)."""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos.extend(os.path.join(caminho, nome) for nome in sorted(os.listdir(caminho))
+                            if nome.endswith(".emoji"))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+def compilar_texto(codigo_fonte, otimizar=False):
+    """
+    compilar_programa resumido em um dicionário simples, serializável entre
+    processos (--batch, serviço assíncrono) e guardado como está no cache.
+    """
+    from compilacao import compilar_programa, OpcoesCompilacao
+    try:
+        opcoes = OpcoesCompilacao(otimizar=otimizar, guardar_arvore=False)
+        return compilar_programa(codigo_fonte, opcoes).para_dicionario()
+    except Exception as e:
+        return {'sucesso': False, 'tokens': 0, 'emojilex': None, 'tac': None,
+                'instrucoes': [], 'constantes': [], 'tipos': {}, 'erros': [f"Erro inesperado: {e}"]}
+
+def obter_resultado(codigo_fonte, otimizar=False, cache=None):
+    """
+    Resultado de compilar_texto, consultando antes o cache (se houver).
+    Retorna (resultado, situação), com situação 'acerto', 'falta' ou None sem cache.
+    """
+    if cache is None:
+        return compilar_texto(codigo_fonte, otimizar), None
+    from compilacao import OpcoesCompilacao
+    chave = cache.chave(codigo_fonte, OpcoesCompilacao(otimizar=otimizar).chave())
+    resultado = cache.obter(chave)
+    if resultado is not None:
+        return resultado, "acerto"
+    resultado = compilar_texto(codigo_fonte, otimizar)
+    try:
+        cache.guardar(chave, resultado)
+    except OSError:
+        pass        # Sem espaço/permissão no cache: a compilação continua valendo
+    return resultado, "falta"
+
+def gravar_saidas(resultado, nome_original):
+    if resultado['emojilex'] is not None:
+        salvar_arquivo(resultado['emojilex'], nome_original, ".emojilex")
+    if resultado['sucesso']:
+        salvar_arquivo(resultado['tac'], nome_original, ".tac")
+
+def compilar_arquivo(caminho, otimizar=False, cache=None):
+    """
+    Compila um arquivo sem interação, gravando o .emojilex e o .tac ao lado
+    do fonte. Roda em um processo do lote e devolve só um resumo pequeno
+    (os textos gerados já foram para o disco).
+    """
+    inicio = time.perf_counter()
+    with open(caminho, 'r', encoding='utf-8') as f:
+        codigo_fonte = f.read()
+    resultado, situacao = obter_resultado(codigo_fonte, otimizar, cache)
+    with contextlib.redirect_stdout(io.StringIO()):
+        gravar_saidas(resultado, caminho)
+    return {'arquivo': caminho, 'sucesso': resultado['sucesso'], 'tokens': resultado['tokens'],
+            'instrucoes': len(resultado['instrucoes']), 'erros': resultado['erros'],
+            'cache': situacao, 'tempo': time.perf_counter() - inicio}
+
+def executar_lote(caminhos, otimizar=False, processos=None, cache=None):
+    """
+    Compila vários arquivos em paralelo (um processo por núcleo). Cada
+    resultado é mostrado assim que fica pronto, na ordem de conclusão.
+    Retorna a quantidade de arquivos que falharam.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    arquivos = listar_fontes(caminhos)
+    if not arquivos:
+        print("Nenhum arquivo .emoji encontrado.")
+        return 0
+
+    print(f"Compilando {len(arquivos)} arquivo(s) em lote\n")
+    inicio = time.perf_counter()
+    falhas = 0
+    total_tokens = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(compilar_arquivo, arquivo, otimizar, cache) for arquivo in arquivos]
+        for futuro in as_completed(futuros):
+            r = futuro.result()
+            total_tokens += r['tokens']
+            if r['sucesso']:
+                origem = " [cache]" if r['cache'] == "acerto" else ""
+                print(f"✅ {r['arquivo']}: {r['tokens']} tokens, {r['instrucoes']} instruções "
+                      f"({r['tempo'] * 1000:.1f} ms){origem}")
+            else:
+                falhas += 1
+                print(f"❌ {r['arquivo']}")
+                for erro in r['erros']:
+                    print(f"   - {erro}")
+    duracao = time.perf_counter() - inicio
+
+    print(f"\n{len(arquivos) - falhas} de {len(arquivos)} arquivo(s) compilados em {duracao:.2f} s "
+          f"({len(arquivos) / duracao:.1f} arquivos/s, {total_tokens / duracao:.0f} tokens/s)")
+    return falhas
+
+# ------ COMPILAÇÃO SEPARADA (--unidades) ------
+
+def compilar_unidades(args):
+    """
+    Compila um programa de várias unidades, reaproveitando do cache as que não
+    mudaram, e grava o TAC ligado. Retorna o código de saída do processo.
+    """
+    from cache_compilacao import CacheCompilacao
+    from compilacao_separada import compilar_unidades as compilar_e_ligar
+    # As unidades compiladas sempre ficam no cache (é ele que evita recompilá-las)
+    cache = CacheCompilacao(args.cache_dir, int(args.cache_limite * 1024 * 1024))
+    programa = compilar_e_ligar(args.unidades, args.otimizar, args.jobs, cache)
+    print(programa.relatorio())
+    if args.cache_stats:
+        print("\n" + cache.relatorio())
+    if not programa.sucesso:
+        print(f"\n❌ Falha na compilação ({len(programa.erros)} erros encontrados).")
+        for erro in programa.erros:
+            print(f"   - {erro}")
+        return 1
+
+    if programa.otimizador is not None:
+        print("\n" + programa.otimizador.relatorio())
+    codigo_tac = programa.codigo_tac()
+    print("\n" + codigo_tac)
+    salvar_arquivo(codigo_tac, args.saida, ".tac")
+    print("\n🎉 COMPILAÇÃO CONCLUÍDA COM SUCESSO! 🎉")
+    if args.executar:
+        return executar_programa(programa.instrucoes, programa.tipos, args.backend, programa.constantes.literais)
+    return 0
+
+# ------ CACHE DE COMPILAÇÃO (--cache) ------
+
+def compilar_com_cache(caminho_arquivo, args, cache):
+    """
+    Compila um arquivo pelo cache: num acerto as análises não são executadas;
+    numa falta o resultado é calculado, guardado e mostrado do mesmo jeito.
+    Retorna o código de saída do processo.
+    """
+    with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+        codigo_fonte = f.read()
+    resultado, situacao = obter_resultado(codigo_fonte, args.otimizar, cache)
+    if situacao == "acerto":
+        print("♻️  Cache: acerto (análises léxica, sintática e semântica reaproveitadas)")
+    else:
+        print("Cache: falta (compilação completa, resultado guardado)")
+
+    gravar_saidas(resultado, caminho_arquivo)
+    if not resultado['sucesso']:
+        print(f"\n❌ Falha na compilação ({len(resultado['erros'])} erros encontrados).")
+        for erro in resultado['erros']:
+            print(f"   - {erro}")
+        return 1
+
+    print("\n" + resultado['tac'])
+    print("\n🎉 COMPILAÇÃO CONCLUÍDA COM SUCESSO! 🎉")
+    if args.executar:
+        return executar_programa(resultado['instrucoes'], resultado['tipos'], args.backend,
+                                 resultado['constantes'])
+    return 0
+
+def criar_cache(args):
+    if not (args.cache or args.cache_dir or args.cache_stats):
+        return None
+    from cache_compilacao import CacheCompilacao
+    return CacheCompilacao(args.cache_dir, int(args.cache_limite * 1024 * 1024))
+
+def executar_programa(instrucoes, tipos, backend, constantes=None):
+    from maquina_virtual import MaquinaVirtual, ErroExecucao
+    from backend_python import ProgramaPython
+    from backend_c import ProgramaC
+    print("\n5. Execução\n")
+    classe = {"python": ProgramaPython, "c": ProgramaC}.get(backend, MaquinaVirtual)
+    try:
+        programa = classe(instrucoes, tipos=tipos, constantes=constantes)
+        programa.executar()
+    except ErroExecucao as e:
+        print(f"\n❌ {e}")
+        return 1
+    print("\n" + programa.relatorio())
+    return 0
+
+def perfilar_execucao(resultado, caminho_arquivo):
+    from maquina_virtual import ErroExecucao
+    from perfil_execucao import perfilar
+    print("\n5. Execução (com perfil)\n")
+    with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+        fonte = f.read()
+    try:
+        perfil_execucao = perfilar(resultado, fonte=fonte)
+    except ErroExecucao as e:
+        print(f"\n❌ {e}")
+        return 1
+    print("\n" + perfil_execucao.relatorio())
+    salvar_arquivo(perfil_execucao.pilhas_colapsadas(), caminho_arquivo, ".folded")
+    return 0
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(
+        prog="compilador.py",
+        usage="python compilador.py [-O | --stream] [--uma-passada] [--executar [--backend vm|python|c]] <arquivo_fonte.emoji>\n"
+              "       python compilador.py [-O] [--uma-passada] [--executar [--backend vm|python|c]] --fragmentos [-j N] "
+              "<arquivo_fonte.emoji>\n"
+              "       python compilador.py [--uma-passada] --perfil-execucao <arquivo_fonte.emoji>\n"
+              "       python compilador.py [-O] [-j N] --batch <diretório|arquivos...>\n"
+              "       python compilador.py [-O] [-j N] [--executar] --unidades <arquivos...> [-o programa.tac]\n"
+              "       (qualquer forma aceita --cache [--cache-dir DIR] [--cache-limite MB]; "
+              "--cache-stats mostra o estado do cache)",
+        description="Compilador da linguagem E-moji (léxico, sintático, semântico e TAC).")
+    parser.add_argument("arquivo", nargs="?", help="arquivo fonte .emoji")
+    parser.add_argument("--version", dest="versao", action="store_true",
+                        help="mostra a versão (impressão digital do código do compilador) e sai")
+    parser.add_argument("-O", dest="otimizar", action="store_true",
+                        help="otimiza o código intermediário (dobramento e propagação de constantes, "
+                             "subexpressões comuns, código invariante de laço, variáveis de indução, "
+                             "código morto e desvios redundantes)")
+    parser.add_argument("--uma-passada", dest="uma_passada", action="store_true",
+                        help="gera o TAC durante a análise sintática, sem montar a árvore sintática "
+                             "(mesma saída, menos tempo e memória)")
+    parser.add_argument("--executar", action="store_true",
+                        help="executa o TAC gerado e mostra o relatório de execução")
+    parser.add_argument("--backend", choices=["vm", "python", "c"], default="vm",
+                        help="como executar: máquina virtual (vm), código Python compilado (python) "
+                             "ou executável nativo gerado pelo compilador C (c)")
+    parser.add_argument("--perfil-execucao", dest="perfil_execucao", action="store_true",
+                        help="executa na máquina virtual medindo cada linha do fonte e cada laço (😑/😮); "
+                             "grava as pilhas para flamegraph em <arquivo>.folded")
+    parser.add_argument("--fragmentos", action="store_true",
+                        help="analisa os comandos do nível mais externo em fragmentos, em paralelo, e costura "
+                             "o TAC (mesma saída; para arquivos muito grandes)")
+    parser.add_argument("--stream", action="store_true",
+                        help="escreve o TAC direto no arquivo .tac enquanto é gerado, "
+                             "sem guardá-lo em memória nem mostrá-lo na tela")
+    parser.add_argument("--batch", nargs="+", metavar="CAMINHO",
+                        help="compila em paralelo todos os arquivos indicados (diretórios viram seus .emoji)")
+    parser.add_argument("--unidades", nargs="+", metavar="ARQUIVO",
+                        help="compila um programa de várias unidades (executadas na ordem dada), "
+                             "recompilando só as que mudaram, e liga o TAC")
+    parser.add_argument("-o", "--saida", default="programa.tac", metavar="ARQ",
+                        help="arquivo .tac do programa ligado pelo --unidades (padrão: programa.tac)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, metavar="N",
+                        help="quantidade de processos do --batch, do --unidades e do --fragmentos "
+                             "(padrão: número de núcleos)")
+    parser.add_argument("--profile", nargs="?", const="texto", choices=["texto", "json"], default=None,
+                        help="mede tempo de parede, CPU, pico de memória e contagens de cada etapa "
+                             "(relatório em texto ou JSON)")
+    parser.add_argument("--cache", action="store_true",
+                        help="reaproveita compilações anteriores do mesmo fonte com as mesmas opções")
+    parser.add_argument("--cache-dir", metavar="DIR", default=None,
+                        help=f"diretório do cache (implica --cache; padrão: {DIRETORIO_PADRAO})")
+    parser.add_argument("--cache-limite", type=float, metavar="MB", default=LIMITE_PADRAO / (1024 * 1024),
+                        help="tamanho máximo do cache; as entradas usadas há mais tempo são descartadas")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="mostra entradas, tamanho e taxa de acerto do cache")
+    args = parser.parse_args()
+    if args.versao or (args.cache_stats and args.arquivo is None and args.batch is None and args.unidades is None):
+        return args
+    if args.stream and (args.cache or args.cache_dir):
+        parser.error("--stream não pode ser combinado com --cache")
+    if args.profile and (args.cache or args.cache_dir or args.batch is not None):
+        parser.error("--profile mede as etapas de uma compilação completa; não combina com --cache ou --batch")
+    if args.unidades is not None:
+        if args.arquivo or args.batch is not None or args.stream or args.profile:
+            parser.error("--unidades não pode ser combinado com um arquivo, --batch, --stream ou --profile")
+    elif args.batch is not None:
+        if args.arquivo or args.stream or args.executar:
+            parser.error("--batch não pode ser combinado com um arquivo, --stream ou --executar")
+    elif args.arquivo is None:
+        parser.error("informe o arquivo fonte .emoji (ou --batch)")
+    if args.perfil_execucao and (args.otimizar or args.stream or args.backend != "vm" or args.cache
+                                 or args.cache_dir or args.batch is not None or args.unidades is not None):
+        parser.error("--perfil-execucao usa o TAC sem otimização na máquina virtual; não combina com -O, "
+                     "--stream, --backend, --cache, --batch ou --unidades")
+    if args.fragmentos and (args.stream or args.cache or args.cache_dir or args.batch is not None
+                            or args.unidades is not None):
+        parser.error("--fragmentos não pode ser combinado com --stream, --cache, --batch ou --unidades")
+    if args.stream and (args.otimizar or args.executar):
+        parser.error("--stream não pode ser combinado com -O ou --executar (eles precisam do TAC em memória)")
+    return args
+
+def exibir_resultado(resultado, caminho_arquivo, args, perfil=None):
+    """
+    Mostra um ResultadoCompilacao etapa por etapa e grava os arquivos de
+    saída (.emojilex e .tac). Retorna o código de saída do processo.
+    """
+    from compilacao import LEXICO, SINTATICO, SEMANTICO
+    from instrumentacao import medir
+    print("1. Análise Léxica")
+    if resultado.etapa_falha == LEXICO:
+        for diagnostico in resultado.diagnosticos:
+            print(diagnostico, file=sys.stderr)
+        print("❌ Falha na Análise Léxica.")
+        return 1
+
+    # Salva tokens (opcional)
+    with medir(perfil, "emojilex"):
+        salvar_arquivo(resultado.texto_tokens(), caminho_arquivo, ".emojilex")
+
+    print("\n2. Análise Sintática")
+    if resultado.etapa_falha == SINTATICO:
+        for diagnostico in resultado.diagnosticos:
+            print(diagnostico)
+        return 1
+    print("Análise sintática concluída com sucesso!")
+    print("✅ Sintaxe Correta!")
+
+    print("\n3. Análise Semântica e Geração de Código")
+    if resultado.etapa_falha == SEMANTICO:
+        for diagnostico in resultado.diagnosticos:
+            print(f"❌ {diagnostico}")
+        print(f"\n❌ Falha na Semântica ({len(resultado.diagnosticos)} erros encontrados).")
+        for diagnostico in resultado.diagnosticos:
+            print(f"   - {diagnostico.mensagem}")
+        return 1
+
+    if args.stream:
+        nome_saida = os.path.splitext(caminho_arquivo)[0] + ".tac"
+        print(f"Arquivo gerado: {nome_saida} ({resultado.total_instrucoes} instruções)")
+        print("✅ Semântica Correta!")
+        print("\n🎉 COMPILAÇÃO CONCLUÍDA COM SUCESSO! 🎉")
+        return 0
+
+    print("✅ Semântica Correta!")
+    if resultado.otimizador is not None:
+        print("\n4. Otimização do Código Intermediário")
+        print(resultado.otimizador.relatorio())
+
+    with medir(perfil, "saida") as m:
+        codigo_tac = resultado.codigo_tac()
+        print("\n" + codigo_tac)
+        salvar_arquivo(codigo_tac, caminho_arquivo, ".tac")
+        m['caracteres'] = len(codigo_tac)
+    print("\n🎉 COMPILAÇÃO CONCLUÍDA COM SUCESSO! 🎉")
+
+    if args.perfil_execucao:
+        return perfilar_execucao(resultado, caminho_arquivo)
+    if args.executar:
+        with medir(perfil, "execucao"):
+            return executar_programa(resultado.instrucoes, resultado.tipos, args.backend, resultado.constantes)
+    return 0
+
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python compilador.py <arquivo_fonte.emoji>")
-        sys.exit(1)
+    args = ler_argumentos()
+    if args.versao:
+        from cache_compilacao import versao_compilador
+        print(f"Compilador E-moji (versão {versao_compilador()})")
+        return
+
+    if args.unidades is not None:
+        sys.exit(compilar_unidades(args))
+
+    cache = criar_cache(args)
+    if args.cache_stats and args.arquivo is None and args.batch is None:
+        print(cache.relatorio())
+        return
 
-    caminho_arquivo = sys.argv[1]
+    if args.batch is not None:
+        falhas = executar_lote(args.batch, args.otimizar, args.jobs, cache)
+        if args.cache_stats:
+            print("\n" + cache.relatorio())
+        sys.exit(1 if falhas else 0)
+
+    caminho_arquivo = args.arquivo
     if not os.path.exists(caminho_arquivo):
         print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado.")
         sys.exit(1)
 
     print(f"Compilando: {caminho_arquivo}\n")
 
+    if cache is not None:
+        codigo_saida = compilar_com_cache(caminho_arquivo, args, cache)
+        if args.cache_stats:
+            print("\n" + cache.relatorio())
+        sys.exit(codigo_saida)
+
+    import instrumentacao
+    from compilacao import compilar_programa, OpcoesCompilacao
+    from fonte_mapeada import FonteMapeada
+
+    # Instrumentação: ligada pelo --profile ou por alguém assinando as medições
+    perfil = None
+    if args.profile or instrumentacao.ha_assinantes():
+        perfil = instrumentacao.Perfil(memoria=args.profile is not None)
+
     try:
-        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-            codigo_fonte = f.read()
-
-        # Léxico
-        print("1. Análise Léxica")
-        tokens, sucesso_lexico = analisar_lexicamente(codigo_fonte)
-        
-        if not sucesso_lexico:
-            print("❌ Falha na Análise Léxica.")
-            sys.exit(1)
-        
-        # Salva tokens (opcional)
-        lex_content = "\n".join([str(t) for t in tokens])
-        salvar_arquivo(lex_content, caminho_arquivo, ".emojilex")
-
-        # Sintático
-        print("\n2. Análise Sintática")
-        tokens_fmt = [{'tipo': t[0], 'valor': t[1], 'linha': t[2], 'coluna': t[3]} for t in tokens]
-        arvore = analisar_sintaticamente(tokens_fmt)
-        
-        if not arvore:
-            print("❌ Falha na Análise Sintática.")
-            sys.exit(1)
-        
-        print("✅ Sintaxe Correta!")
-
-        # Semântico e Geração de Código
-        print("\n3. Análise Semântica e Geração de Código")
-        analisador = AnalisadorSemantico()
-        sucesso_semantico = analisador.visitar(arvore)
-
-        if sucesso_semantico:
-            print("✅ Semântica Correta!")
-            codigo_tac = analisador.gerador.obter_codigo()
-            print("\n" + codigo_tac)
-            salvar_arquivo(codigo_tac, caminho_arquivo, ".tac")
-            print("\n🎉 COMPILAÇÃO CONCLUÍDA COM SUCESSO! 🎉")
-        else:
-            print(f"\n❌ Falha na Semântica ({len(analisador.erros)} erros encontrados).")
-            for erro in analisador.erros:
-                print(f"   - {erro}")
-            sys.exit(1)
+        # O fonte é mapeado em memória e decodificado aos poucos pelo léxico
+        # (a leitura do arquivo passa a contar no tempo da etapa léxica)
+        with FonteMapeada(caminho_arquivo) as codigo_fonte:
+            opcoes = OpcoesCompilacao(otimizar=args.otimizar, guardar_arvore=False, perfil=perfil,
+                                      uma_passada=args.uma_passada, mapa_fonte=args.perfil_execucao)
+            if args.stream:
+                resultado = gerar_tac_em_arquivo(codigo_fonte, caminho_arquivo, opcoes)
+            elif args.fragmentos:
+                from compilacao_paralela import compilar_em_fragmentos
+                resultado = compilar_em_fragmentos(codigo_fonte, opcoes, args.jobs)
+            else:
+                resultado = compilar_programa(codigo_fonte, opcoes)
+        codigo_saida = exibir_resultado(resultado, caminho_arquivo, args, perfil)
+        if codigo_saida:
+            sys.exit(codigo_saida)
 
     except Exception as e:
         print(f"Erro inesperado no compilador: {e}")
         import traceback
         traceback.print_exc()
 
+    finally:
+        # O perfil sai mesmo quando uma etapa falha (sys.exit)
+        if perfil is not None:
+            perfil.encerrar()
+            if args.profile == "json":
+                print(perfil.para_json())
+            elif args.profile:
+                print("\n" + perfil.relatorio())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
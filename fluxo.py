@@ -0,0 +1,373 @@
+import sys
+
+from tac import (ROTULO, DESVIO, DESVIO_FALSO, ler_codigo, formatar_instrucao,
+                 eh_constante, eh_temporario)
+
+"""
+Blocos básicos e Grafo de Fluxo de Controle (CFG) do TAC, com análise de
+vivacidade (liveness), dominadores e laços naturais, e realocação dos
+temporários por varredura linear (linear scan): temporários cujos intervalos
+de vida não se sobrepõem passam a compartilhar o mesmo nome, reduzindo
+t0..tN para um conjunto pequeno.
+"""
+
+# ------ BLOCOS BÁSICOS ------
+
+def variaveis_lidas(instr):
+    # Literais não participam da vivacidade, só nomes de variáveis/temporários
+    return [operando for operando in instr.usos() if not eh_constante(operando)]
+
+
+class BlocoBasico:
+    """
+    Sequência de instruções sem desvios internos: só se entra pela primeira
+    instrução e só se sai pela última.
+    """
+    def __init__(self, indice, instrucoes):
+        self.indice = indice
+        self.instrucoes = instrucoes
+        self.sucessores = []
+        self.predecessores = []
+        # Conjuntos da análise de vivacidade
+        self.usa = set()            # Lidas no bloco antes de qualquer escrita
+        self.define = set()         # Escritas no bloco
+        self.vivas_entrada = set()
+        self.vivas_saida = set()
+        self.idom = None            # Dominador imediato (ver calcular_dominadores)
+        self.intervalo_dom = None   # (pré, pós) na árvore de dominadores, para domina()
+
+    @property
+    def rotulo(self):
+        if self.instrucoes and self.instrucoes[0].tipo == ROTULO:
+            return self.instrucoes[0].dest
+        return None
+
+    def __repr__(self):
+        return f"B{self.indice}"
+
+
+class Laco:
+    """Laço natural: o cabeçalho é o único ponto de entrada do conjunto de blocos."""
+    def __init__(self, cabecalho, blocos):
+        self.cabecalho = cabecalho
+        self.blocos = blocos
+
+    def saidas(self):
+        """Blocos fora do laço alcançados diretamente de dentro dele."""
+        return {s for b in self.blocos for s in b.sucessores if s not in self.blocos}
+
+    def __repr__(self):
+        return f"Laco({self.cabecalho!r}, {sorted(b.indice for b in self.blocos)})"
+
+
+class GrafoFluxo:
+    def __init__(self, instrucoes):
+        """
+        Entrada: lista de Instrucao (ver tac.py), na ordem do programa.
+        O bloco de índice 0 é a entrada do programa.
+        """
+        self.blocos = []
+        self._construir_blocos(instrucoes)
+        self._ligar_blocos()
+
+    def _construir_blocos(self, instrucoes):
+        # Líderes: a primeira instrução, todo rótulo e toda instrução após um desvio
+        atual = []
+        for instr in instrucoes:
+            if instr.tipo == ROTULO and atual:
+                self._novo_bloco(atual)
+                atual = []
+            atual.append(instr)
+            if instr.tipo in (DESVIO, DESVIO_FALSO):
+                self._novo_bloco(atual)
+                atual = []
+        if atual or not self.blocos:
+            self._novo_bloco(atual)
+
+    def _novo_bloco(self, instrucoes):
+        self.blocos.append(BlocoBasico(len(self.blocos), instrucoes))
+
+    def _ligar_blocos(self):
+        por_rotulo = {b.rotulo: b for b in self.blocos if b.rotulo is not None}
+        for i, bloco in enumerate(self.blocos):
+            ultima = bloco.instrucoes[-1] if bloco.instrucoes else None
+            destinos = []
+            if ultima is not None and ultima.tipo in (DESVIO, DESVIO_FALSO):
+                if ultima.dest not in por_rotulo:
+                    raise ValueError(f"Desvio para rótulo inexistente '{ultima.dest}'")
+                destinos.append(por_rotulo[ultima.dest])
+            # Só o 'goto' incondicional impede de seguir para o bloco seguinte
+            if (ultima is None or ultima.tipo != DESVIO) and i + 1 < len(self.blocos):
+                destinos.append(self.blocos[i + 1])
+            for destino in destinos:
+                if destino not in bloco.sucessores:
+                    bloco.sucessores.append(destino)
+                    destino.predecessores.append(bloco)
+
+    @property
+    def entrada(self):
+        return self.blocos[0]
+
+    def instrucoes(self):
+        """Reconstrói a lista linear de instruções a partir dos blocos."""
+        return [instr for bloco in self.blocos for instr in bloco.instrucoes]
+
+    # ------ ANÁLISE DE VIVACIDADE ------
+
+    def analisar_vivacidade(self):
+        """
+        Análise backward clássica:
+            vivas_saida(B)   = união de vivas_entrada(S) para S sucessor de B
+            vivas_entrada(B) = usa(B) ∪ (vivas_saida(B) - define(B))
+        Resolvida com uma lista de trabalho até o ponto fixo.
+        """
+        for bloco in self.blocos:
+            bloco.usa, bloco.define = set(), set()
+            for instr in bloco.instrucoes:
+                for operando in variaveis_lidas(instr):
+                    if operando not in bloco.define:
+                        bloco.usa.add(operando)
+                definida = instr.definicao()
+                if definida is not None:
+                    bloco.define.add(definida)
+            bloco.vivas_entrada, bloco.vivas_saida = set(bloco.usa), set()
+
+        pendentes = list(self.blocos)       # pop() começa pelo último bloco (análise backward)
+        na_lista = set(pendentes)
+        while pendentes:
+            bloco = pendentes.pop()
+            na_lista.discard(bloco)
+            saida = set()
+            for sucessor in bloco.sucessores:
+                saida |= sucessor.vivas_entrada
+            entrada = bloco.usa | (saida - bloco.define)
+            bloco.vivas_saida = saida
+            if entrada != bloco.vivas_entrada:
+                bloco.vivas_entrada = entrada
+                for predecessor in bloco.predecessores:
+                    if predecessor not in na_lista:
+                        pendentes.append(predecessor)
+                        na_lista.add(predecessor)
+
+    # ------ DOMINADORES E LAÇOS NATURAIS ------
+
+    def _pos_ordem_reversa(self):
+        """Blocos alcançáveis a partir da entrada, em pós-ordem reversa (DFS iterativa)."""
+        visitados = {self.entrada}
+        ordem = []
+        pilha = [(self.entrada, iter(self.entrada.sucessores))]
+        while pilha:
+            bloco, sucessores = pilha[-1]
+            for sucessor in sucessores:
+                if sucessor not in visitados:
+                    visitados.add(sucessor)
+                    pilha.append((sucessor, iter(sucessor.sucessores)))
+                    break
+            else:
+                pilha.pop()
+                ordem.append(bloco)
+        ordem.reverse()
+        return ordem
+
+    def alcancaveis(self):
+        """Conjunto dos blocos alcançáveis a partir da entrada."""
+        return set(self._pos_ordem_reversa())
+
+    def calcular_dominadores(self):
+        """
+        Dominador imediato (bloco.idom) de cada bloco alcançável, pelo método
+        iterativo de Cooper, Harvey e Kennedy. A entrada é o próprio idom;
+        blocos inalcançáveis ficam com None. Devolve os blocos alcançáveis
+        em pós-ordem reversa.
+        """
+        ordem = self._pos_ordem_reversa()
+        posicao = {bloco: i for i, bloco in enumerate(ordem)}
+        for bloco in self.blocos:
+            bloco.idom = None
+            bloco.intervalo_dom = None
+        self.entrada.idom = self.entrada
+
+        def intersectar(a, b):
+            while a is not b:
+                while posicao[a] > posicao[b]:
+                    a = a.idom
+                while posicao[b] > posicao[a]:
+                    b = b.idom
+            return a
+
+        mudou = True
+        while mudou:
+            mudou = False
+            for bloco in ordem[1:]:
+                novo = None
+                for predecessor in bloco.predecessores:
+                    if predecessor.idom is not None:
+                        novo = predecessor if novo is None else intersectar(predecessor, novo)
+                if novo is not bloco.idom:
+                    bloco.idom = novo
+                    mudou = True
+
+        # Numera a árvore de dominadores em profundidade: a domina b exatamente
+        # quando o intervalo de b está contido no de a (consulta em O(1))
+        filhos = {bloco: [] for bloco in ordem}
+        for bloco in ordem[1:]:
+            filhos[bloco.idom].append(bloco)
+        contador = 0
+        pilha = [(self.entrada, False)]
+        while pilha:
+            bloco, fechando = pilha.pop()
+            if fechando:
+                bloco.intervalo_dom = (bloco.intervalo_dom[0], contador)
+            else:
+                bloco.intervalo_dom = (contador, None)
+                pilha.append((bloco, True))
+                pilha.extend((filho, False) for filho in filhos[bloco])
+            contador += 1
+        return ordem
+
+    def domina(self, a, b):
+        """Todo caminho da entrada até b passa por a (requer calcular_dominadores)."""
+        if a.idom is None or b.idom is None:
+            return False
+        return a.intervalo_dom[0] <= b.intervalo_dom[0] and b.intervalo_dom[1] <= a.intervalo_dom[1]
+
+    def lacos_naturais(self):
+        """
+        Para cada aresta de retorno B -> H (H domina B), o laço é H mais os
+        blocos que alcançam B sem passar por H; laços com o mesmo cabeçalho
+        são unidos. Os mais internos (menores) vêm primeiro.
+        """
+        ordem = self.calcular_dominadores()
+        posicao = {bloco: i for i, bloco in enumerate(ordem)}
+        corpos = {}
+        for bloco in ordem:
+            for sucessor in bloco.sucessores:
+                # Toda aresta de retorno volta na pós-ordem reversa; só essas são testadas
+                if posicao[sucessor] > posicao[bloco] or not self.domina(sucessor, bloco):
+                    continue
+                corpo = corpos.setdefault(sucessor, {sucessor})
+                pendentes = [bloco]
+                while pendentes:
+                    atual = pendentes.pop()
+                    if atual not in corpo and atual.idom is not None:     # Só blocos alcançáveis
+                        corpo.add(atual)
+                        pendentes.extend(atual.predecessores)
+        lacos = [Laco(cabecalho, corpo) for cabecalho, corpo in corpos.items()]
+        return sorted(lacos, key=lambda laco: len(laco.blocos))
+
+    def vivas_apos_cada_instrucao(self, bloco):
+        """Lista com o conjunto de variáveis vivas logo após cada instrução do bloco."""
+        vivas = set(bloco.vivas_saida)
+        resultado = [None] * len(bloco.instrucoes)
+        for i in range(len(bloco.instrucoes) - 1, -1, -1):
+            resultado[i] = set(vivas)
+            instr = bloco.instrucoes[i]
+            definida = instr.definicao()
+            if definida is not None:
+                vivas.discard(definida)
+            vivas.update(variaveis_lidas(instr))
+        return resultado
+
+    def descrever(self):
+        """Texto com os blocos, arestas e variáveis vivas (para depuração)."""
+        linhas = []
+        for bloco in self.blocos:
+            sucessores = ", ".join(repr(s) for s in bloco.sucessores) or "-"
+            linhas.append(f"{bloco!r} -> {sucessores}")
+            linhas.append(f"    vivas na entrada: {sorted(bloco.vivas_entrada)}")
+            for instr in bloco.instrucoes:
+                linhas.append(f"    {formatar_instrucao(instr)}")
+            linhas.append(f"    vivas na saída:   {sorted(bloco.vivas_saida)}")
+        return "\n".join(linhas)
+
+
+# ------ REALOCAÇÃO DE TEMPORÁRIOS (LINEAR SCAN) ------
+
+def calcular_intervalos(grafo):
+    """
+    Intervalo [início, fim] de cada temporário, em posições da lista linear de
+    instruções. Um temporário vivo na saída de um bloco que fecha um laço
+    fica vivo em todo o corpo do laço, então o intervalo cobre o laço inteiro.
+    """
+    intervalos = {}
+    posicao = 0
+    for bloco in grafo.blocos:
+        vivas_apos = grafo.vivas_apos_cada_instrucao(bloco)
+        for i, instr in enumerate(bloco.instrucoes):
+            nomes = variaveis_lidas(instr) + list(vivas_apos[i])
+            definida = instr.definicao()
+            if definida is not None:
+                nomes.append(definida)
+            for nome in nomes:
+                if not eh_temporario(nome):
+                    continue
+                if nome in intervalos:
+                    inicio, _ = intervalos[nome]
+                    intervalos[nome] = (inicio, posicao)
+                else:
+                    intervalos[nome] = (posicao, posicao)
+            posicao += 1
+        # Vivos na entrada do bloco (vindos de um laço) cobrem o bloco desde o início
+        inicio_bloco = posicao - len(bloco.instrucoes)
+        for nome in bloco.vivas_entrada:
+            if eh_temporario(nome) and nome in intervalos:
+                inicio, fim = intervalos[nome]
+                intervalos[nome] = (min(inicio, inicio_bloco), max(fim, inicio_bloco))
+    return intervalos
+
+
+def realocar_temporarios(instrucoes):
+    """
+    Renomeia os temporários para um conjunto pequeno (t0..tK) usando varredura
+    linear sobre os intervalos de vida. As instruções são alteradas no lugar.
+    Retorna (quantidade_antes, quantidade_depois).
+    """
+    grafo = GrafoFluxo(instrucoes)
+    grafo.analisar_vivacidade()
+    intervalos = calcular_intervalos(grafo)
+
+    ordem = sorted(intervalos.items(), key=lambda item: (item[1][0], item[1][1]))
+    ativos = []         # (fim, nome_novo) dos intervalos ainda vivos
+    livres = []         # Nomes liberados, reutilizados do menor para o maior
+    mapa = {}
+    total = 0
+    for nome, (inicio, fim) in ordem:
+        # Libera os intervalos que terminaram até esta posição. Um temporário
+        # lido na mesma instrução que define outro pode ceder o seu nome
+        # (o TAC lê os operandos antes de escrever o destino)
+        ainda_ativos = []
+        for fim_ativo, novo in ativos:
+            if fim_ativo <= inicio:
+                livres.append(novo)
+            else:
+                ainda_ativos.append((fim_ativo, novo))
+        ativos = ainda_ativos
+
+        if livres:
+            livres.sort(key=lambda t: int(t[1:]))
+            novo = livres.pop(0)
+        else:
+            novo = f"t{total}"
+            total += 1
+        mapa[nome] = novo
+        ativos.append((fim, novo))
+
+    for instr in instrucoes:
+        if instr.definicao() in mapa:
+            instr.dest = mapa[instr.dest]
+        if instr.arg1 in mapa:
+            instr.arg1 = mapa[instr.arg1]
+        if instr.arg2 in mapa:
+            instr.arg2 = mapa[instr.arg2]
+    return len(intervalos), total
+
+
+# --- Execução direta: mostra o CFG de um arquivo .tac ---
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Uso correto: python fluxo.py <arquivo.tac>")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        grafo = GrafoFluxo(ler_codigo(f.read()))
+    grafo.analisar_vivacidade()
+    print(grafo.descrever())
@@ -0,0 +1,70 @@
+import io
+import os
+import mmap
+import codecs
+
+"""
+Entrada do código fonte mapeada em memória. Em vez de ler o arquivo inteiro
+para uma única string (que pode ocupar até 4 bytes por caractere), o arquivo
+é mapeado com mmap e decodificado em UTF-8 aos poucos, bloco a bloco, à
+medida que o analisador léxico consome o texto:
+
+    with FonteMapeada("programa.emoji") as fonte:
+        tokens, sucesso = analise_lexica.analisar(fonte)
+
+Cada bloco termina em uma quebra de linha (menos o último), então nenhum
+token fica dividido entre dois blocos; só o bloco atual fica decodificado
+em memória. As quebras de linha são traduzidas como no open() em modo texto
+('\\r\\n' e '\\r' viram '\\n'), então os tokens são os mesmos de f.read().
+"""
+
+TAMANHO_BLOCO = 1 << 18     # Bytes do arquivo decodificados por vez
+
+
+class FonteMapeada:
+    def __init__(self, caminho, tamanho_bloco=TAMANHO_BLOCO):
+        self.caminho = caminho
+        self.tamanho_bloco = tamanho_bloco
+        self.tamanho = 0            # Bytes do arquivo
+        self._arquivo = None
+        self._mapa = None
+
+    def __enter__(self):
+        self._arquivo = open(self.caminho, 'rb')
+        try:
+            self.tamanho = os.fstat(self._arquivo.fileno()).st_size
+            if self.tamanho:        # mmap não aceita arquivos vazios
+                self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._arquivo.close()
+            raise
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def __iter__(self):
+        """Blocos de texto decodificado, cada um terminando em '\\n' (menos o último)."""
+        if self._mapa is None:
+            return
+        decodificador = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+        resto = ""
+        for inicio in range(0, self.tamanho, self.tamanho_bloco):
+            texto = resto + decodificador.decode(self._mapa[inicio:inicio + self.tamanho_bloco])
+            corte = texto.rfind('\n') + 1
+            if corte:
+                yield texto[:corte]
+                resto = texto[corte:]
+            else:
+                resto = texto       # Linha maior que o bloco: junta com o próximo
+        resto += decodificador.decode(b"", final=True)
+        if resto:
+            yield resto
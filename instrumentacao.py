@@ -0,0 +1,118 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+"""
+Instrumentação das etapas do compilador (--profile). Cada etapa medida
+registra tempo de parede, tempo de CPU, pico de memória alocada durante a
+etapa (tracemalloc, opcional por ser caro) e contagens próprias (tokens,
+nós da árvore, instruções TAC, temporários, rótulos).
+
+Outras ferramentas podem assinar as medições sem passar pela linha de
+comando:
+    import instrumentacao
+    instrumentacao.assinar(lambda medicao: print(medicao['etapa'], medicao['tempo']))
+Cada assinante recebe o dicionário da medição assim que a etapa termina.
+"""
+
+_assinantes = []
+
+
+def assinar(funcao):
+    """Registra uma função chamada com cada medição concluída. Retorna a própria função."""
+    _assinantes.append(funcao)
+    return funcao
+
+
+def cancelar_assinatura(funcao):
+    if funcao in _assinantes:
+        _assinantes.remove(funcao)
+
+
+def ha_assinantes():
+    return bool(_assinantes)
+
+
+def medir(perfil, nome, contagens=None):
+    """perfil.etapa(...), ou um contexto que não mede nada quando não há perfil."""
+    if perfil is None:
+        return nullcontext({})
+    return perfil.etapa(nome, contagens)
+
+
+def contar_nos(raiz):
+    """Quantidade de nós da árvore sintática (percurso iterativo: a árvore pode ser muito funda)."""
+    total = 0
+    pendentes = [raiz] if raiz is not None else []
+    while pendentes:
+        no = pendentes.pop()
+        total += 1
+        pendentes.extend(no.children)
+    return total
+
+
+class Perfil:
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.medicoes = []
+        self._iniciou_tracemalloc = False
+
+    @contextmanager
+    def etapa(self, nome, contagens=None):
+        """
+        Mede o bloco 'with'. O dicionário entregue pode receber contagens
+        (ex.: medicao['tokens'] = 120) antes de a etapa terminar. Contagens
+        caras de calcular podem vir em 'contagens', uma função chamada depois
+        que o relógio parou (e só se a etapa terminou sem erro).
+        """
+        medicao = {'etapa': nome}
+        if self.memoria:
+            import tracemalloc      # Caro de importar; só o --profile mede memória
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._iniciou_tracemalloc = True
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        inicio_cpu = time.process_time()
+        inicio = time.perf_counter()
+        concluida = False
+        try:
+            yield medicao
+            concluida = True
+        finally:
+            medicao['tempo'] = time.perf_counter() - inicio
+            medicao['cpu'] = time.process_time() - inicio_cpu
+            if self.memoria:
+                import tracemalloc
+                medicao['memoria_pico'] = max(0, tracemalloc.get_traced_memory()[1] - memoria_inicial)
+            if concluida and contagens is not None:
+                medicao.update(contagens())
+            self.medicoes.append(medicao)
+            for funcao in list(_assinantes):
+                funcao(medicao)
+
+    def encerrar(self):
+        if self._iniciou_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+    def para_json(self):
+        import json
+        return json.dumps({'etapas': self.medicoes,
+                           'total': {'tempo': sum(m['tempo'] for m in self.medicoes),
+                                     'cpu': sum(m['cpu'] for m in self.medicoes)}},
+                          ensure_ascii=False, indent=2)
+
+    def relatorio(self):
+        """Tabela com uma linha por etapa, na ordem em que rodaram."""
+        linhas = ["Perfil da compilação (--profile):",
+                  f"   {'Etapa':<20}{'Parede (ms)':>12}{'CPU (ms)':>11}{'Pico mem. (KiB)':>17}   Contagens"]
+        for m in self.medicoes:
+            contagens = ", ".join(f"{chave}={valor}" for chave, valor in m.items()
+                                  if chave not in ('etapa', 'tempo', 'cpu', 'memoria_pico'))
+            memoria = f"{m['memoria_pico'] / 1024:.1f}" if 'memoria_pico' in m else "-"
+            linhas.append(f"   {m['etapa']:<20}{m['tempo'] * 1000:>12.2f}{m['cpu'] * 1000:>11.2f}"
+                          f"{memoria:>17}   {contagens}")
+        total = sum(m['tempo'] for m in self.medicoes)
+        linhas.append(f"   {'total':<20}{total * 1000:>12.2f}{sum(m['cpu'] for m in self.medicoes) * 1000:>11.2f}")
+        return "\n".join(linhas)
@@ -0,0 +1,429 @@
+import sys
+import re
+import time
+
+from tac import (ROTULO, DESVIO, DESVIO_FALSO, COPIA, BINARIA, IMPRIME,
+                 ler_instrucao, ler_codigo, formatar_instrucao, eh_constante, valor_constante,
+                 dividir)
+from fluxo import GrafoFluxo
+
+"""
+Máquina Virtual que executa diretamente o Código Intermediário (TAC).
+Na carga, cada instrução TAC é traduzida uma única vez para uma pequena
+função Python (código encadeado, ou "threaded code") que executa a operação
+e devolve o índice da próxima instrução. Assim:
+    - rótulos são resolvidos para índices na carga, e desvios incondicionais
+      são seguidos direto pela instrução anterior (o 'goto' nem é despachado);
+    - variáveis, temporários e literais viram índices (slots) de uma lista de
+      memória, com os literais pré-carregados, sem consultas a dicionários;
+    - 'tX = a < b' seguido de 'if_false tX goto L' vira uma única instrução de
+      comparação e desvio quando tX não está vivo depois do desvio;
+    - o laço de despacho se resume a 'pc = codigo[pc]()'.
+PRINT e SCAN usam funções de entrada/saída plugáveis.
+"""
+
+# Valor inicial das variáveis ainda não atribuídas, por tipo declarado
+VALORES_INICIAIS = {'INT': 0, 'BOOL': 0, 'STRING': ''}
+
+_REGEX_INTEIRO = re.compile(r"\s*-?\d+\s*$")
+
+
+class ErroExecucao(Exception):
+    """Erro em tempo de execução do programa (divisão por zero, tipos, entrada inválida)."""
+    pass
+
+
+# ------ ENTRADA E SAÍDA PADRÃO ------
+
+def entrada_padrao():
+    linha = sys.stdin.readline()
+    if not linha:
+        raise ErroExecucao("SCAN sem dados na entrada padrão.")
+    return linha.rstrip('\n')
+
+
+def saida_padrao(texto):
+    sys.stdout.write(texto + "\n")
+
+
+def converter_entrada(linha, nome, tipos):
+    """Converte a linha lida pelo SCAN conforme o tipo declarado da variável."""
+    tipo = tipos.get(nome)
+    if tipo == 'STRING':
+        return linha
+    if tipo == 'BOOL':
+        return 1 if linha.strip() in ('1', '👍') else 0
+    if tipo == 'INT' or _REGEX_INTEIRO.match(linha):
+        try:
+            return int(linha)
+        except ValueError:
+            raise ErroExecucao(f"SCAN de '{nome}': '{linha}' não é um inteiro.") from None
+    return linha
+
+
+# ------ CONSTRUTORES DAS INSTRUÇÕES ------
+# Cada função recebe a memória, os slots dos operandos e a próxima instrução (p)
+# e devolve a função executável. Os valores entram como argumentos padrão para
+# virarem variáveis locais (acesso mais rápido que variáveis de closure).
+
+def _copia(m, a, b, p):
+    def f(m=m, a=a, b=b, p=p):
+        m[a] = m[b]
+        return p
+    return f
+
+def _soma(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = m[b] + m[c]
+        return p
+    return f
+
+def _sub(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = m[b] - m[c]
+        return p
+    return f
+
+def _mult(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = m[b] * m[c]
+        return p
+    return f
+
+def _div(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p, dividir=dividir):
+        m[a] = dividir(m[b], m[c])
+        return p
+    return f
+
+def _menor(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] < m[c] else 0
+        return p
+    return f
+
+def _maior(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] > m[c] else 0
+        return p
+    return f
+
+def _menor_igual(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] <= m[c] else 0
+        return p
+    return f
+
+def _maior_igual(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] >= m[c] else 0
+        return p
+    return f
+
+def _igual(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] == m[c] else 0
+        return p
+    return f
+
+def _diferente(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] != m[c] else 0
+        return p
+    return f
+
+def _e(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] and m[c] else 0
+        return p
+    return f
+
+def _ou(m, a, b, c, p):
+    def f(m=m, a=a, b=b, c=c, p=p):
+        m[a] = 1 if m[b] or m[c] else 0
+        return p
+    return f
+
+def _desvio(destino):
+    def f(destino=destino):
+        return destino
+    return f
+
+def _desvio_falso(m, a, destino, p):
+    def f(m=m, a=a, destino=destino, p=p):
+        return p if m[a] else destino
+    return f
+
+# Comparação e desvio fundidos: segue em frente se 'a op b', senão desvia
+
+def _se_menor(m, a, b, destino, p):
+    def f(m=m, a=a, b=b, destino=destino, p=p):
+        return p if m[a] < m[b] else destino
+    return f
+
+def _se_maior(m, a, b, destino, p):
+    def f(m=m, a=a, b=b, destino=destino, p=p):
+        return p if m[a] > m[b] else destino
+    return f
+
+def _se_menor_igual(m, a, b, destino, p):
+    def f(m=m, a=a, b=b, destino=destino, p=p):
+        return p if m[a] <= m[b] else destino
+    return f
+
+def _se_maior_igual(m, a, b, destino, p):
+    def f(m=m, a=a, b=b, destino=destino, p=p):
+        return p if m[a] >= m[b] else destino
+    return f
+
+def _se_igual(m, a, b, destino, p):
+    def f(m=m, a=a, b=b, destino=destino, p=p):
+        return p if m[a] == m[b] else destino
+    return f
+
+def _se_diferente(m, a, b, destino, p):
+    def f(m=m, a=a, b=b, destino=destino, p=p):
+        return p if m[a] != m[b] else destino
+    return f
+
+OPERACOES_BINARIAS = {
+    '+': _soma, '-': _sub, '*': _mult, '/': _div,
+    '<': _menor, '>': _maior, '<=': _menor_igual, '>=': _maior_igual,
+    '==': _igual, '!=': _diferente, '&&': _e, '||': _ou,
+}
+
+COMPARACOES_FUNDIDAS = {
+    '<': _se_menor, '>': _se_maior, '<=': _se_menor_igual, '>=': _se_maior_igual,
+    '==': _se_igual, '!=': _se_diferente,
+}
+
+
+class MaquinaVirtual:
+    def __init__(self, instrucoes, entrada=None, saida=None, tipos=None, constantes=None):
+        """
+        instrucoes: lista de Instrucao ou de linhas TAC (como GeradorTAC.instrucoes).
+        entrada: função sem argumentos que devolve a próxima linha lida pelo SCAN.
+        saida: função que recebe o texto escrito por cada PRINT.
+        tipos: tipo declarado das variáveis (GeradorTAC.tipos). Sem ele, o SCAN
+               lê inteiros quando a linha é numérica e strings caso contrário.
+        constantes: pool de literais referenciado pelas linhas TAC (#0, #1...);
+                    cada literal ocupa uma única posição da memória inicial.
+        """
+        self.entrada = entrada or entrada_padrao
+        self.saida = saida or saida_padrao
+        self.tipos = tipos or {}
+        self.instrucoes = [ler_instrucao(i, constantes) if isinstance(i, str) else i for i in instrucoes]
+
+        self.slots = {}             # Nome (ou literal) -> índice na memória
+        self.memoria_inicial = []
+        self.memoria = []           # Lista compartilhada por todas as instruções carregadas
+        self.codigo = []            # Funções executáveis, uma por instrução
+        self.origem = []            # Instrução TAC que gerou cada função (mensagens de erro)
+        self.indices = []           # Índice dessa instrução no TAC (mapa de fonte do perfil)
+        self.fundidas = 0
+        self._carregar()
+
+        self.instrucoes_executadas = 0
+        self.tempo_execucao = 0.0
+
+    # ------ CARGA (TRADUÇÃO PARA O FORMATO DE EXECUÇÃO) ------
+
+    def _slot(self, operando):
+        indice = self.slots.get(operando)
+        if indice is None:
+            indice = len(self.memoria_inicial)
+            self.slots[operando] = indice
+            if eh_constante(operando):
+                self.memoria_inicial.append(valor_constante(operando))
+            else:
+                self.memoria_inicial.append(VALORES_INICIAIS.get(self.tipos.get(operando), 0))
+        return indice
+
+    def _carregar(self):
+        # 1. Escolhe as instruções que serão executadas (rótulos somem, pares
+        #    comparação + if_false viram uma só) e a posição de cada rótulo
+        fundir = self._comparacoes_fundiveis()
+        selecionadas = []
+        destinos = {}
+        for i, instr in enumerate(self.instrucoes):
+            if instr.tipo == ROTULO:
+                destinos[instr.dest] = len(selecionadas)
+            elif i - 1 not in fundir:
+                selecionadas.append((instr, self.instrucoes[i + 1] if i in fundir else None))
+                self.indices.append(i)
+        self.fundidas = len(fundir)
+        fim = len(selecionadas)
+
+        def resolver(rotulo):
+            if rotulo not in destinos:
+                raise ErroExecucao(f"Desvio para rótulo inexistente '{rotulo}'")
+            return seguir(destinos[rotulo])
+
+        def seguir(posicao):
+            # Pula cadeias de 'goto' para que a instrução anterior desvie direto
+            vistas = set()
+            while posicao < fim and selecionadas[posicao][0].tipo == DESVIO and posicao not in vistas:
+                vistas.add(posicao)
+                posicao = destinos.get(selecionadas[posicao][0].dest, posicao)
+            return posicao
+
+        # 2. Gera a função de cada instrução, com slots e destinos resolvidos
+        m = self.memoria
+        for posicao, (instr, salto) in enumerate(selecionadas):
+            p = seguir(posicao + 1)
+            tipo = instr.tipo
+            if tipo == COPIA:
+                f = _copia(m, self._slot(instr.dest), self._slot(instr.arg1), p)
+            elif tipo == BINARIA:
+                if instr.op not in OPERACOES_BINARIAS:
+                    raise ErroExecucao(f"Operador desconhecido '{instr.op}' em '{formatar_instrucao(instr)}'")
+                if salto is not None:
+                    f = COMPARACOES_FUNDIDAS[instr.op](m, self._slot(instr.arg1), self._slot(instr.arg2),
+                                                       resolver(salto.dest), p)
+                else:
+                    f = OPERACOES_BINARIAS[instr.op](m, self._slot(instr.dest), self._slot(instr.arg1),
+                                                     self._slot(instr.arg2), p)
+            elif tipo == DESVIO:
+                f = _desvio(resolver(instr.dest))
+            elif tipo == DESVIO_FALSO:
+                f = _desvio_falso(m, self._slot(instr.arg1), resolver(instr.dest), p)
+            elif tipo == IMPRIME:
+                f = self._imprime(self._slot(instr.arg1), p)
+            else:
+                f = self._le(self._slot(instr.dest), instr.dest, p)
+            self.codigo.append(f)
+            self.origem.append(instr)
+        m.extend(self.memoria_inicial)
+
+    def _comparacoes_fundiveis(self):
+        """
+        Índices das comparações 'tX = a op b' seguidas de 'if_false tX goto L'
+        em que tX não está vivo depois do desvio (consulta a vivacidade do CFG).
+        """
+        candidatas = {}
+        for i in range(len(self.instrucoes) - 1):
+            instr, seguinte = self.instrucoes[i], self.instrucoes[i + 1]
+            if (instr.tipo == BINARIA and instr.op in COMPARACOES_FUNDIDAS
+                    and seguinte.tipo == DESVIO_FALSO and seguinte.arg1 == instr.dest):
+                candidatas[id(seguinte)] = i
+        if not candidatas:
+            return set()
+
+        grafo = GrafoFluxo(self.instrucoes)
+        grafo.analisar_vivacidade()
+        fundir = set()
+        for bloco in grafo.blocos:
+            ultima = bloco.instrucoes[-1] if bloco.instrucoes else None
+            if ultima is not None and id(ultima) in candidatas and ultima.arg1 not in bloco.vivas_saida:
+                fundir.add(candidatas[id(ultima)])
+        return fundir
+
+    def _imprime(self, a, p):
+        m = self.memoria
+        escrever = self.saida
+        def f(m=m, a=a, p=p, escrever=escrever):
+            escrever(str(m[a]))
+            return p
+        return f
+
+    def _le(self, a, nome, p):
+        m = self.memoria
+        ler = self.entrada
+        tipos = self.tipos
+        def f(m=m, a=a, p=p, ler=ler, nome=nome, tipos=tipos):
+            m[a] = converter_entrada(ler(), nome, tipos)
+            return p
+        return f
+
+    # ------ EXECUÇÃO ------
+
+    def executar(self):
+        """Executa o programa do início ao fim. Retorna a quantidade de instruções executadas."""
+        codigo = self.codigo
+        self.memoria[:] = self.memoria_inicial
+        fim = len(codigo)
+        pc = 0
+        n = 0
+
+        inicio = time.perf_counter()
+        try:
+            while pc < fim:
+                pc = codigo[pc]()
+                n += 1
+        except (TypeError, ZeroDivisionError) as e:
+            instr = formatar_instrucao(self.origem[pc])
+            raise ErroExecucao(f"Erro de execução em '{instr}': {e}") from None
+        finally:
+            self.tempo_execucao = time.perf_counter() - inicio
+            self.instrucoes_executadas = n
+        return n
+
+    def executar_com_perfil(self):
+        """
+        Executa o programa contando, para cada instrução carregada, quantas
+        vezes ela rodou e o tempo gasto nela (em ns, do fim da anterior até o
+        seu fim). Retorna as duas listas, indexadas como self.codigo; o
+        perfil_execucao as traduz para linhas e laços do fonte.
+        """
+        codigo = self.codigo
+        self.memoria[:] = self.memoria_inicial
+        fim = len(codigo)
+        contagens = [0] * fim
+        tempos = [0] * fim
+        relogio = time.perf_counter_ns
+        pc = 0
+        n = 0
+
+        inicio = time.perf_counter()
+        antes = relogio()
+        try:
+            while pc < fim:
+                atual = pc
+                pc = codigo[pc]()
+                agora = relogio()
+                contagens[atual] += 1
+                tempos[atual] += agora - antes
+                antes = agora
+                n += 1
+        except (TypeError, ZeroDivisionError) as e:
+            instr = formatar_instrucao(self.origem[pc])
+            raise ErroExecucao(f"Erro de execução em '{instr}': {e}") from None
+        finally:
+            self.tempo_execucao = time.perf_counter() - inicio
+            self.instrucoes_executadas = n
+        return contagens, tempos
+
+    def valor(self, nome):
+        """Valor atual de uma variável (depois de executar)."""
+        if nome not in self.slots:
+            return None
+        return self.memoria[self.slots[nome]]
+
+    def relatorio(self):
+        tempo = self.tempo_execucao
+        taxa = self.instrucoes_executadas / tempo if tempo > 0 else 0.0
+        return (f"Máquina Virtual: {self.instrucoes_executadas} instruções executadas em "
+                f"{tempo * 1000:.2f} ms ({taxa / 1e6:.2f} milhões/s); "
+                f"{len(self.codigo)} instruções carregadas ({self.fundidas} comparações fundidas "
+                f"com o desvio), {len(self.memoria_inicial)} slots de memória")
+
+
+# --- Execução direta de um arquivo .tac ---
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if a != "--estatisticas"]
+    if len(argumentos) != 1:
+        print("Uso correto: python maquina_virtual.py <arquivo.tac> [--estatisticas]")
+        sys.exit(1)
+
+    with open(argumentos[0], 'r', encoding='utf-8') as f:
+        programa = ler_codigo(f.read())
+
+    try:
+        maquina = MaquinaVirtual(programa)
+        maquina.executar()
+    except ErroExecucao as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if "--estatisticas" in sys.argv:
+        print(maquina.relatorio(), file=sys.stderr)
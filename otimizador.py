@@ -0,0 +1,704 @@
+from itertools import count
+
+from tac import (ROTULO, DESVIO, DESVIO_FALSO, COPIA, BINARIA, OPS_COMUTATIVOS,
+                 Instrucao, TabelaConstantes, ler_instrucoes, formatar_instrucoes, eh_constante, eh_temporario,
+                 valor_constante, formatar_constante, avaliar_operacao)
+from fluxo import GrafoFluxo, realocar_temporarios
+
+"""
+Otimizador do Código Intermediário (TAC). Recebe a lista de instruções
+produzida pelo GeradorTAC e aplica, até atingir um ponto fixo, os passes:
+    1. Dobramento de constantes       (t0 = 2 + 3   ->  t0 = 5)
+    2. Propagação de constantes/cópias (x = 5; t1 = x + 1  ->  t1 = 5 + 1)
+    3. Coalescência de cópias
+    4. Subexpressões comuns por numeração de valores (t1 = a + b ... t4 = b + a  ->  t4 = t1)
+    5. Movimento de código invariante de laço (LICM) para um pré-cabeçalho
+    6. Redução de força em variáveis de indução (t = i * 4 -> t1 = t1 + 4 a cada volta)
+    7. Eliminação de temporários mortos
+    8. Desvios com condição constante, encadeamento de desvios e blocos inalcançáveis
+    9. Remoção de rótulos e desvios redundantes
+Cada passe contabiliza quantas alterações fez, para o relatório do '-O'.
+Por fim, os temporários são realocados para um conjunto pequeno de nomes
+com base na análise de vivacidade do CFG (ver fluxo.py).
+"""
+
+# Nome dos passes na ordem em que rodam (e aparecem no relatório)
+PASSES = [
+    ('dobramento', "Dobramento de constantes", "expressões avaliadas em tempo de compilação"),
+    ('propagacao', "Propagação de constantes e cópias", "operandos substituídos"),
+    ('coalescencia', "Coalescência de cópias", "pares 'tX = ...; v = tX' unidos"),
+    ('subexpressoes', "Subexpressões comuns", "cálculos repetidos reaproveitados"),
+    ('invariantes', "Código invariante de laço", "instruções movidas para o pré-cabeçalho"),
+    ('inducao', "Variáveis de indução", "multiplicações trocadas por somas ou contadores eliminados"),
+    ('codigo_morto', "Eliminação de temporários mortos", "instruções removidas"),
+    ('ramos', "Condições constantes e código inalcançável", "desvios simplificados ou instruções removidas"),
+    ('desvios', "Rótulos e desvios redundantes", "instruções removidas"),
+]
+
+# Operador equivalente com os operandos trocados de lado ('a < b' == 'b > a')
+COMPARACOES_ESPELHADAS = {'<': '>', '>': '<', '<=': '>=', '>=': '<=', '==': '==', '!=': '!='}
+
+# Operadores que só existem entre inteiros (o resultado também é inteiro)
+OPS_INTEIROS = frozenset(['-', '*', '/'])
+
+# Limite de rodadas do ponto fixo (cada rodada roda todos os passes)
+MAX_RODADAS = 10
+
+
+class OtimizadorTAC:
+    def __init__(self):
+        self.estatisticas = {nome: 0 for nome, _, _ in PASSES}
+        self.tamanho_antes = 0
+        self.tamanho_depois = 0
+        self.rodadas = 0
+        self.temporarios_antes = 0
+        self.temporarios_depois = 0
+        self.constantes = TabelaConstantes()        # Pool da saída (só os literais que sobraram)
+        self.tipos = {}                             # Tipo declarado das variáveis (GeradorTAC.tipos)
+
+    def otimizar(self, linhas, constantes=None, tipos=None):
+        """
+        Entrada: lista de instruções TAC (strings, como GeradorTAC.instrucoes),
+        o pool de literais referenciado por elas (GeradorTAC.constantes.literais)
+        e o tipo declarado das variáveis (GeradorTAC.tipos; sem ele nenhuma
+        variável é tida como inteira).
+        Saída: nova lista de instruções otimizada, no mesmo formato, com as
+        referências ao novo pool em self.constantes.
+        """
+        self.tipos = tipos or {}
+        instrucoes = ler_instrucoes(linhas, constantes)
+        self.tamanho_antes = len(instrucoes)
+
+        for _ in range(MAX_RODADAS):
+            self.rodadas += 1
+            alteracoes = 0
+            for nome, _, _ in PASSES:
+                instrucoes, n = getattr(self, f"passe_{nome}")(instrucoes)
+                self.estatisticas[nome] += n
+                alteracoes += n
+            if alteracoes == 0:
+                break
+
+        self.temporarios_antes, self.temporarios_depois = realocar_temporarios(instrucoes)
+        self.tamanho_depois = len(instrucoes)
+        return formatar_instrucoes(instrucoes, self.constantes)
+
+    def relatorio(self):
+        """Texto com as estatísticas por passe."""
+        linhas = ["Otimização do TAC (-O):"]
+        for nome, titulo, unidade in PASSES:
+            linhas.append(f"   - {titulo}: {self.estatisticas[nome]} {unidade}")
+        reducao = 0.0
+        if self.tamanho_antes:
+            reducao = 100.0 * (self.tamanho_antes - self.tamanho_depois) / self.tamanho_antes
+        linhas.append(f"   Instruções: {self.tamanho_antes} -> {self.tamanho_depois} "
+                      f"(-{reducao:.1f}%) em {self.rodadas} rodada(s)")
+        linhas.append(f"   Temporários: {self.temporarios_antes} -> {self.temporarios_depois} "
+                      f"(realocação por varredura linear)")
+        return "\n".join(linhas)
+
+    # ------ PASSE 1: DOBRAMENTO DE CONSTANTES ------
+
+    def passe_dobramento(self, instrucoes):
+        n = 0
+        for instr in instrucoes:
+            if instr.tipo == BINARIA and eh_constante(instr.arg1) and eh_constante(instr.arg2):
+                try:
+                    valor = avaliar_operacao(instr.op, valor_constante(instr.arg1), valor_constante(instr.arg2))
+                except (TypeError, ZeroDivisionError):
+                    # Erros de tipo/divisão por zero ficam para o tempo de execução
+                    continue
+                instr.tipo, instr.arg1, instr.op, instr.arg2 = COPIA, formatar_constante(valor), None, None
+                n += 1
+        return instrucoes, n
+
+    # ------ PASSE 2: PROPAGAÇÃO DE CONSTANTES E CÓPIAS ------
+
+    def passe_propagacao(self, instrucoes):
+        n = self._propagar_globais(instrucoes)
+
+        # Propagação local: dentro de cada bloco básico, 'x = y' permite trocar
+        # os usos seguintes de x por y, até que x ou y sejam redefinidos
+        valores = {}
+        for instr in instrucoes:
+            if instr.tipo in (ROTULO, DESVIO):
+                # Início/fim de bloco: o valor pode ter vindo de outro caminho
+                valores = {}
+                continue
+
+            n += self._substituir_usos(instr, valores)
+
+            definida = instr.definicao()
+            if definida is not None:
+                valores.pop(definida, None)
+                for nome in [k for k, v in valores.items() if v == definida]:
+                    del valores[nome]
+                if instr.tipo == COPIA and instr.arg1 != definida:
+                    valores[definida] = instr.arg1
+
+            if instr.tipo == DESVIO_FALSO:
+                valores = {}
+        return instrucoes, n
+
+    def _substituir_usos(self, instr, valores):
+        n = 0
+        if instr.arg1 is not None and instr.arg1 in valores:
+            instr.arg1 = valores[instr.arg1]
+            n += 1
+        if instr.arg2 is not None and instr.arg2 in valores:
+            instr.arg2 = valores[instr.arg2]
+            n += 1
+        return n
+
+    def _propagar_globais(self, instrucoes):
+        """
+        Variáveis atribuídas uma única vez, com uma constante, no trecho
+        inicial do programa (antes do primeiro rótulo ou desvio) têm esse valor
+        em todo o resto do programa: a definição domina todos os usos seguintes.
+        """
+        definicoes = {}
+        for instr in instrucoes:
+            definida = instr.definicao()
+            if definida is not None:
+                definicoes[definida] = definicoes.get(definida, 0) + 1
+
+        constantes = {}
+        lidas = set()
+        for instr in instrucoes:
+            if instr.tipo in (ROTULO, DESVIO, DESVIO_FALSO):
+                break
+            lidas.update(instr.usos())
+            if (instr.tipo == COPIA and eh_constante(instr.arg1)
+                    and definicoes[instr.dest] == 1 and instr.dest not in lidas):
+                constantes[instr.dest] = instr.arg1
+
+        n = 0
+        if constantes:
+            for instr in instrucoes:
+                n += self._substituir_usos(instr, constantes)
+        return n
+
+    # ------ PASSE 3: COALESCÊNCIA DE CÓPIAS ------
+
+    def passe_coalescencia(self, instrucoes):
+        # 'tX = a + b' seguido de 'v = tX', com tX sem outros usos, vira 'v = a + b'
+        usos = self._contar_usos(instrucoes)
+        resultado = []
+        n = 0
+        for instr in instrucoes:
+            anterior = resultado[-1] if resultado else None
+            if (instr.tipo == COPIA and anterior is not None
+                    and anterior.tipo in (COPIA, BINARIA)
+                    and anterior.dest == instr.arg1 and eh_temporario(anterior.dest)
+                    and usos.get(anterior.dest, 0) == 1):
+                anterior.dest = instr.dest
+                n += 1
+                continue
+            resultado.append(instr)
+        return resultado, n
+
+    # ------ PASSE 4: SUBEXPRESSÕES COMUNS (NUMERAÇÃO DE VALORES) ------
+
+    def passe_subexpressoes(self, instrucoes):
+        """
+        Numeração de valores local: dentro de cada bloco básico, cada nome
+        recebe o número do valor que guarda e cada cálculo 'op(v1, v2)' é
+        lembrado com o nome que ficou com o resultado. Um cálculo repetido
+        vira uma cópia desse nome ('t4 = a + b' -> 't4 = t1'), que a
+        propagação e a eliminação de mortos removem nas rodadas seguintes.
+        Atribuições e SCAN dão um número novo ao destino, invalidando os
+        cálculos que usavam o valor antigo. Os operandos de um operador
+        comutativo vão para uma ordem canônica ('b + a' reaproveita 'a + b'),
+        mas o '+' só quando os dois valores são inteiros: entre strings ele
+        concatena. Um valor é inteiro se vem de um literal inteiro, de uma
+        variável declarada 🔢 ou de uma conta inteira; o tipo de um temporário
+        sai da instrução que o definiu.
+        """
+        n = 0
+        contador = count()
+        numeros = {}            # Nome ou literal -> número do valor que guarda
+        calculos = {}           # (op, número, número) -> número do resultado
+        portadores = {}         # Número do valor -> nomes que já o guardaram
+        inteiros = set()        # Números de valores sabidamente inteiros
+
+        def numero(operando):
+            valor = numeros.get(operando)
+            if valor is None:
+                valor = numeros[operando] = next(contador)
+                portadores[valor] = [operando]
+                if self._inteiro(operando):
+                    inteiros.add(valor)
+            return valor
+
+        for instr in instrucoes:
+            if instr.tipo in (ROTULO, DESVIO, DESVIO_FALSO):
+                # Início/fim de bloco: o valor pode ter vindo de outro caminho
+                numeros, calculos, portadores, inteiros = {}, {}, {}, set()
+                continue
+            definida = instr.definicao()
+            if definida is None:
+                continue
+
+            if instr.tipo == COPIA:
+                valor = numero(instr.arg1)
+            elif instr.tipo == BINARIA:
+                a, b = numero(instr.arg1), numero(instr.arg2)
+                if instr.op in OPS_COMUTATIVOS and b < a and (instr.op != '+' or {a, b} <= inteiros):
+                    a, b = b, a
+                chave = (instr.op, a, b)
+                valor = calculos.get(chave)
+                # Só serve um nome que ainda guarde o valor (não foi reatribuído)
+                portador = None
+                if valor is not None:
+                    portador = next((nome for nome in portadores[valor] if numeros[nome] == valor), None)
+                if portador is None:
+                    valor = calculos[chave] = next(contador)
+                    if instr.op in OPS_INTEIROS or (instr.op == '+' and {a, b} <= inteiros):
+                        inteiros.add(valor)
+                elif portador != definida:
+                    instr.tipo, instr.arg1, instr.op, instr.arg2 = COPIA, portador, None, None
+                    n += 1
+            else:
+                valor = next(contador)      # SCAN: valor desconhecido
+                if self._inteiro(definida):
+                    inteiros.add(valor)
+
+            numeros[definida] = valor
+            portadores.setdefault(valor, []).append(definida)
+        return instrucoes, n
+
+    def _inteiro(self, operando):
+        """Literal inteiro ou variável declarada 🔢 (um temporário só é inteiro pela sua definição)."""
+        if eh_constante(operando):
+            return operando[0] != "'"
+        return self.tipos.get(operando) == 'INT'
+
+    # ------ PASSE 5: CÓDIGO INVARIANTE DE LAÇO ------
+
+    def passe_invariantes(self, instrucoes):
+        """
+        Cálculos de um laço (😑/😮) cujos operandos não mudam dentro dele são
+        movidos para um pré-cabeçalho, logo antes do rótulo do laço, e passam
+        a rodar uma vez só. Os laços vêm da análise do CFG (laços naturais);
+        num aninhamento, o interno é tratado primeiro e o externo nas rodadas
+        seguintes do ponto fixo. Como o laço pode dar zero voltas, só sobem
+        contas que não falham: entre inteiros e sem divisão por zero.
+        """
+        grafo = GrafoFluxo(instrucoes)
+        lacos = grafo.lacos_naturais()
+        if not lacos:
+            return instrucoes, 0
+        grafo.vivacidade_calculada = False     # A vivacidade só é calculada se houver candidatos
+
+        n = 0
+        alterados = set()
+        for laco in lacos:
+            if laco.blocos & alterados:
+                continue        # Contém um laço já alterado nesta rodada: CFG desatualizado
+            movidas = self._invariantes_do_laco(grafo, laco)
+            if not movidas:
+                continue
+            conjunto = set(movidas)
+            for bloco in laco.blocos:
+                bloco.instrucoes = [i for i in bloco.instrucoes if i not in conjunto]
+            # O pré-cabeçalho fica entre o bloco anterior e o rótulo do laço
+            laco.cabecalho.instrucoes[:0] = movidas
+            alterados |= laco.blocos
+            n += len(movidas)
+        return (grafo.instrucoes() if n else instrucoes), n
+
+    def _tem_pre_cabecalho(self, grafo, laco):
+        """
+        Instruções postas antes do rótulo do cabeçalho só rodam na entrada do
+        laço se a única entrada for o bloco anterior caindo no rótulo (e não
+        desviando para ele).
+        """
+        cabecalho = laco.cabecalho
+        if cabecalho.rotulo is None or cabecalho.indice == 0:
+            return False
+        anterior = grafo.blocos[cabecalho.indice - 1]
+        entradas = [p for p in cabecalho.predecessores if p not in laco.blocos]
+        ultima = anterior.instrucoes[-1] if anterior.instrucoes else None
+        return entradas == [anterior] and not (
+            ultima is not None and ultima.tipo in (DESVIO, DESVIO_FALSO) and ultima.dest == cabecalho.rotulo)
+
+    def _invariantes_do_laco(self, grafo, laco):
+        """Instruções do laço que podem ir para o pré-cabeçalho, na ordem em que devem rodar."""
+        cabecalho = laco.cabecalho
+        if not self._tem_pre_cabecalho(grafo, laco):
+            return []
+
+        blocos = sorted(laco.blocos, key=lambda b: b.indice)
+        definicoes = {}
+        for bloco in blocos:
+            for instr in bloco.instrucoes:
+                definida = instr.definicao()
+                if definida is not None:
+                    definicoes[definida] = definicoes.get(definida, 0) + 1
+        blocos_de_saida = [b for b in blocos if any(s not in laco.blocos for s in b.sucessores)]
+        vivas_apos_laco = None
+
+        movidas = []
+        ja_movidas = set()
+        invariantes = set()         # Variáveis definidas pelas instruções já movidas
+        inteiros = set()            # ... e, delas, as que sabidamente guardam um inteiro
+
+        def inteiro(operando):
+            return operando in inteiros or self._inteiro(operando)
+        mudou = True
+        while mudou:
+            mudou = False
+            for bloco in blocos:
+                for instr in bloco.instrucoes:
+                    if instr.tipo not in (COPIA, BINARIA) or instr in ja_movidas:
+                        continue
+                    destino = instr.dest
+                    if definicoes[destino] != 1 or not all(
+                            eh_constante(op) or op not in definicoes or op in invariantes
+                            for op in instr.usos()):
+                        continue
+                    # Executar a conta antes do laço não pode criar um erro que não
+                    # existia (um laço de zero voltas nunca a executaria): só entre
+                    # inteiros, e a divisão só por uma constante diferente de zero
+                    if instr.tipo == BINARIA and not (inteiro(instr.arg1) and inteiro(instr.arg2)):
+                        continue
+                    if instr.tipo == BINARIA and instr.op == '/' and not (
+                            eh_constante(instr.arg2) and valor_constante(instr.arg2) != 0):
+                        continue
+                    if vivas_apos_laco is None:
+                        if not grafo.vivacidade_calculada:
+                            grafo.analisar_vivacidade()
+                            grafo.vivacidade_calculada = True
+                        vivas_apos_laco = set()
+                        for saida in laco.saidas():
+                            vivas_apos_laco |= saida.vivas_entrada
+                    # Nenhum uso no laço pode ler o valor de antes dele ou de uma iteração anterior
+                    if destino in cabecalho.vivas_entrada:
+                        continue
+                    # Usada depois do laço: só se a instrução roda em toda
+                    # iteração que pode sair (laços de zero voltas não a executam)
+                    if destino in vivas_apos_laco and not all(grafo.domina(bloco, b) for b in blocos_de_saida):
+                        continue
+                    movidas.append(instr)
+                    ja_movidas.add(instr)
+                    invariantes.add(destino)
+                    # Uma conta movida tem operandos inteiros; só as comparações não dão inteiro
+                    if (inteiro(instr.arg1) if instr.tipo == COPIA else
+                            instr.op in OPS_INTEIROS or instr.op == '+'):
+                        inteiros.add(destino)
+                    mudou = True
+        return movidas
+
+    # ------ PASSE 6: VARIÁVEIS DE INDUÇÃO ------
+
+    def passe_inducao(self, instrucoes):
+        """
+        Redução de força nos laços. Uma variável de indução básica tem uma
+        única definição no laço, 'i = i + c' (ou '- c'), com c invariante; uma
+        derivada é 't = i * k' com k invariante. Para cada derivada, um novo
+        temporário s recebe i * k no pré-cabeçalho e soma c * k logo depois
+        do incremento de i, então 't = i * k' vira 't = s'. Se, depois disso,
+        i só é usado no teste de saída (comparado com um valor invariante)
+        e não é lido depois do laço, o teste passa a comparar s com o limite
+        multiplicado por k e o incremento de i some.
+        """
+        # Filtro barato antes do CFG: alguma multiplicação lê um 'x = x +/- c'?
+        incrementadas = {instr.dest for instr in instrucoes
+                         if instr.tipo == BINARIA and instr.op in ('+', '-') and instr.dest in (instr.arg1, instr.arg2)}
+        if not any(instr.tipo == BINARIA and instr.op == '*' and (instr.arg1 in incrementadas or instr.arg2 in incrementadas)
+                   for instr in instrucoes):
+            return instrucoes, 0
+
+        grafo = GrafoFluxo(instrucoes)
+        lacos = grafo.lacos_naturais()
+        if not lacos:
+            return instrucoes, 0
+        self._proximo_temporario = 1 + max((int(nome[1:]) for instr in instrucoes
+                                            for nome in (instr.dest, instr.arg1, instr.arg2)
+                                            if nome is not None and eh_temporario(nome)), default=-1)
+        grafo.vivacidade_calculada = False     # Só o teste de saída precisa da vivacidade
+        # Nomes lidos pelos pré-cabeçalhos criados nesta rodada e contadores
+        # eliminados: a vivacidade não os vê, então um não pode afetar o outro
+        self._lidas_novas, self._eliminadas = set(), set()
+
+        n = 0
+        alterados = set()
+        for laco in lacos:
+            if laco.blocos & alterados or not self._tem_pre_cabecalho(grafo, laco):
+                continue
+            alteracoes = self._reduzir_laco(grafo, laco)
+            if alteracoes:
+                alterados |= laco.blocos
+                n += alteracoes
+        return (grafo.instrucoes() if n else instrucoes), n
+
+    def _novo_temporario(self):
+        nome = f"t{self._proximo_temporario}"
+        self._proximo_temporario += 1
+        return nome
+
+    def _reduzir_laco(self, grafo, laco):
+        blocos = sorted(laco.blocos, key=lambda b: b.indice)
+        definicoes = {}
+        for bloco in blocos:
+            for instr in bloco.instrucoes:
+                definida = instr.definicao()
+                if definida is not None:
+                    definicoes.setdefault(definida, []).append(instr)
+
+        def invariante(operando):
+            return eh_constante(operando) or operando not in definicoes
+
+        # Básicas: nome -> instrução de incremento
+        basicas = {}
+        for nome, defs in definicoes.items():
+            instr = defs[0]
+            if len(defs) != 1 or instr.tipo != BINARIA or instr.op not in ('+', '-'):
+                continue
+            if instr.arg1 == nome and invariante(instr.arg2):
+                basicas[nome] = instr
+            elif instr.op == '+' and instr.arg2 == nome and invariante(instr.arg1):
+                basicas[nome] = instr
+
+        pre_cabecalho = []
+        lidas = set()           # Nomes lidos pelo pré-cabeçalho deste laço
+        atualizacoes = {}       # Incremento de i -> 's = s + c * k' que vêm logo depois
+        reduzidas = {}          # (i, k) -> s
+        n = 0
+        for bloco in blocos:
+            for instr in bloco.instrucoes:
+                if instr.tipo != BINARIA or instr.op != '*':
+                    continue
+                if instr.arg1 in basicas and invariante(instr.arg2):
+                    i, k = instr.arg1, instr.arg2
+                elif instr.arg2 in basicas and invariante(instr.arg1):
+                    i, k = instr.arg2, instr.arg1
+                else:
+                    continue
+                incremento = basicas[i]
+                passo = incremento.arg2 if incremento.arg1 == i else incremento.arg1
+                if {i, k, passo} & self._eliminadas:
+                    continue
+                s = reduzidas.get((i, k))
+                if s is None:
+                    s = reduzidas[(i, k)] = self._novo_temporario()
+                    pre_cabecalho.append(Instrucao(BINARIA, s, i, '*', k))
+                    if eh_constante(passo) and eh_constante(k):
+                        delta = formatar_constante(valor_constante(passo) * valor_constante(k))
+                    else:
+                        delta = self._novo_temporario()
+                        pre_cabecalho.append(Instrucao(BINARIA, delta, passo, '*', k))
+                    atualizacoes.setdefault(incremento, []).append(Instrucao(BINARIA, s, s, incremento.op, delta))
+                    lidas.update((i, k, passo))
+                instr.tipo, instr.arg1, instr.op, instr.arg2 = COPIA, s, None, None
+                n += 1
+        if not n:
+            return 0
+
+        # Substituição do teste de saída: 'i < lim' vira 's < lim * k'
+        removidas = set()
+        for (i, k), s in reduzidas.items():
+            incremento = basicas[i]
+            if (incremento in removidas or not eh_constante(k) or valor_constante(k) == 0
+                    or i in self._lidas_novas):
+                continue
+            teste = self._teste_de_saida(grafo, laco, blocos, i, incremento, invariante)
+            if teste is None:
+                continue
+            fator = valor_constante(k)
+            limite = teste.arg2 if teste.arg1 == i else teste.arg1
+            if eh_constante(limite):
+                novo_limite = formatar_constante(valor_constante(limite) * fator)
+            else:
+                novo_limite = self._novo_temporario()
+                pre_cabecalho.append(Instrucao(BINARIA, novo_limite, limite, '*', k))
+                lidas.add(limite)
+            if teste.arg1 == i:
+                teste.arg1, teste.arg2 = s, novo_limite
+            else:
+                teste.arg1, teste.arg2 = novo_limite, s
+            if fator < 0:
+                teste.op = COMPARACOES_ESPELHADAS[teste.op]
+            removidas.add(incremento)
+            self._eliminadas.add(i)
+            n += 1
+        self._lidas_novas |= lidas
+
+        for bloco in blocos:
+            nova = []
+            for instr in bloco.instrucoes:
+                if instr not in removidas:
+                    nova.append(instr)
+                nova.extend(atualizacoes.get(instr, ()))
+            bloco.instrucoes = nova
+        laco.cabecalho.instrucoes[:0] = pre_cabecalho
+        return n
+
+    def _teste_de_saida(self, grafo, laco, blocos, i, incremento, invariante):
+        """
+        A comparação de i com um valor invariante, se ela e o próprio
+        incremento forem os únicos usos de i no laço e i não for lido depois.
+        """
+        usos = [instr for bloco in blocos for instr in bloco.instrucoes
+                if instr is not incremento and i in instr.usos()]
+        if len(usos) != 1:
+            return None
+        teste = usos[0]
+        if teste.tipo != BINARIA or teste.op not in COMPARACOES_ESPELHADAS or teste.arg1 == teste.arg2:
+            return None
+        if not invariante(teste.arg2 if teste.arg1 == i else teste.arg1):
+            return None
+        if not grafo.vivacidade_calculada:
+            grafo.analisar_vivacidade()
+            grafo.vivacidade_calculada = True
+        if any(i in saida.vivas_entrada for saida in laco.saidas()):
+            return None
+        return teste
+
+    # ------ PASSE 7: ELIMINAÇÃO DE TEMPORÁRIOS MORTOS ------
+
+    def passe_codigo_morto(self, instrucoes):
+        n = 0
+        while True:
+            usos = self._contar_usos(instrucoes)
+            vivas = [i for i in instrucoes if not self._eh_morta(i, usos)]
+            removidas = len(instrucoes) - len(vivas)
+            instrucoes = vivas
+            n += removidas
+            if removidas == 0:
+                return instrucoes, n
+
+    def _eh_morta(self, instr, usos):
+        if instr.tipo == COPIA and instr.dest == instr.arg1:
+            return True     # 'x = x' não faz nada
+        if instr.tipo not in (COPIA, BINARIA) or not eh_temporario(instr.dest):
+            return False
+        if usos.get(instr.dest, 0) > 0:
+            return False
+        # A divisão pode falhar em tempo de execução; só some se o divisor for seguro
+        if instr.tipo == BINARIA and instr.op == '/':
+            return eh_constante(instr.arg2) and valor_constante(instr.arg2) != 0
+        return True
+
+    def _contar_usos(self, instrucoes):
+        usos = {}
+        for instr in instrucoes:
+            for operando in instr.usos():
+                usos[operando] = usos.get(operando, 0) + 1
+        return usos
+
+    # ------ PASSE 8: CONDIÇÕES CONSTANTES E CÓDIGO INALCANÇÁVEL ------
+
+    def passe_ramos(self, instrucoes):
+        """
+        'if_false 1 goto L' some e 'if_false 0 goto L' vira 'goto L' (o ramo
+        morto fica sem entrada); desvios para outro desvio passam a ir direto
+        ao destino final; e, se algum desvio mudou, os blocos que deixaram de
+        ser alcançáveis a partir da entrada (inclusive laços inteiros) são
+        removidos pelo CFG.
+        """
+        n = 0
+        resultado = []
+        for instr in instrucoes:
+            if instr.tipo == DESVIO_FALSO and eh_constante(instr.arg1):
+                n += 1
+                if valor_constante(instr.arg1):
+                    continue
+                instr.tipo, instr.arg1 = DESVIO, None
+            resultado.append(instr)
+        instrucoes = resultado
+        n += self._encadear_desvios(instrucoes)
+        if not n:
+            return instrucoes, 0
+
+        grafo = GrafoFluxo(instrucoes)
+        alcancaveis = grafo.alcancaveis()
+        if len(alcancaveis) < len(grafo.blocos):
+            resultado = [instr for bloco in grafo.blocos if bloco in alcancaveis for instr in bloco.instrucoes]
+            n += len(instrucoes) - len(resultado)
+            instrucoes = resultado
+        return instrucoes, n
+
+    def _encadear_desvios(self, instrucoes):
+        # Primeira instrução executada a partir de cada rótulo (rótulos seguidos contam juntos)
+        alvo = {}
+        pendentes = []
+        for instr in instrucoes:
+            if instr.tipo == ROTULO:
+                pendentes.append(instr.dest)
+                continue
+            for rotulo in pendentes:
+                alvo[rotulo] = instr
+            pendentes = []
+
+        n = 0
+        for instr in instrucoes:
+            if instr.tipo not in (DESVIO, DESVIO_FALSO):
+                continue
+            destino, vistos = instr.dest, {instr.dest}
+            while True:
+                seguinte = alvo.get(destino)
+                # 'goto L' leva sempre a L; 'if_false c goto L' num desvio com
+                # a mesma condição c (ainda falsa) também segue para L
+                if seguinte is None or not (seguinte.tipo == DESVIO or (
+                        seguinte.tipo == DESVIO_FALSO and instr.tipo == DESVIO_FALSO
+                        and seguinte.arg1 == instr.arg1)):
+                    break
+                if seguinte.dest in vistos:
+                    break           # Ciclo de desvios (laço vazio infinito): mantém
+                destino = seguinte.dest
+                vistos.add(destino)
+            if destino != instr.dest:
+                instr.dest = destino
+                n += 1
+        return n
+
+    # ------ PASSE 9: RÓTULOS E DESVIOS REDUNDANTES ------
+
+    def passe_desvios(self, instrucoes):
+        n = 0
+
+        # 1. Rótulos consecutivos ('L4:' 'L5:') viram um só
+        apelidos = {}
+        resultado = []
+        for instr in instrucoes:
+            if instr.tipo == ROTULO and resultado and resultado[-1].tipo == ROTULO:
+                apelidos[instr.dest] = resultado[-1].dest
+                n += 1
+                continue
+            resultado.append(instr)
+        for instr in resultado:
+            if instr.tipo in (DESVIO, DESVIO_FALSO) and instr.dest in apelidos:
+                instr.dest = apelidos[instr.dest]
+        instrucoes = resultado
+
+        # 2. Código após um 'goto' até o próximo rótulo nunca executa
+        resultado = []
+        inalcancavel = False
+        for instr in instrucoes:
+            if instr.tipo == ROTULO:
+                inalcancavel = False
+            if inalcancavel:
+                n += 1
+                continue
+            resultado.append(instr)
+            if instr.tipo == DESVIO:
+                inalcancavel = True
+        instrucoes = resultado
+
+        # 3. Desvio para o rótulo logo em seguida ('goto L1' 'L1:') é removido
+        resultado = []
+        for i, instr in enumerate(instrucoes):
+            if (instr.tipo in (DESVIO, DESVIO_FALSO) and i + 1 < len(instrucoes)
+                    and instrucoes[i + 1].tipo == ROTULO and instrucoes[i + 1].dest == instr.dest):
+                n += 1
+                continue
+            resultado.append(instr)
+        instrucoes = resultado
+
+        # 4. Rótulos que nenhum desvio referencia são removidos
+        alvos = {i.dest for i in instrucoes if i.tipo in (DESVIO, DESVIO_FALSO)}
+        resultado = [i for i in instrucoes if i.tipo != ROTULO or i.dest in alvos]
+        n += len(instrucoes) - len(resultado)
+
+        return resultado, n
@@ -0,0 +1,158 @@
+import os
+import sys
+
+from maquina_virtual import MaquinaVirtual
+
+"""
+Perfil de execução por linha do fonte (--perfil-execucao). A máquina virtual
+conta as execuções e o tempo de cada instrução (executar_com_perfil) e o
+mapa de fonte do GeradorTAC (tac.MapaFonte) leva cada instrução de volta à
+linha do comando E-moji que a gerou e aos laços (😑/😮) que a contêm.
+
+    resultado = compilar_programa(texto, OpcoesCompilacao(mapa_fonte=True))   # Sem -O
+    perfil = perfilar(resultado, fonte=texto)
+    print(perfil.relatorio())
+    with open("programa.folded", "w", encoding="utf-8") as f:
+        f.write(perfil.pilhas_colapsadas())
+
+Cada linha do fonte tem dois contadores: as execuções da linha (quantas
+vezes ela rodou: as execuções da sua instrução mais executada, então o
+cabeçalho de um 😮 conta os testes da condição) e as instruções de TAC que
+ela executou no total, que é o que o tempo acompanha.
+
+As pilhas colapsadas (uma por linha: "programa;😮 linha 3:1;linha 5 1200")
+são a entrada do flamegraph.pl e de visualizadores como o speedscope: cada
+laço vira um quadro da pilha, a linha do fonte é o quadro do topo e o valor
+é o tempo em ns (ou a quantidade de instruções executadas).
+"""
+
+LINHAS_RELATORIO = 15       # Linhas do fonte mostradas no relatório (as mais demoradas)
+
+
+def _acumular(tabela, chave, instrucoes, tempo):
+    total = tabela.get(chave)
+    if total is None:
+        tabela[chave] = [instrucoes, tempo]
+    else:
+        total[0] += instrucoes
+        total[1] += tempo
+
+
+class PerfilExecucao:
+    def __init__(self, maquina, mapa, contagens, tempos, fonte=None):
+        """
+        maquina: MaquinaVirtual já executada por executar_com_perfil, que devolveu
+                 'contagens' e 'tempos' (por instrução carregada).
+        mapa: tac.MapaFonte das instruções que a máquina carregou.
+        fonte: texto do programa (opcional, só para mostrar as linhas no relatório).
+        """
+        self.mapa = mapa
+        self.fonte = fonte.splitlines() if fonte else []
+        self.instrucoes = sum(contagens)            # Instruções de TAC executadas
+        self.tempo = sum(tempos)                    # ns
+        self.execucoes_linha = {}                   # Linha -> vezes que a linha rodou
+        self.por_linha = {}                         # Linha -> [instruções, ns]
+        self.por_laco = {}                          # Laço -> [instruções, ns], incluindo os laços internos
+        self.testes_laco = {}                       # Laço -> execuções da primeira instrução (o teste)
+        self.pilhas = {}                            # (laço mais interno, linha) -> [instruções, ns]
+
+        for pc, indice in enumerate(maquina.indices):
+            laco = mapa.lacos[indice]
+            if laco != -1 and laco not in self.testes_laco:
+                self.testes_laco[laco] = contagens[pc]
+            execucoes = contagens[pc]
+            if not execucoes:
+                continue
+            tempo = tempos[pc]
+            linha = mapa.linhas[indice]
+            if execucoes > self.execucoes_linha.get(linha, 0):
+                self.execucoes_linha[linha] = execucoes
+            _acumular(self.por_linha, linha, execucoes, tempo)
+            _acumular(self.pilhas, (laco, linha), execucoes, tempo)
+            for externo in mapa.cadeia_lacos(laco):
+                _acumular(self.por_laco, externo, execucoes, tempo)
+
+    def nome_laco(self, laco):
+        emoji, linha, coluna, _ = self.mapa.tabela_lacos[laco]
+        return f"{emoji} linha {linha}:{coluna}"
+
+    def _porcentagem(self, tempo):
+        return 100.0 * tempo / self.tempo if self.tempo else 0.0
+
+    def relatorio(self, limite=LINHAS_RELATORIO):
+        """Texto com as linhas do fonte mais demoradas e o custo de cada laço."""
+        linhas = [f"Perfil de execução: {self.instrucoes} instruções em {self.tempo / 1e6:.2f} ms",
+                  f"   {'Linha':>6}{'Execuções':>12}{'Instruções':>12}{'Tempo (ms)':>12}{'%':>8}   Fonte"]
+        quentes = sorted(self.por_linha.items(), key=lambda item: (-item[1][1], item[0]))
+        for linha, (instrucoes, tempo) in quentes[:limite]:
+            texto = self.fonte[linha - 1].strip() if 0 < linha <= len(self.fonte) else ""
+            linhas.append(f"   {linha:>6}{self.execucoes_linha[linha]:>12}{instrucoes:>12}{tempo / 1e6:>12.3f}"
+                          f"{self._porcentagem(tempo):>7.1f}%   {texto}")
+        if len(quentes) > limite:
+            linhas.append(f"   ... (+{len(quentes) - limite} linhas)")
+
+        if self.mapa.tabela_lacos:
+            linhas.append("   Laços (tempo inclusivo, com os laços internos):")
+            for laco in range(len(self.mapa.tabela_lacos)):
+                instrucoes, tempo = self.por_laco.get(laco, (0, 0))
+                recuo = "  " * (len(self.mapa.cadeia_lacos(laco)) - 1)
+                linhas.append(f"   {recuo}{self.nome_laco(laco)}: {instrucoes} instruções, {tempo / 1e6:.3f} ms "
+                              f"({self._porcentagem(tempo):.1f}%), condição testada "
+                              f"{self.testes_laco.get(laco, 0)} vezes")
+        return "\n".join(linhas)
+
+    def pilhas_colapsadas(self, medida="tempo"):
+        """Formato 'collapsed stacks' do flamegraph; medida 'tempo' (ns) ou 'instrucoes' (executadas)."""
+        coluna = 1 if medida == "tempo" else 0
+        linhas = []
+        for (laco, linha), totais in sorted(self.pilhas.items()):
+            if not totais[coluna]:
+                continue
+            quadros = ["programa"] + [self.nome_laco(l) for l in self.mapa.cadeia_lacos(laco)]
+            quadros.append(f"linha {linha}")
+            linhas.append(f"{';'.join(quadros)} {totais[coluna]}")
+        return "".join(linha + "\n" for linha in linhas)
+
+
+def perfilar(resultado, entrada=None, saida=None, fonte=None):
+    """
+    Executa na máquina virtual o TAC de um ResultadoCompilacao bem-sucedido,
+    medindo cada instrução. Retorna um PerfilExecucao.
+    """
+    if resultado.mapa is None:
+        raise ValueError("O perfil de execução precisa do mapa de fonte "
+                         "(OpcoesCompilacao(mapa_fonte=True), sem -O e sem streaming).")
+    maquina = MaquinaVirtual(resultado.instrucoes, entrada, saida, resultado.tipos, resultado.constantes)
+    contagens, tempos = maquina.executar_com_perfil()
+    return PerfilExecucao(maquina, resultado.mapa, contagens, tempos, fonte)
+
+
+# --- Execução direta ---
+if __name__ == "__main__":
+    from compilacao import compilar_programa, OpcoesCompilacao
+    from maquina_virtual import ErroExecucao
+
+    if len(sys.argv) != 2:
+        print("Uso correto: python perfil_execucao.py <arquivo_fonte.emoji>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        texto = f.read()
+    resultado = compilar_programa(texto, OpcoesCompilacao(mapa_fonte=True))
+    if not resultado.sucesso:
+        for erro in resultado.erros:
+            print(erro, file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        perfil = perfilar(resultado, fonte=texto)
+    except ErroExecucao as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # A saída do programa fica no stdout; o relatório vai para o stderr
+    nome_pilhas = os.path.splitext(sys.argv[1])[0] + ".folded"
+    with open(nome_pilhas, 'w', encoding='utf-8') as f:
+        f.write(perfil.pilhas_colapsadas())
+    print("\n" + perfil.relatorio(), file=sys.stderr)
+    print(f"Pilhas para flamegraph: {nome_pilhas}", file=sys.stderr)
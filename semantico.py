@@ -1,11 +1,19 @@
 import sys
+from types import MappingProxyType
+
+from tac import formatar_constante, TabelaConstantes, MapaFonte
 
 # ------ TABELA DE SÍMBOLOS ------
 class TabelaSimbolos:
-    def __init__(self):
+    def __init__(self, importadas=None):
         # A pilha de escopos permite o aninhamento (ex: variáveis dentro de um IF não vazam para fora)
         # O índice [-1] sempre representa o escopo atual/topo da pilha
         self.pilha_escopos = [{}]
+        # Compilação separada: declarações de outras unidades ({nome: tipo}), consultadas
+        # depois de todos os escopos. Cada nome procurado nelas fica registrado em 'usadas'
+        # (com None se não existe), para saber quando a unidade precisa ser recompilada
+        self.importadas = importadas
+        self.usadas = {}
 
     def entrar_bloco(self):
         # Cria um novo dicionário vazio para o novo bloco e empilha
@@ -29,14 +37,58 @@ class TabelaSimbolos:
         for escopo in reversed(self.pilha_escopos):
             if nome in escopo:
                 return escopo[nome]
+        if self.importadas is not None:
+            tipo = self.usadas[nome] = self.importadas.get(nome)
+            if tipo is not None:
+                return {"tipo": tipo}
         return None
 
 # ------ GERADOR DE CÓDIGO INTERMEDIÁRIO (TAC) ------
+MOLDURA = "="*40
+CABECALHO = f"{MOLDURA}\n Código Intermediário (TAC)\n{MOLDURA}\n"
+SECAO_CONSTANTES = f"{MOLDURA}\n Constantes\n{MOLDURA}\n"
+
+def formatar_linha(linha):
+    # Labels ficam colados na margem, instruções ganham indentação visual
+    if linha.endswith(":") and " " not in linha:
+        return linha
+    return f"    {linha}"
+
+def formatar_constantes(constantes):
+    # Seção de dados do .tac: cada literal do pool uma vez, na ordem dos índices
+    if not constantes:
+        return ""
+    return SECAO_CONSTANTES + "".join(f"    #{i} = {literal}\n" for i, literal in enumerate(constantes))
+
+def formatar_codigo(instrucoes, constantes=()):
+    # Formata a lista de instruções para uma string legível (conteúdo do .tac)
+    corpo = "\n".join(map(formatar_linha, instrucoes))
+    if corpo:
+        corpo += "\n"
+    return f"{CABECALHO}{corpo}{formatar_constantes(constantes)}{MOLDURA}"
+
 class GeradorTAC:
-    def __init__(self):
+    def __init__(self, saida=None, mapear=False):
         self.temp_count = 0             # Contador para variáveis temporárias (t0, t1...)
         self.label_count = 0            # Contador para rótulos de desvio (L0, L1...)
         self.instrucoes = []
+        self.tipos = {}                 # Tipo declarado de cada variável (usado por quem executa o TAC)
+        self.total_instrucoes = 0
+        # Pool dos literais de string: as instruções usam referências (#0, #1...)
+        # e cada literal distinto aparece uma vez, na seção de constantes
+        self.constantes = TabelaConstantes()
+        # Mapa de fonte (opcional, só com o TAC em memória): o analisador atualiza a
+        # posição do comando atual e abre/fecha os laços; cada instrução herda os dois
+        self.mapa = MapaFonte() if mapear and saida is None else None
+        self.linha = self.coluna = 0
+        self.laco = -1
+        # Modo streaming: com um arquivo de saída, cada instrução é escrita assim
+        # que é gerada e a lista 'instrucoes' fica vazia (memória constante).
+        # Os rótulos são nomes simbólicos reservados antes dos desvios que os
+        # usam, então nenhum trecho já escrito precisa ser corrigido depois
+        self.saida = saida
+        if saida is not None:
+            saida.write(CABECALHO)
 
     def novo_temp(self):
         t = f"t{self.temp_count}"
@@ -48,33 +100,73 @@ class GeradorTAC:
         self.label_count += 1
         return l
 
+    def posicionar(self, linha, coluna):
+        self.linha = linha
+        self.coluna = coluna
+
+    def posicao(self):
+        return (self.linha, self.coluna)
+
+    def entrar_laco(self, emoji):
+        """Abre um laço (😑/😮) na posição atual: as próximas instruções pertencem a ele."""
+        if self.mapa is not None:
+            self.laco = self.mapa.abrir_laco(emoji, self.linha, self.coluna, self.laco)
+
+    def sair_laco(self):
+        if self.mapa is not None:
+            self.laco = self.mapa.tabela_lacos[self.laco][3]
+
+    def constante(self, literal):
+        """Referência ao literal de string ('texto') no pool."""
+        return self.constantes.referencia(literal)
+
     def add(self, instr):
-        self.instrucoes.append(instr)
+        self.total_instrucoes += 1
+        if self.saida is not None:
+            self.saida.write(formatar_linha(instr) + "\n")
+        else:
+            self.instrucoes.append(instr)
+            if self.mapa is not None:
+                self.mapa.registrar(self.linha, self.coluna, self.laco)
+
+    def finalizar(self):
+        # Fecha o arquivo no modo streaming (mesmo texto de obter_codigo): o pool
+        # só fica completo no fim, então a seção de constantes vem depois do código
+        if self.saida is not None:
+            self.saida.write(formatar_constantes(self.constantes.literais) + MOLDURA)
 
     def obter_codigo(self):
-        # Formata a lista de instruções para uma string legível
-        buffer = []
-        buffer.append("="*40)
-        buffer.append(" Código Intermediário (TAC)")
-        buffer.append("="*40)
-        for linha in self.instrucoes:
-            # Labels ficam colados na margem, instruções ganham indentação visual
-            if ":" in linha and "goto" not in linha:
-                buffer.append(linha)
-            else:
-                buffer.append(f"    {linha}")
-        buffer.append("="*40)
-        return "\n".join(buffer)
+        return formatar_codigo(self.instrucoes, self.constantes.literais)
 
 # ------ ANALISADOR SEMÂNTICO ------
+# Operadores do E-moji e seus equivalentes no TAC (tabela constante, montada uma vez)
+OPERADORES_TAC = MappingProxyType({
+    # Relacionais
+    '🐣': '<', '🐓': '>', '🥚': '==',
+    '🤝': '==', 'OP_IGUAL_COMP': '==',
+    # Lógicos
+    '🤏': '&&', '✌️': '||', '✌': '||',
+    'OP_AND': '&&', 'OP_OR': '||',
+    # Matemáticos
+    '➕': '+', '➖': '-', '✖️': '*', '✖': '*', '➗': '/'
+})
+
+# Operadores cujo resultado é BOOL (os demais resultam em INT)
+OPS_BOOLEANOS = frozenset(['<', '>', '==', '!=', '<=', '>=', '&&', '||'])
+
+# Não-terminais de listas (recursivas à direita) percorridas iterativamente
+LISTAS = ("BLOCO_COMANDOS", "BLOCO_COMANDOS_", "LISTA_DECLARACOES")
+
 class AnalisadorSemantico:
-    def __init__(self):
-        self.tabela = TabelaSimbolos()
-        self.gerador = GeradorTAC()
+    def __init__(self, gerador=None, silencioso=False, importadas=None):
+        self.tabela = TabelaSimbolos(importadas)
+        self.gerador = gerador if gerador is not None else GeradorTAC()
         self.erros = []
+        self.silencioso = silencioso        # Só acumula os erros, sem imprimir
 
     def erro(self, msg):
-        print(f"❌ ERRO SEMÂNTICO: {msg}")
+        if not self.silencioso:
+            print(f"❌ ERRO SEMÂNTICO: {msg}")
         self.erros.append(msg)
 
     def pegar_valor_folha(self, no):
@@ -102,6 +194,13 @@ class AnalisadorSemantico:
                 return res
         return None
 
+    def _sem_aspas(self, valor):
+        # Remove apenas o par de aspas externo colocado pelo analisador sintático
+        valor = str(valor)
+        if len(valor) >= 2 and valor[0] == "'" and valor[-1] == "'":
+            return valor[1:-1]
+        return valor
+
     def normalizar_tipo(self, texto_ou_token):
         """
         Converte as diversas representações (Emoji, Token Name, String)
@@ -124,17 +223,7 @@ class AnalisadorSemantico:
         Traduz emojis para operadores padrão (C-like) para que o TAC 
         fique legível e universal (ex: ➕ vira +).
         """
-        mapa = {
-            # Relacionais
-            '🐣': '<', '🐓': '>', '🥚': '==',
-            '🤏': '<=', '✌️': '>=', '👎': '!=',
-            '🤝': '==', 'OP_IGUAL_COMP': '==',
-            # Lógicos
-            'OP_AND': '&&', 'OP_OR': '||',
-            # Matemáticos
-            '➕': '+', '➖': '-', '✖️': '*', '➗': '/'
-        }
-        return mapa.get(op_emoji, op_emoji)
+        return OPERADORES_TAC.get(op_emoji, op_emoji)
 
     # ------ ROTEAMENTO (DISPATCHER) ------
     def visitar(self, no):
@@ -150,16 +239,15 @@ class AnalisadorSemantico:
             self.visitar_filhos(no)
             return len(self.erros) == 0     # Retorna sucesso apenas se sem erros
 
-        elif rotulo in ["BLOCO_COMANDOS", "BLOCO_COMANDOS_", "LISTA_DECLARACOES"]:
-            self.visitar_filhos(no)
+        elif rotulo in LISTAS:
+            self.visitar_lista(no)
 
         elif rotulo == "DECLARACAO_VAR": self.visitar_declaracao(no)
         elif rotulo == "ATRIBUICAO": self.visitar_atribuicao(no)
         elif rotulo == "ESTRUTURA_IF": self.visitar_if(no)
         elif rotulo == "ESTRUTURA_WHILE": self.visitar_while(no)
         elif rotulo == "ESTRUTURA_FOR": self.visitar_for(no)
-        elif rotulo == "COMANDO_SAIDA": self.visitar_io(no, "PRINT")
-        elif rotulo == "COMANDO_ENTRADA": self.visitar_io(no, "SCAN")
+        elif rotulo == "COMANDO": self.visitar_comando(no)
         elif rotulo == "EXPRESSAO": return self.visitar_expressao_completa(no)
         else: self.visitar_filhos(no)
 
@@ -167,6 +255,38 @@ class AnalisadorSemantico:
         for filho in no.children:
             self.visitar(filho)
 
+    def visitar_lista(self, no):
+        # As listas da gramática são recursivas à direita (COMANDO BLOCO_COMANDOS_),
+        # então a cauda é percorrida com um laço: visitar recursivamente estouraria
+        # o limite de recursão do Python em programas com milhares de comandos
+        while no is not None:
+            cauda = None
+            filhos = no.children
+            if filhos and str(filhos[-1].value) in LISTAS:
+                cauda = filhos[-1]
+                filhos = filhos[:-1]
+            for filho in filhos:
+                self.visitar(filho)
+            no = cauda
+
+    def posicionar(self, no):
+        # Posição do primeiro token do nó, usada pelo mapa de fonte do gerador
+        if self.gerador.mapa is None:
+            return
+        while no.children:
+            no = no.children[0]
+        if getattr(no, 'linha', None) is not None:
+            self.gerador.posicionar(no.linha, no.coluna)
+
+    def visitar_comando(self, no):
+        self.posicionar(no)
+        # Os comandos de I/O não têm não-terminal próprio: o nó COMANDO tem como
+        # filhos o terminal (👄/👂), os parênteses e a expressão/ID
+        primeiro = str(no.children[0].value) if no.children else None
+        if primeiro == "COMANDO_SAIDA": self.visitar_io(no, "PRINT")
+        elif primeiro == "COMANDO_ENTRADA": self.visitar_io(no, "SCAN")
+        else: self.visitar_filhos(no)
+
     # ------ REGRAS SEMÂNTICAS E GERAÇÃO DE CÓDIGO ------
 
     def visitar_declaracao(self, no):
@@ -181,6 +301,8 @@ class AnalisadorSemantico:
         # Regra Semântica: Unicidade de nome no escopo
         if not self.tabela.declarar(nome_id, tipo):
             self.erro(f"Variável '{nome_id}' já declarada neste escopo.")
+        else:
+            self.gerador.tipos[nome_id] = tipo
 
     def visitar_atribuicao(self, no):
         nome = self.pegar_valor_folha(no.children[0])
@@ -220,6 +342,7 @@ class AnalisadorSemantico:
             self.erro(f"Condição do IF deve ser BOOL. Encontrado: {res_cond['tipo']}")
 
         # 2. Prepara os Labels para controle de fluxo
+        posicao = self.gerador.posicao()
         l_else = self.gerador.novo_label()
         l_fim = self.gerador.novo_label()
 
@@ -232,6 +355,7 @@ class AnalisadorSemantico:
         self.tabela.sair_bloco()
 
         # 5. Pula o bloco Else ao terminar o True
+        self.gerador.posicionar(*posicao)
         self.gerador.add(f"goto {l_fim}")
         
         # 6. Processa bloco ELSE (se existir)
@@ -249,6 +373,8 @@ class AnalisadorSemantico:
     def visitar_while(self, no):
         l_ini = self.gerador.novo_label()       # Label para voltar ao início (loop)
         l_fim = self.gerador.novo_label()       # Label para sair do loop
+        posicao = self.gerador.posicao()
+        self.gerador.entrar_laco('😑')
         
         self.gerador.add(f"{l_ini}:")
         
@@ -264,7 +390,9 @@ class AnalisadorSemantico:
         self.tabela.sair_bloco()
         
         # Loop: volta para testar a condição
+        self.gerador.posicionar(*posicao)
         self.gerador.add(f"goto {l_ini}")
+        self.gerador.sair_laco()
         self.gerador.add(f"{l_fim}:")
 
     def visitar_for(self, no):
@@ -276,6 +404,8 @@ class AnalisadorSemantico:
         
         l_ini = self.gerador.novo_label()
         l_fim = self.gerador.novo_label()
+        posicao = self.gerador.posicao()
+        self.gerador.entrar_laco('😮')
         
         self.gerador.add(f"{l_ini}:")
         
@@ -290,10 +420,13 @@ class AnalisadorSemantico:
         
         # 4. Executa incremento (segunda atribuição)
         if len(atribs) > 1: 
+            self.posicionar(atribs[1])
             self.visitar_atribuicao_for(atribs[1])
         
         # 5. Volta pro teste
+        self.gerador.posicionar(*posicao)
         self.gerador.add(f"goto {l_ini}")
+        self.gerador.sair_laco()
         self.gerador.add(f"{l_fim}:")
 
     def visitar_atribuicao_for(self, no):
@@ -309,11 +442,13 @@ class AnalisadorSemantico:
             val = str(filho.value)
             if val == "EXPRESSAO": 
                 res = self.visitar(filho)
-            elif val == "STRING_LITERAL":
-                res = {'end': self.pegar_valor_folha(filho), 'tipo': 'STRING'}
-            elif val == "ID": 
+            elif val == "ID":
                 nome = self.pegar_valor_folha(filho)
                 nome = str(nome).replace("'", "").replace('"', "")
+                # Regra Semântica: a variável lida precisa existir
+                if not self.tabela.buscar(nome):
+                    self.erro(f"Variável '{nome}' não declarada.")
+                    return
                 res = {'end': nome, 'tipo': 'VAR'}
         if res: self.gerador.add(f"{cmd} {res['end']}")
 
@@ -343,36 +478,36 @@ class AnalisadorSemantico:
         return val_esq
 
     def visitar_expressao_linha(self, no, val_esq):
-        # Caso base da recursão à direita (epsilon)
-        if not no.children or str(no.children[0].value) == 'epsilon': 
-            return val_esq
-
-        # Pega e traduz o operador (ex: 🐓 -> >)
-        op_node = no.children[0]
-        op_emoji = self.pegar_valor_folha(op_node)
-        op_emoji = str(op_emoji).strip().replace("'", "").replace('"', "")
-        op_tac = self.traduzir_operador(op_emoji)
-
-        val_dir = self.visitar_termo(no.children[1])
-        
-        # Define se o resultado é Booleano ou Inteiro com base no operador
-        # Isso é crucial para validar condições de IF/WHILE
-        ops_booleanos = ['<', '>', '==', '!=', '<=', '>=', '&&', '||']
-        
-        tipo_res = 'INT'
-        if op_tac in ops_booleanos:
-            tipo_res = 'BOOL'
-        
-        # Gera o código TAC: tX = op1 OPERADOR op2
-        novo = self.gerador.novo_temp()
-        self.gerador.add(f"{novo} = {val_esq['end']} {op_tac} {val_dir['end']}")
-        
-        res = {'end': novo, 'tipo': tipo_res}
-        
-        # Continua a recursão se houver mais operações encadeadas
-        if len(no.children) > 2: 
-            return self.visitar_expressao_linha(no.children[2], res)
-        return res
+        # A cauda recursiva à direita (E' -> op T E') é percorrida com um laço,
+        # para expressões longas não estourarem o limite de recursão
+        while no is not None:
+            # Caso base da recursão à direita (epsilon)
+            if not no.children or str(no.children[0].value) == 'epsilon': 
+                return val_esq
+
+            # Pega e traduz o operador (ex: 🐓 -> >)
+            op_node = no.children[0]
+            op_emoji = self.pegar_valor_folha(op_node)
+            op_emoji = str(op_emoji).strip().replace("'", "").replace('"', "")
+            op_tac = self.traduzir_operador(op_emoji)
+
+            val_dir = self.visitar_termo(no.children[1])
+            
+            # Define se o resultado é Booleano ou Inteiro com base no operador
+            # Isso é crucial para validar condições de IF/WHILE
+            tipo_res = 'INT'
+            if op_tac in OPS_BOOLEANOS:
+                tipo_res = 'BOOL'
+            
+            # Gera o código TAC: tX = op1 OPERADOR op2
+            novo = self.gerador.novo_temp()
+            self.gerador.add(f"{novo} = {val_esq['end']} {op_tac} {val_dir['end']}")
+            
+            val_esq = {'end': novo, 'tipo': tipo_res}
+            
+            # Continua se houver mais operações encadeadas
+            no = no.children[2] if len(no.children) > 2 else None
+        return val_esq
 
     def visitar_termo(self, no):
         val_esq = self.visitar_fator(no.children[0])
@@ -382,22 +517,22 @@ class AnalisadorSemantico:
 
     def visitar_termo_linha(self, no, val_esq):
         # Similar a expressao_linha, mas para operadores de Termo (*, /)
-        if not no.children or str(no.children[0].value) == 'epsilon': 
-            return val_esq
-        
-        op_emoji = self.pegar_valor_folha(no.children[0])
-        op_emoji = str(op_emoji).strip().replace("'", "").replace('"', "")
-        op_tac = self.traduzir_operador(op_emoji)
-        
-        val_dir = self.visitar_fator(no.children[1])
-        
-        novo = self.gerador.novo_temp()
-        self.gerador.add(f"{novo} = {val_esq['end']} {op_tac} {val_dir['end']}")
-        res = {'end': novo, 'tipo': 'INT'}
-        
-        if len(no.children) > 2: 
-            return self.visitar_termo_linha(no.children[2], res)
-        return res
+        while no is not None:
+            if not no.children or str(no.children[0].value) == 'epsilon': 
+                return val_esq
+            
+            op_emoji = self.pegar_valor_folha(no.children[0])
+            op_emoji = str(op_emoji).strip().replace("'", "").replace('"', "")
+            op_tac = self.traduzir_operador(op_emoji)
+            
+            val_dir = self.visitar_fator(no.children[1])
+            
+            novo = self.gerador.novo_temp()
+            self.gerador.add(f"{novo} = {val_esq['end']} {op_tac} {val_dir['end']}")
+            val_esq = {'end': novo, 'tipo': 'INT'}
+            
+            no = no.children[2] if len(no.children) > 2 else None
+        return val_esq
 
     def visitar_fator(self, no):
         primeiro = no.children[0]
@@ -410,13 +545,16 @@ class AnalisadorSemantico:
         val_bruto = self.pegar_valor_folha(primeiro)
         
         # Identificação de Tipos Literais
+        # As folhas da árvore guardam o lexema entre aspas ("'10'"), então
+        # o literal é normalizado: inteiros sem aspas e strings escapadas
         if rotulo in ['NUMERO_INT', 'INT']: 
-            return {'end': val_bruto, 'tipo': 'INT'}
+            return {'end': self._sem_aspas(val_bruto), 'tipo': 'INT'}
         if rotulo in ['STRING_LITERAL', 'STRING_TYPE']: 
-            return {'end': val_bruto, 'tipo': 'STRING'}
+            literal = formatar_constante(self._sem_aspas(val_bruto))
+            return {'end': self.gerador.constante(literal), 'tipo': 'STRING'}
         if rotulo == 'VALOR_BOOL': 
             # TAC usa 0 e 1, mas a linguagem usa emojis
-            return {'end': ('1' if val_bruto == '👍' else '0'), 'tipo': 'BOOL'}
+            return {'end': ('1' if self._sem_aspas(val_bruto) == '👍' else '0'), 'tipo': 'BOOL'}
         
         # Identificação de Variáveis
         if rotulo == 'ID':
@@ -0,0 +1,175 @@
+import os
+import sys
+import asyncio
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from compilador import compilar_texto
+
+"""
+Serviço de compilação assíncrono (asyncio), para front-ends que recebem
+rajadas de pedidos (ex.: uma IDE web). As etapas do compilador, que usam
+CPU, rodam em um pool de processos; o laço de eventos só coordena:
+
+    - Concorrência limitada: no máximo 'processos' compilações ao mesmo tempo.
+    - Backpressure: com 'profundidade_maxima' pedidos já na fila (esperando
+      ou compilando), os novos são recusados com ServicoSobrecarregado, para
+      o cliente tentar de novo depois (ex.: HTTP 429) em vez de a fila crescer.
+    - Tempo limite e cancelamento por pedido. Um processo do pool não pode
+      ser interrompido: a compilação que já começou continua ocupando a
+      vaga e contando na profundidade até terminar, mesmo sem ninguém
+      esperando o resultado.
+    - Coalescência: pedidos idênticos (mesmo fonte e opções) em andamento
+      compartilham uma única compilação.
+
+As etapas são chamadas no modo silencioso (compilador.compilar_texto): não
+escrevem na saída padrão nem encerram o processo em caso de erro.
+"""
+
+
+class ServicoSobrecarregado(Exception):
+    """A fila atingiu a profundidade máxima; o pedido não foi aceito."""
+
+
+class TempoEsgotado(Exception):
+    """A compilação não terminou dentro do tempo limite do pedido."""
+
+
+class ServicoCompilacao:
+    def __init__(self, processos=None, profundidade_maxima=64, tempo_limite=30.0):
+        self.processos = processos or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.processos)
+        self.profundidade_maxima = profundidade_maxima
+        self.tempo_limite = tempo_limite
+        self._vagas = None              # Semáforo criado no laço de eventos em uso
+        self._em_andamento = {}         # chave -> tarefa da compilação compartilhada
+        self._interessados = {}         # chave -> quantos pedidos aguardam a tarefa
+        self._no_pool = {}              # tarefa -> trabalho que ela submeteu ao pool
+        self._orfaos = set()            # Trabalhos ainda rodando no pool cuja tarefa já acabou
+        self.estatisticas = {'recebidos': 0, 'compilados': 0, 'coalescidos': 0,
+                             'recusados': 0, 'expirados': 0, 'cancelados': 0}
+
+    @property
+    def profundidade(self):
+        """
+        Compilações distintas na fila (esperando vaga ou rodando), incluindo
+        as que seguem no pool depois de o pedido expirar ou ser cancelado.
+        """
+        return len(self._em_andamento) + len(self._orfaos)
+
+    async def compilar(self, fonte, otimizar=False, tempo_limite=None):
+        """
+        Compila o texto e devolve o dicionário de compilador.compilar_texto.
+        Lança ServicoSobrecarregado, TempoEsgotado ou asyncio.CancelledError.
+        """
+        self.estatisticas['recebidos'] += 1
+        chave = hashlib.sha256(f"{int(otimizar)}\0{fonte}".encode('utf-8')).hexdigest()
+
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is not None:
+            self.estatisticas['coalescidos'] += 1
+        else:
+            if self.profundidade >= self.profundidade_maxima:
+                self.estatisticas['recusados'] += 1
+                raise ServicoSobrecarregado(
+                    f"Fila cheia ({self.profundidade_maxima} compilações pendentes).")
+            tarefa = asyncio.ensure_future(self._executar(fonte, otimizar))
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda t: self._terminou(chave, t))
+
+        self._interessados[chave] = self._interessados.get(chave, 0) + 1
+        try:
+            # shield: o tempo limite ou o cancelamento de um pedido não derruba
+            # a compilação que outros pedidos idênticos ainda aguardam
+            return await asyncio.wait_for(asyncio.shield(tarefa),
+                                          tempo_limite if tempo_limite is not None else self.tempo_limite)
+        except asyncio.TimeoutError:
+            self.estatisticas['expirados'] += 1
+            raise TempoEsgotado("Compilação excedeu o tempo limite.") from None
+        except asyncio.CancelledError:
+            self.estatisticas['cancelados'] += 1
+            raise
+        finally:
+            self._interessados[chave] -= 1
+            if self._interessados[chave] == 0:
+                del self._interessados[chave]
+                # Ninguém mais espera: desiste da compilação (se ainda não começou
+                # no pool ela nem roda; se já começou, o resultado é descartado)
+                if not tarefa.done():
+                    tarefa.cancel()
+
+    def _terminou(self, chave, tarefa):
+        if self._em_andamento.get(chave) is tarefa:
+            del self._em_andamento[chave]
+        trabalho = self._no_pool.pop(tarefa, None)
+        if trabalho is not None and not trabalho.done():
+            self._orfaos.add(trabalho)
+
+    async def _executar(self, fonte, otimizar):
+        if self._vagas is None:
+            self._vagas = asyncio.Semaphore(self.processos)
+        await self._vagas.acquire()
+        laco = asyncio.get_running_loop()
+        try:
+            trabalho = self.executor.submit(compilar_texto, fonte, otimizar)
+        except BaseException:
+            self._vagas.release()
+            raise
+        # A vaga é devolvida quando o trabalho termina no pool, não quando a
+        # tarefa acaba: cancelar a tarefa só desiste de um trabalho que ainda
+        # não começou (concurrent.futures não interrompe um que já roda)
+        self._no_pool[asyncio.current_task()] = trabalho
+        trabalho.add_done_callback(lambda t: self._avisar_fim(laco, t))
+        resultado = await asyncio.wrap_future(trabalho)
+        self.estatisticas['compilados'] += 1
+        return resultado
+
+    def _avisar_fim(self, laco, trabalho):
+        """Chamado na thread do pool quando o trabalho termina (ou é cancelado antes de rodar)."""
+        try:
+            laco.call_soon_threadsafe(self._liberar, trabalho)
+        except RuntimeError:
+            pass        # Laço de eventos já encerrado: ninguém mais disputa as vagas
+
+    def _liberar(self, trabalho):
+        self._orfaos.discard(trabalho)
+        self._vagas.release()
+
+    def encerrar(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def relatorio(self):
+        e = self.estatisticas
+        return (f"Serviço: {e['recebidos']} pedidos, {e['compilados']} compilações, "
+                f"{e['coalescidos']} coalescidos, {e['recusados']} recusados (fila cheia), "
+                f"{e['expirados']} expirados, {e['cancelados']} cancelados")
+
+
+# --- Execução direta: envia todos os arquivos como uma rajada de pedidos ---
+async def _rajada(caminhos, otimizar):
+    servico = ServicoCompilacao()
+    fontes = []
+    for caminho in caminhos:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            fontes.append(f.read())
+    try:
+        respostas = await asyncio.gather(*(servico.compilar(fonte, otimizar) for fonte in fontes),
+                                         return_exceptions=True)
+    finally:
+        servico.encerrar()
+    for caminho, resposta in zip(caminhos, respostas):
+        if isinstance(resposta, Exception):
+            print(f"⚠️  {caminho}: {resposta}")
+        elif resposta['sucesso']:
+            print(f"✅ {caminho}: {len(resposta['instrucoes'])} instruções")
+        else:
+            print(f"❌ {caminho}: {'; '.join(resposta['erros'])}")
+    print("\n" + servico.relatorio())
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if a != "-O"]
+    if not argumentos:
+        print("Uso correto: python servico_assincrono.py [-O] <arquivo.emoji>...")
+        sys.exit(1)
+    asyncio.run(_rajada(argumentos, "-O" in sys.argv[1:]))
@@ -0,0 +1,89 @@
+import io
+import os
+import sys
+import signal
+import argparse
+import contextlib
+import socketserver
+
+import compilador
+from cliente_compilacao import caminho_socket_padrao, enviar_quadro, receber_quadro
+
+"""
+Servidor de compilação: um processo que mantém o compilador carregado e
+atende pedidos por um socket Unix (protocolo em cliente_compilacao.py).
+Cada pedido roda em um processo filho criado com fork a partir do servidor
+já aquecido, o que dá:
+    - clientes simultâneos, sem disputa pela saída padrão redirecionada;
+    - isolamento: o sys.exit das etapas e o estado dos analisadores morrem
+      com o filho, sem afetar o servidor nem os outros pedidos.
+
+Uso: python servidor_compilacao.py [--socket CAMINHO]
+"""
+
+
+def atender_pedido(pedido):
+    """Executa compilador.main com os argumentos do cliente e captura o que seria impresso."""
+    saida, erros = io.StringIO(), io.StringIO()
+    codigo = 0
+    os.chdir(pedido.get("cwd") or os.getcwd())
+    sys.argv = ["compilador.py"] + list(pedido.get("argv", []))
+    sys.stdin = io.StringIO(pedido.get("entrada", ""))
+    with contextlib.redirect_stdout(saida), contextlib.redirect_stderr(erros):
+        try:
+            compilador.main()
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                codigo = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                codigo = 1
+    return {"saida": saida.getvalue(), "erros": erros.getvalue(), "codigo": codigo}
+
+
+class TratadorPedido(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            pedido = receber_quadro(self.request)
+        except (ConnectionError, ValueError):
+            return      # Cliente desconectou ou mandou um quadro inválido
+        if pedido.get("acao") == "parar":
+            enviar_quadro(self.request, {"saida": "Servidor encerrado.\n", "erros": "", "codigo": 0})
+            os.kill(os.getppid(), signal.SIGTERM)
+            return
+        enviar_quadro(self.request, atender_pedido(pedido))
+
+
+class ServidorCompilacao(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    max_children = 64
+
+
+def _interromper(sinal, quadro):
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de compilação E-moji (socket Unix).")
+    parser.add_argument("--socket", default=caminho_socket_padrao(), help="caminho do socket")
+    args = parser.parse_args()
+
+    if os.path.exists(args.socket):
+        os.remove(args.socket)      # Socket órfão de uma execução anterior
+    # Carrega o compilador inteiro (as etapas, a tabela preditiva e a impressão
+    # digital usada pelo cache) uma única vez, antes dos fork dos pedidos
+    compilador.carregar_modulos()
+    os.umask(0o077)                 # Só o dono do servidor pode se conectar
+    # SIGTERM (inclusive o pedido 'parar') encerra pelo mesmo caminho do Ctrl+C
+    signal.signal(signal.SIGTERM, _interromper)
+    with ServidorCompilacao(args.socket, TratadorPedido) as servidor:
+        print(f"Servidor de compilação ouvindo em {args.socket} (Ctrl+C para encerrar)", flush=True)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
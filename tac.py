@@ -0,0 +1,373 @@
+import re
+from array import array
+
+"""
+Representação estruturada do Código Intermediário (TAC) gerado pelo GeradorTAC.
+O gerador trabalha com linhas de texto; este módulo converte essas linhas em
+objetos Instrucao (e de volta para texto), para que as etapas posteriores
+(otimizador, backends) não precisem reinterpretar strings.
+"""
+
+# ------ TIPOS DE INSTRUÇÃO ------
+ROTULO = 'ROTULO'               # L0:
+DESVIO = 'GOTO'                 # goto L0
+DESVIO_FALSO = 'IF_FALSE'       # if_false t0 goto L0
+COPIA = 'COPIA'                 # x = y
+BINARIA = 'BINARIA'             # t0 = a + b
+IMPRIME = 'PRINT'               # PRINT x
+LE = 'SCAN'                     # SCAN x
+
+# Operadores cujo resultado não depende da ordem dos operandos ('+' só entre
+# inteiros: entre strings é a concatenação)
+OPS_COMUTATIVOS = frozenset(['+', '*', '==', '!=', '&&', '||'])
+
+# Quebra a linha em operandos, preservando literais de string com espaços ('a b')
+_REGEX_PARTES = re.compile(r"'(?:[^'\\]|\\.)*'|\S+")
+_REGEX_INTEIRO = re.compile(r"-?\d+$")
+_REGEX_TEMPORARIO = re.compile(r"t\d+$")
+_REGEX_REFERENCIA = re.compile(r"#\d+$")
+# Nomes que renumerar troca num texto de TAC já com o pool: rótulo definido, destino de desvio,
+# temporário e referência (sempre operandos inteiros, separados por espaço)
+_REGEX_NUMERADOS = re.compile(r"^L(\d+):$|(?<=goto )L(\d+)$|(?<!\S)t(\d+)(?!\S)|(?<!\S)#(\d+)(?!\S)",
+                              re.MULTILINE)
+
+
+class Instrucao:
+    """
+    Uma instrução TAC. Os operandos são guardados no formato textual do TAC
+    (nomes de variáveis, temporários ou literais como 10 e 'texto').
+    """
+    __slots__ = ('tipo', 'dest', 'arg1', 'op', 'arg2')
+
+    def __init__(self, tipo, dest=None, arg1=None, op=None, arg2=None):
+        self.tipo = tipo
+        self.dest = dest        # Variável definida (ou rótulo alvo dos desvios)
+        self.arg1 = arg1
+        self.op = op
+        self.arg2 = arg2
+
+    def usos(self):
+        """Operandos lidos pela instrução."""
+        if self.tipo == BINARIA:
+            return [self.arg1, self.arg2]
+        if self.tipo in (COPIA, DESVIO_FALSO, IMPRIME):
+            return [self.arg1]
+        return []
+
+    def definicao(self):
+        """Variável escrita pela instrução (ou None)."""
+        if self.tipo in (COPIA, BINARIA, LE):
+            return self.dest
+        return None
+
+    def copia(self):
+        return Instrucao(self.tipo, self.dest, self.arg1, self.op, self.arg2)
+
+    def __repr__(self):
+        return f"Instrucao({formatar_instrucao(self)!r})"
+
+
+# ------ POOL DE CONSTANTES ------
+
+class TabelaConstantes:
+    """
+    Pool dos literais de string do programa: cada literal distinto é guardado
+    uma vez (seção de constantes do .tac) e as instruções o referenciam pelo
+    índice: 'x = #0', 'PRINT #1'. Ao ler as instruções com o pool, todas as
+    referências a #k passam a apontar para o mesmo objeto str.
+    """
+    def __init__(self):
+        self.literais = []          # Literais no formato do TAC ('texto'), na ordem de criação
+        self.indices = {}           # Literal -> índice
+
+    def referencia(self, literal):
+        indice = self.indices.get(literal)
+        if indice is None:
+            indice = self.indices[literal] = len(self.literais)
+            self.literais.append(literal)
+        return f"#{indice}"
+
+    def __len__(self):
+        return len(self.literais)
+
+
+def eh_referencia(operando):
+    """Referência ao pool de constantes (#0, #1...)."""
+    return _REGEX_REFERENCIA.match(operando) is not None
+
+
+def _resolver(operando, constantes):
+    if operando is None or operando[0] != '#':
+        return operando
+    try:
+        literal = constantes[int(operando[1:])]
+    except (ValueError, IndexError):
+        literal = None
+    if literal is None:
+        raise ValueError(f"Referência a constante inexistente: '{operando}'")
+    return literal
+
+
+def _referenciar(operando, tabela):
+    if operando is None or operando[0] != "'":
+        return operando
+    return tabela.referencia(operando)
+
+
+# ------ MAPA DE FONTE ------
+
+class MapaFonte:
+    """
+    Posição no fonte de cada instrução do TAC: linha e coluna do primeiro
+    token do comando que a gerou, em arrays paralelos à lista de instruções
+    (4 bytes por instrução em cada um, em vez de uma tupla por instrução).
+    Cada instrução também guarda o laço (😑/😮) mais interno que a contém.
+    """
+    def __init__(self):
+        self.linhas = array('i')
+        self.colunas = array('i')
+        self.lacos = array('i')         # Índice em tabela_lacos (-1: fora de laço)
+        self.tabela_lacos = []          # (emoji, linha, coluna, laço pai ou -1)
+
+    def registrar(self, linha, coluna, laco):
+        self.linhas.append(linha)
+        self.colunas.append(coluna)
+        self.lacos.append(laco)
+
+    def abrir_laco(self, emoji, linha, coluna, pai):
+        self.tabela_lacos.append((emoji, linha, coluna, pai))
+        return len(self.tabela_lacos) - 1
+
+    def cadeia_lacos(self, laco):
+        """Laços que contêm o laço dado, do mais externo até ele."""
+        cadeia = []
+        while laco != -1:
+            cadeia.append(laco)
+            laco = self.tabela_lacos[laco][3]
+        cadeia.reverse()
+        return cadeia
+
+    def estender(self, outro):
+        """Acrescenta o mapa de um trecho de TAC gerado à parte (ex.: um fragmento do programa)."""
+        deslocamento = len(self.tabela_lacos)
+        self.linhas.extend(outro.linhas)
+        self.colunas.extend(outro.colunas)
+        self.lacos.extend(array('i', (l + deslocamento if l != -1 else -1 for l in outro.lacos)))
+        self.tabela_lacos.extend((emoji, linha, coluna, pai + deslocamento if pai != -1 else -1)
+                                 for emoji, linha, coluna, pai in outro.tabela_lacos)
+
+    def __len__(self):
+        return len(self.linhas)
+
+
+# ------ LEITURA E ESCRITA ------
+
+def ler_instrucao(linha, constantes=None):
+    """
+    Converte uma linha de TAC (sem indentação) em uma Instrucao. Com o pool
+    ('constantes', a lista de literais), as referências #k viram os literais.
+    """
+    instr = _ler_instrucao(linha)
+    if constantes is not None:
+        instr.arg1 = _resolver(instr.arg1, constantes)
+        instr.arg2 = _resolver(instr.arg2, constantes)
+    return instr
+
+
+def _ler_instrucao(linha):
+    partes = _REGEX_PARTES.findall(linha.strip())
+    if not partes:
+        raise ValueError("Linha de TAC vazia.")
+
+    if len(partes) == 1 and partes[0].endswith(':'):
+        return Instrucao(ROTULO, dest=partes[0][:-1])
+    if partes[0] == 'goto' and len(partes) == 2:
+        return Instrucao(DESVIO, dest=partes[1])
+    if partes[0] == 'if_false' and len(partes) == 4 and partes[2] == 'goto':
+        return Instrucao(DESVIO_FALSO, dest=partes[3], arg1=partes[1])
+    if partes[0] == 'PRINT' and len(partes) == 2:
+        return Instrucao(IMPRIME, arg1=partes[1])
+    if partes[0] == 'SCAN' and len(partes) == 2:
+        return Instrucao(LE, dest=partes[1])
+    if len(partes) == 3 and partes[1] == '=':
+        return Instrucao(COPIA, dest=partes[0], arg1=partes[2])
+    if len(partes) == 5 and partes[1] == '=':
+        return Instrucao(BINARIA, dest=partes[0], arg1=partes[2], op=partes[3], arg2=partes[4])
+
+    raise ValueError(f"Instrução TAC não reconhecida: '{linha.strip()}'")
+
+
+def formatar_instrucao(instr):
+    """Converte uma Instrucao de volta para o formato textual do GeradorTAC."""
+    tipo = instr.tipo
+    if tipo == ROTULO: return f"{instr.dest}:"
+    if tipo == DESVIO: return f"goto {instr.dest}"
+    if tipo == DESVIO_FALSO: return f"if_false {instr.arg1} goto {instr.dest}"
+    if tipo == IMPRIME: return f"PRINT {instr.arg1}"
+    if tipo == LE: return f"SCAN {instr.dest}"
+    if tipo == COPIA: return f"{instr.dest} = {instr.arg1}"
+    return f"{instr.dest} = {instr.arg1} {instr.op} {instr.arg2}"
+
+
+def ler_instrucoes(linhas, constantes=None):
+    return [ler_instrucao(linha, constantes) for linha in linhas]
+
+
+def formatar_instrucoes(instrucoes, tabela=None):
+    """Com uma TabelaConstantes, os literais de string são escritos como referências ao pool."""
+    if tabela is None:
+        return [formatar_instrucao(instr) for instr in instrucoes]
+    linhas = []
+    for instr in instrucoes:
+        arg1, arg2 = _referenciar(instr.arg1, tabela), _referenciar(instr.arg2, tabela)
+        if arg1 is not instr.arg1 or arg2 is not instr.arg2:
+            instr = Instrucao(instr.tipo, instr.dest, arg1, instr.op, arg2)
+        linhas.append(formatar_instrucao(instr))
+    return linhas
+
+
+def ler_codigo(texto):
+    """
+    Lê o conteúdo de um arquivo .tac (como o gerado por obter_codigo),
+    ignorando o cabeçalho e as linhas de moldura. As definições da seção de
+    constantes (#k = 'texto') formam o pool usado para resolver as referências.
+    """
+    linhas = []
+    constantes = {}
+    for linha in texto.splitlines():
+        limpa = linha.strip()
+        if not limpa or set(limpa) == {'='}:
+            continue
+        if limpa.upper() in ('CÓDIGO INTERMEDIÁRIO (TAC)', 'CONSTANTES'):
+            continue
+        if limpa[0] == '#':
+            instr = _ler_instrucao(limpa)
+            if instr.tipo != COPIA or not eh_referencia(instr.dest) or instr.arg1[0] != "'":
+                raise ValueError(f"Definição de constante inválida: '{limpa}'")
+            constantes[int(instr.dest[1:])] = instr.arg1
+        else:
+            linhas.append(limpa)
+    pool = [constantes.get(i) for i in range(max(constantes, default=-1) + 1)]
+    return ler_instrucoes(linhas, pool)
+
+
+def renumerar(linhas, temporarios, rotulos, variaveis=(), constantes=None, tabela=None):
+    """
+    Soma os deslocamentos aos números dos temporários (tN) e dos rótulos (LN)
+    de linhas de TAC geradas separadamente, para juntá-las sem conflito de
+    nomes. As 'variaveis' declaradas nunca são renomeadas, mesmo que tenham a
+    forma de um temporário (ex.: uma variável do usuário chamada t1). As
+    referências ao pool das linhas ('constantes') passam a apontar para o
+    pool compartilhado 'tabela' (uma TabelaConstantes).
+    """
+    mesmo_pool = True
+    if tabela is not None and constantes:
+        # Na ordem do pool das linhas: juntar trechos consecutivos dá os mesmos #k de uma compilação só
+        for literal in constantes:
+            tabela.referencia(literal)
+        mesmo_pool = all(tabela.indices[literal] == k for k, literal in enumerate(constantes))
+    if not temporarios and not rotulos and mesmo_pool:
+        return list(linhas)
+    if tabela is not None and constantes is not None:
+        return _renumerar_texto(linhas, temporarios, rotulos, variaveis, constantes, tabela)
+
+    def operando(nome):
+        if nome is not None and eh_temporario(nome) and nome not in variaveis:
+            return f"t{int(nome[1:]) + temporarios}"
+        return nome
+
+    renumeradas = []
+    for linha in linhas:
+        instr = ler_instrucao(linha, constantes)
+        if instr.tipo in (ROTULO, DESVIO, DESVIO_FALSO):
+            instr.dest = f"L{int(instr.dest[1:]) + rotulos}"
+        else:
+            instr.dest = operando(instr.dest)
+        instr.arg1 = operando(instr.arg1)
+        instr.arg2 = operando(instr.arg2)
+        renumeradas.append(instr)
+    return formatar_instrucoes(renumeradas, tabela)
+
+
+def _renumerar_texto(linhas, temporarios, rotulos, variaveis, constantes, tabela):
+    """
+    renumerar sem ler e reescrever cada instrução: com todos os literais de
+    string no pool não sobra texto entre aspas, então basta trocar os números
+    dos nomes no texto das linhas.
+    """
+    referencias = [tabela.indices[literal] for literal in constantes]
+
+    def trocar(m):
+        definido, destino, temporario, referencia = m.groups()
+        if definido is not None:
+            return f"L{int(definido) + rotulos}:"
+        if destino is not None:
+            return f"L{int(destino) + rotulos}"
+        if temporario is not None:
+            return m.group() if m.group() in variaveis else f"t{int(temporario) + temporarios}"
+        return f"#{referencias[int(referencia)]}"
+
+    texto = _REGEX_NUMERADOS.sub(trocar, "\n".join(linhas))
+    return texto.split("\n") if texto else []
+
+
+# ------ OPERANDOS ------
+
+def eh_constante(operando):
+    """Literais: inteiros (10, -3) e strings ('texto'). Booleanos são 0 e 1."""
+    return operando[0] == "'" or _REGEX_INTEIRO.match(operando) is not None
+
+
+def eh_temporario(operando):
+    return _REGEX_TEMPORARIO.match(operando) is not None
+
+
+def valor_constante(operando):
+    """Converte um literal do TAC para o valor Python correspondente."""
+    if operando[0] == "'":
+        return operando[1:-1].replace("\\'", "'").replace("\\\\", "\\")
+    return int(operando)
+
+
+def formatar_constante(valor):
+    """Inverso de valor_constante: gera o literal TAC para um int ou str."""
+    if isinstance(valor, str):
+        return "'" + valor.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return str(int(valor))
+
+
+# ------ SEMÂNTICA DOS OPERADORES ------
+
+def dividir(a, b):
+    # Divisão inteira truncando em direção ao zero (como em C)
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+OPERACOES = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': dividir,
+    '<': lambda a, b: 1 if a < b else 0,
+    '>': lambda a, b: 1 if a > b else 0,
+    '<=': lambda a, b: 1 if a <= b else 0,
+    '>=': lambda a, b: 1 if a >= b else 0,
+    '==': lambda a, b: 1 if a == b else 0,
+    '!=': lambda a, b: 1 if a != b else 0,
+    '&&': lambda a, b: 1 if a and b else 0,
+    '||': lambda a, b: 1 if a or b else 0,
+}
+
+
+def avaliar_operacao(op, a, b):
+    """
+    Avalia 'a op b' com a semântica da linguagem. Lança TypeError para
+    combinações inválidas de tipos e ZeroDivisionError na divisão por zero.
+    """
+    if op not in OPERACOES:
+        raise TypeError(f"Operador desconhecido '{op}'")
+    if op in ('+', '-', '*', '/') and type(a) is not type(b):
+        raise TypeError(f"Operandos incompatíveis para '{op}'")
+    if op in ('-', '*', '/') and not isinstance(a, int):
+        raise TypeError(f"Operador '{op}' exige inteiros")
+    return OPERACOES[op](a, b)
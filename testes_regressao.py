@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import difflib
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from compilacao import compilar_programa, OpcoesCompilacao, LEXICO
+from instrumentacao import Perfil
+from maquina_virtual import MaquinaVirtual, ErroExecucao
+
+"""
+Testes de regressão por saída de referência ("golden"). Cada <caso>.emoji
+em Testes/ é compilado pela API de biblioteca (compilacao.compilar_programa,
+sem subprocessos do compilador.py) e o resultado é comparado com os arquivos
+ao lado do fonte:
+
+    <caso>.emojilex   tokens esperados (ausente: o léxico deve falhar)
+    <caso>.tac        TAC esperado (ausente: a compilação deve falhar)
+    <caso>.saida      saída esperada do programa na máquina virtual (opcional);
+                      o TAC é executado sem e com -O, e as duas saídas têm de
+                      coincidir com a referência (o programa não pode ler entrada)
+
+Os casos rodam em paralelo (um processo por núcleo) e o tempo de cada etapa
+é registrado por caso, então um único comando confere correção e velocidade
+depois de mudanças no léxico, no parser ou no gerador:
+
+    python testes_regressao.py                  # confere Testes/
+    python testes_regressao.py --salvar t.json  # grava os tempos por caso
+    python testes_regressao.py --atualizar      # regrava as referências
+    python testes_regressao.py --uma-passada    # confere a tradução sem árvore
+"""
+
+PASTA_TESTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Testes")
+LINHAS_DIFF = 20        # Linhas de diff mostradas por saída divergente
+
+
+def listar_casos(caminhos):
+    """Arquivos .emoji dos caminhos (diretórios são expandidos em ordem alfabética)."""
+    casos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            casos.extend(os.path.join(caminho, nome) for nome in sorted(os.listdir(caminho))
+                         if nome.endswith(".emoji"))
+        else:
+            casos.append(caminho)
+    return casos
+
+
+def ler_referencia(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def comparar(obtido, esperado, nome):
+    """Lista de linhas descrevendo a divergência (vazia se as saídas batem)."""
+    if obtido == esperado:
+        return []
+    if esperado is None:
+        return [f"{nome}: gerado, mas não há referência"]
+    if obtido is None:
+        return [f"{nome}: referência existe, mas nada foi gerado"]
+    diff = list(difflib.unified_diff(esperado.splitlines(), obtido.splitlines(),
+                                     f"{nome} (esperado)", f"{nome} (obtido)", lineterm=""))
+    return diff[:LINHAS_DIFF] + ([f"... (+{len(diff) - LINHAS_DIFF} linhas)"] if len(diff) > LINHAS_DIFF else [])
+
+
+def _sem_entrada():
+    raise ErroExecucao("SCAN sem entrada nos testes de regressão.")
+
+
+def executar_tac(resultado):
+    """Saída do programa na máquina virtual (um erro de execução vira a última linha)."""
+    linhas = []
+    maquina = MaquinaVirtual(resultado.instrucoes, _sem_entrada, linhas.append, resultado.tipos,
+                             resultado.constantes)
+    try:
+        maquina.executar()
+    except ErroExecucao as e:
+        linhas.append(f"❌ {e}")
+    return "".join(linha + "\n" for linha in linhas)
+
+
+def executar_caso(caminho, uma_passada=False):
+    """Compila um caso e o compara com as referências. Roda em um processo do pool."""
+    base = os.path.splitext(caminho)[0]
+    with open(caminho, 'r', encoding='utf-8') as f:
+        codigo_fonte = f.read()
+
+    perfil = Perfil(memoria=False)
+    inicio = time.perf_counter()
+    opcoes = OpcoesCompilacao(guardar_arvore=False, perfil=perfil, uma_passada=uma_passada)
+    resultado = compilar_programa(codigo_fonte, opcoes)
+    tempo = time.perf_counter() - inicio
+
+    # Mesmas regras do compilador.py: .emojilex se o léxico passou, .tac se tudo passou
+    saidas = {".emojilex": resultado.texto_tokens() if resultado.etapa_falha != LEXICO else None,
+              ".tac": resultado.codigo_tac() if resultado.sucesso else None}
+    divergencias = []
+    for extensao, obtido in saidas.items():
+        divergencias.extend(comparar(obtido, ler_referencia(base + extensao), os.path.basename(base) + extensao))
+
+    # A execução só é conferida nos casos com .saida (o -O não pode mudar o que o programa imprime)
+    esperada = ler_referencia(base + ".saida")
+    if esperada is not None:
+        saidas[".saida"] = executar_tac(resultado) if resultado.sucesso else None
+        divergencias.extend(comparar(saidas[".saida"], esperada, os.path.basename(base) + ".saida"))
+        if resultado.sucesso:
+            otimizado = compilar_programa(codigo_fonte, OpcoesCompilacao(otimizar=True, guardar_arvore=False,
+                                                                         uma_passada=uma_passada))
+            divergencias.extend(comparar(executar_tac(otimizado), esperada,
+                                         os.path.basename(base) + ".saida (-O)"))
+
+    return {'caso': caminho, 'saidas': saidas, 'divergencias': divergencias,
+            'tokens': len(resultado.tokens), 'tempo': tempo,
+            'etapas': {m['etapa']: m['tempo'] for m in perfil.medicoes}}
+
+
+def atualizar_referencias(r):
+    """Regrava (ou remove) as referências do caso para coincidirem com a saída atual."""
+    base = os.path.splitext(r['caso'])[0]
+    for extensao, conteudo in r['saidas'].items():
+        caminho = base + extensao
+        if conteudo is not None:
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(conteudo)
+        elif os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def executar_testes(casos, processos=None, atualizar=False, uma_passada=False):
+    """Roda os casos e mostra um resumo. Retorna (resultados na ordem dos casos, falhas)."""
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        resultados = list(executor.map(partial(executar_caso, uma_passada=uma_passada), casos))
+    duracao = time.perf_counter() - inicio
+
+    falhas = 0
+    for r in resultados:
+        nome = os.path.basename(r['caso'])
+        etapas = " ".join(f"{etapa}={t * 1000:.1f}" for etapa, t in r['etapas'].items())
+        if not r['divergencias']:
+            print(f"✅ {nome} ({r['tempo'] * 1000:.1f} ms: {etapas})")
+        elif atualizar:
+            atualizar_referencias(r)
+            print(f"🔄 {nome}: referências atualizadas")
+        else:
+            falhas += 1
+            print(f"❌ {nome} ({r['tempo'] * 1000:.1f} ms)")
+            for linha in r['divergencias']:
+                print(f"   {linha}")
+
+    print(f"\n{len(resultados) - falhas} de {len(resultados)} caso(s) conferem "
+          f"({duracao:.2f} s no total, {sum(r['tempo'] for r in resultados) * 1000:.1f} ms compilando)")
+    return resultados, falhas
+
+
+# --- Execução direta ---
+def main():
+    parser = argparse.ArgumentParser(description="Compara a saída do compilador com as referências de Testes/.")
+    parser.add_argument("caminhos", nargs="*", default=[PASTA_TESTES],
+                        help="arquivos .emoji ou diretórios (padrão: Testes/)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="processos em paralelo (padrão: núcleos)")
+    parser.add_argument("--atualizar", action="store_true",
+                        help="regrava as referências divergentes com a saída atual")
+    parser.add_argument("--uma-passada", dest="uma_passada", action="store_true",
+                        help="compila em uma passada (traducao_direta), sem árvore sintática")
+    parser.add_argument("--salvar", metavar="ARQ", help="grava os tempos por caso e por etapa em JSON")
+    args = parser.parse_args()
+
+    casos = listar_casos(args.caminhos)
+    if not casos:
+        print("Nenhum caso .emoji encontrado.")
+        return 1
+
+    resultados, falhas = executar_testes(casos, args.jobs, args.atualizar, args.uma_passada)
+
+    if args.salvar:
+        tempos = [{'caso': r['caso'], 'ok': not r['divergencias'], 'tokens': r['tokens'],
+                   'tempo': r['tempo'], 'etapas': r['etapas']} for r in resultados]
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(tempos, f, indent=2, ensure_ascii=False)
+        print(f"Tempos salvos em {args.salvar}")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
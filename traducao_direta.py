@@ -0,0 +1,358 @@
+import sys
+
+from AnalisadorSintatico import tabela_preditiva, erro as erro_sintatico
+from semantico import AnalisadorSemantico, OPS_BOOLEANOS
+from tac import formatar_constante
+
+"""
+Tradução dirigida pela sintaxe em uma passada: o TAC é gerado durante a
+análise sintática, sem montar a árvore sintática e sem percorrê-la depois.
+As produções da tabela preditiva ganham ações semânticas ('@nome') entre os
+símbolos; o analisador LL(1) empilha as ações junto com os símbolos e as
+executa quando chegam ao topo da pilha. Os valores das expressões (endereço
+e tipo) ficam em uma pilha de valores própria.
+
+    tradutor = TradutorDireto(GeradorTAC(), silencioso=True)
+    sucesso = tradutor.traduzir(tokens)     # Tuplas (tipo, valor, linha, coluna)
+
+As regras são as do AnalisadorSemantico, na mesma ordem, então o TAC, os
+tipos e os erros são idênticos aos do caminho em duas passadas. Dois pontos
+precisam de cuidado para isso:
+    - o incremento do 😮 aparece antes do bloco no fonte, mas é gerado depois
+      dele: na primeira leitura ele só é validado, e a posição do seu primeiro
+      token é guardada para traduzi-lo de novo ao fim do bloco;
+    - trechos que a análise em árvore não visita (a expressão de uma
+      atribuição a variável não declarada e a atribuição aninhada que a
+      gramática aceita no lugar do 🎁) são analisados com as ações
+      "descartando": sem gerar código, temporários ou erros.
+"""
+
+# Produções com ações semânticas, indexadas por (não-terminal, primeiro símbolo).
+# Sem os '@nome', cada uma tem que ser igual à produção da tabela preditiva.
+OPERADORES_EXPRESSAO = ('OP_SOMA', 'OP_SUB', 'OP_MAIOR', 'OP_MENOR', 'OP_IGUAL_COMP', 'OP_AND', 'OP_OR',
+                        'OP_IGUAL_LOGICO')
+OPERADORES_TERMO = ('OP_MULT', 'OP_DIV')
+
+PRODUCOES_COM_ACOES = {
+    ('DECLARACAO_VAR', 'TIPO'): ['TIPO', 'ID', '@declarar', 'PONTO_VIRGULA'],
+    ('COMANDO', 'ATRIBUICAO'): ['@comando', 'ATRIBUICAO'],
+    ('COMANDO', 'ESTRUTURA_IF'): ['@comando', 'ESTRUTURA_IF'],
+    ('COMANDO', 'ESTRUTURA_WHILE'): ['@comando', 'ESTRUTURA_WHILE'],
+    ('COMANDO', 'ESTRUTURA_FOR'): ['@comando', 'ESTRUTURA_FOR'],
+    ('ATRIBUICAO', 'ID'): ['ID', '@alvo', '@suspender', 'ATRIBUICAO', '@retomar', 'EXPRESSAO',
+                           'PONTO_VIRGULA', '@atribuir'],
+    ('ATRIBUICAO_FOR', 'ID'): ['ID', '@alvo_for', '@suspender', 'ATRIBUICAO', '@retomar', 'EXPRESSAO',
+                               '@atribuir_for'],
+    ('COMANDO', 'COMANDO_SAIDA'): ['@comando', 'COMANDO_SAIDA', 'ABRIR_PARENTESES', 'EXPRESSAO',
+                                   'FECHAR_PARENTESES', 'PONTO_VIRGULA', '@imprimir'],
+    ('COMANDO', 'COMANDO_ENTRADA'): ['@comando', 'COMANDO_ENTRADA', 'ABRIR_PARENTESES', 'ID', '@ler',
+                                     'FECHAR_PARENTESES', 'PONTO_VIRGULA'],
+    ('ESTRUTURA_IF', 'IF'): ['IF', 'ABRIR_PARENTESES', 'EXPRESSAO', 'FECHAR_PARENTESES', '@se', 'ABRIR_BLOCO',
+                             'BLOCO_COMANDOS', 'FECHAR_BLOCO', '@senao', 'ELSE_PARTE', '@fim_se'],
+    ('ELSE_PARTE', 'ELSE'): ['ELSE', '@entrar', 'ABRIR_BLOCO', 'BLOCO_COMANDOS', 'FECHAR_BLOCO', '@sair'],
+    ('ESTRUTURA_WHILE', 'WHILE'): ['WHILE', '@enquanto', 'ABRIR_PARENTESES', 'EXPRESSAO', 'FECHAR_PARENTESES',
+                                   '@condicao_enquanto', 'ABRIR_BLOCO', 'BLOCO_COMANDOS', 'FECHAR_BLOCO',
+                                   '@fim_enquanto'],
+    ('ESTRUTURA_FOR', 'FOR'): ['FOR', 'ABRIR_PARENTESES', 'ATRIBUICAO_FOR', 'PONTO_VIRGULA', '@para',
+                               'EXPRESSAO', 'PONTO_VIRGULA', '@condicao_para', 'ATRIBUICAO_FOR',
+                               '@fim_incremento', 'FECHAR_PARENTESES', 'ABRIR_BLOCO', 'BLOCO_COMANDOS',
+                               'FECHAR_BLOCO', '@fim_para'],
+    ('FATOR', 'ID'): ['ID', '@variavel'],
+    ('FATOR', 'NUMERO_INT'): ['NUMERO_INT', '@inteiro'],
+    ('FATOR', 'STRING_LITERAL'): ['STRING_LITERAL', '@texto'],
+    ('FATOR', 'VALOR_BOOL'): ['VALOR_BOOL', '@booleano'],
+}
+PRODUCOES_COM_ACOES.update({('EXPRESSAO_', op): [op, '@operador', 'TERMO', '@binaria', 'EXPRESSAO_']
+                            for op in OPERADORES_EXPRESSAO})
+PRODUCOES_COM_ACOES.update({('TERMO_', op): [op, '@operador', 'FATOR', '@binaria_termo', 'TERMO_']
+                            for op in OPERADORES_TERMO})
+
+# Marcador de fim de fita (o mesmo que analisar_sintaticamente acrescenta)
+FIM = ('$', '$', -1, -1)
+
+
+def montar_tabela(resolver_acao):
+    """
+    Tabela preditiva com as ações já resolvidas e cada produção pronta para
+    ser empilhada (invertida; epsilon vira uma tupla vazia).
+    """
+    tabela = {}
+    for nao_terminal, linha in tabela_preditiva.items():
+        tabela[nao_terminal] = producoes = {}
+        for token, producao in linha.items():
+            if producao[0] == 'epsilon':
+                producoes[token] = ()
+                continue
+            com_acoes = PRODUCOES_COM_ACOES.get((nao_terminal, producao[0]), producao)
+            if [s for s in com_acoes if not s.startswith('@')] != producao:
+                raise ValueError(f"Produção com ações de {nao_terminal} difere da tabela preditiva: {producao}")
+            producoes[token] = tuple(resolver_acao(s[1:]) if s.startswith('@') else s
+                                     for s in reversed(com_acoes))
+    return tabela
+
+
+def token_para_dicionario(token):
+    """Token no formato do analisador sintático (usado nas mensagens de erro)."""
+    return {'tipo': token[0], 'valor': token[1], 'linha': token[2], 'coluna': token[3]}
+
+
+class TradutorDireto(AnalisadorSemantico):
+    def __init__(self, gerador=None, silencioso=False, importadas=None):
+        super().__init__(gerador, silencioso, importadas)
+        self.tabela_acoes = montar_tabela(lambda nome: getattr(self, "acao_" + nome))
+        self.fita = None
+        self.valores = []           # Pilha de valores semânticos
+        self.descartando = 0        # > 0: as ações não geram código nem erros
+
+    def erro(self, msg):
+        if not self.descartando:
+            super().erro(msg)
+
+    def traduzir(self, tokens):
+        """
+        Analisa a lista de tokens gerando o TAC no gerador. Retorna True se não
+        houve erros semânticos. Os erros sintáticos seguem analisar_sintaticamente
+        (ErroSintatico no modo silencioso; senão, mensagem e sys.exit).
+        """
+        self.fita = list(tokens)
+        self.fita.append(FIM)
+        self._analisar(['$', 'PROGRAMA'], 0)
+        if not self.silencioso:
+            print("Análise sintática concluída com sucesso!")
+        return len(self.erros) == 0
+
+    def _analisar(self, pilha, ponteiro):
+        """Analisador LL(1) com ações: consome a fita até esvaziar a pilha e devolve a posição final."""
+        fita = self.fita
+        tabela = self.tabela_acoes
+        while pilha:
+            simbolo = pilha.pop()
+            if simbolo.__class__ is not str:      # Ação semântica
+                simbolo(ponteiro)
+                continue
+            tipo = fita[ponteiro][0]
+            if simbolo == tipo:
+                ponteiro += 1
+                continue
+            producoes = tabela.get(simbolo)
+            if producoes is None:
+                erro_sintatico(simbolo, token_para_dicionario(fita[ponteiro]), self.silencioso)
+            producao = producoes.get(tipo)
+            if producao is None:
+                erro_sintatico(list(tabela_preditiva[simbolo].keys()), token_para_dicionario(fita[ponteiro]),
+                               self.silencioso)
+            pilha.extend(producao)
+        return ponteiro
+
+    # ------ AÇÕES: DECLARAÇÕES E COMANDOS ------
+    # Cada ação recebe a posição do próximo token da fita (o token recém-casado é fita[p - 1])
+
+    def acao_comando(self, p):
+        # Posição do primeiro token do comando, para o mapa de fonte do gerador
+        if self.gerador.mapa is not None:
+            token = self.fita[p]
+            self.gerador.posicionar(token[2], token[3])
+
+    def acao_declarar(self, p):
+        tipo = self.normalizar_tipo(self.fita[p - 2][1])
+        nome = self.fita[p - 1][1]
+        if not self.tabela.declarar(nome, tipo):
+            self.erro(f"Variável '{nome}' já declarada neste escopo.")
+        else:
+            self.gerador.tipos[nome] = tipo
+
+    def acao_alvo(self, p):
+        nome = self.fita[p - 1][1]
+        info = self.tabela.buscar(nome)
+        if not info:
+            # A árvore não visita a expressão de uma atribuição a variável não declarada
+            self.erro(f"Variável '{nome}' não declarada.")
+            self.descartando += 1
+        self.valores.append((nome, info))
+
+    def acao_atribuir(self, p):
+        end, tipo = self.valores.pop()
+        nome, info = self.valores.pop()
+        if not info:
+            self.descartando -= 1
+        elif not self.descartando:
+            if info['tipo'] != tipo:
+                self.erro(f"Atribuição inválida em '{nome}'. Esperado {info['tipo']}, recebeu {tipo}.")
+            else:
+                self.gerador.add(f"{nome} = {end}")
+
+    def acao_alvo_for(self, p):
+        self.valores.append(self.fita[p - 1][1])
+
+    def acao_atribuir_for(self, p):
+        end, _ = self.valores.pop()
+        nome = self.valores.pop()
+        if not self.descartando:
+            self.gerador.add(f"{nome} = {end}")
+
+    def acao_suspender(self, p):
+        self.descartando += 1
+
+    def acao_retomar(self, p):
+        self.descartando -= 1
+
+    def acao_imprimir(self, p):
+        end, _ = self.valores.pop()
+        self.gerador.add(f"PRINT {end}")
+
+    def acao_ler(self, p):
+        nome = self.fita[p - 1][1]
+        if not self.tabela.buscar(nome):
+            self.erro(f"Variável '{nome}' não declarada.")
+            return
+        self.gerador.add(f"SCAN {nome}")
+
+    def acao_entrar(self, p):
+        self.tabela.entrar_bloco()
+
+    def acao_sair(self, p):
+        self.tabela.sair_bloco()
+
+    def acao_se(self, p):
+        end, tipo = self.valores.pop()
+        if tipo != 'BOOL':
+            self.erro(f"Condição do IF deve ser BOOL. Encontrado: {tipo}")
+        l_else = self.gerador.novo_label()
+        l_fim = self.gerador.novo_label()
+        self.gerador.add(f"if_false {end} goto {l_else}")
+        self.tabela.entrar_bloco()
+        self.valores.append((l_else, l_fim, self.gerador.posicao()))
+
+    def acao_senao(self, p):
+        self.tabela.sair_bloco()
+        l_else, l_fim, posicao = self.valores[-1]
+        self.gerador.posicionar(*posicao)
+        self.gerador.add(f"goto {l_fim}")
+        self.gerador.add(f"{l_else}:")
+
+    def acao_fim_se(self, p):
+        _, l_fim, _ = self.valores.pop()
+        self.gerador.add(f"{l_fim}:")
+
+    def acao_enquanto(self, p):
+        l_ini = self.gerador.novo_label()
+        l_fim = self.gerador.novo_label()
+        self.valores.append((l_ini, l_fim, self.gerador.posicao()))
+        self.gerador.entrar_laco('😑')
+        self.gerador.add(f"{l_ini}:")
+
+    def acao_condicao_enquanto(self, p):
+        end, tipo = self.valores.pop()
+        if tipo != 'BOOL':
+            self.erro(f"Condição do WHILE deve ser BOOL. Encontrado: {tipo}")
+        self.gerador.add(f"if_false {end} goto {self.valores[-1][1]}")
+        self.tabela.entrar_bloco()
+
+    def acao_fim_enquanto(self, p):
+        self.tabela.sair_bloco()
+        l_ini, l_fim, posicao = self.valores.pop()
+        self.gerador.posicionar(*posicao)
+        self.gerador.add(f"goto {l_ini}")
+        self.gerador.sair_laco()
+        self.gerador.add(f"{l_fim}:")
+
+    def acao_para(self, p):
+        l_ini = self.gerador.novo_label()
+        l_fim = self.gerador.novo_label()
+        self.valores.append((l_ini, l_fim, self.gerador.posicao()))
+        self.gerador.entrar_laco('😮')
+        self.gerador.add(f"{l_ini}:")
+
+    def acao_condicao_para(self, p):
+        end, _ = self.valores.pop()
+        self.gerador.add(f"if_false {end} goto {self.valores[-1][1]}")
+        # O incremento só é validado agora; a tradução fica para depois do bloco
+        self.valores.append(p)
+        self.descartando += 1
+
+    def acao_fim_incremento(self, p):
+        self.descartando -= 1
+        self.tabela.entrar_bloco()
+
+    def acao_fim_para(self, p):
+        self.tabela.sair_bloco()
+        incremento = self.valores.pop()
+        token = self.fita[incremento]
+        self.gerador.posicionar(token[2], token[3])
+        self._analisar(['ATRIBUICAO_FOR'], incremento)
+        l_ini, l_fim, posicao = self.valores.pop()
+        self.gerador.posicionar(*posicao)
+        self.gerador.add(f"goto {l_ini}")
+        self.gerador.sair_laco()
+        self.gerador.add(f"{l_fim}:")
+
+    # ------ AÇÕES: EXPRESSÕES ------
+    # Os valores são pares (endereço, tipo), como os dicionários de visitar_fator
+
+    def acao_variavel(self, p):
+        nome = self.fita[p - 1][1]
+        info = self.tabela.buscar(nome)
+        if not info:
+            self.erro(f"Variável '{nome}' não declarada.")
+            self.valores.append((nome, 'UNKNOWN'))
+        else:
+            self.valores.append((nome, info['tipo']))
+
+    def acao_inteiro(self, p):
+        self.valores.append((str(self.fita[p - 1][1]), 'INT'))
+
+    def acao_texto(self, p):
+        if self.descartando:
+            self.valores.append((None, 'STRING'))
+        else:
+            self.valores.append((self.gerador.constante(formatar_constante(str(self.fita[p - 1][1]))), 'STRING'))
+
+    def acao_booleano(self, p):
+        self.valores.append(('1' if self.fita[p - 1][1] == '👍' else '0', 'BOOL'))
+
+    def acao_operador(self, p):
+        self.valores.append(self.traduzir_operador(str(self.fita[p - 1][1]).strip()))
+
+    def acao_binaria(self, p):
+        valores = self.valores
+        direita, _ = valores.pop()
+        op = valores.pop()
+        esquerda, _ = valores[-1]
+        tipo = 'BOOL' if op in OPS_BOOLEANOS else 'INT'
+        if self.descartando:
+            valores[-1] = (None, tipo)
+            return
+        novo = self.gerador.novo_temp()
+        self.gerador.add(f"{novo} = {esquerda} {op} {direita}")
+        valores[-1] = (novo, tipo)
+
+    def acao_binaria_termo(self, p):
+        valores = self.valores
+        direita, _ = valores.pop()
+        op = valores.pop()
+        esquerda, _ = valores[-1]
+        if self.descartando:
+            valores[-1] = (None, 'INT')
+            return
+        novo = self.gerador.novo_temp()
+        self.gerador.add(f"{novo} = {esquerda} {op} {direita}")
+        valores[-1] = (novo, 'INT')
+
+
+# --- Execução direta ---
+if __name__ == "__main__":
+    from analise_lexica import analisar
+    from semantico import GeradorTAC
+
+    if len(sys.argv) < 2:
+        print("Uso correto: python traducao_direta.py <arquivo_fonte.emoji>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        tokens, sucesso = analisar(f.read())
+    if not sucesso:
+        sys.exit(1)
+    gerador = GeradorTAC()
+    if not TradutorDireto(gerador).traduzir(tokens):
+        sys.exit(1)
+    print(gerador.obter_codigo())